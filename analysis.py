@@ -1,25 +1,160 @@
-import librosa
-import whisper
-
-def detect_audio_language(audio_path):
-    model = whisper.load_model("small")
-    result = model.transcribe(audio_path, verbose=False)
-    return result.get("language", "und")
-
-def segment_audio(audio_path):
-    y, sr = librosa.load(audio_path, sr=None)
-    # Simple segmentation (à améliorer selon besoin)
-    rms = librosa.feature.rms(y=y)[0]
-    voiced = rms > (rms.mean() * 0.7)
-    segments = []
-    start = None
-    for i, v in enumerate(voiced):
-        t = i * 512 / sr
-        if v and start is None:
-            start = t
-        elif not v and start is not None:
-            segments.append({"start": start, "end": t, "type": "speech"})
-            start = None
-    if start is not None:
-        segments.append({"start": start, "end": len(y)/sr, "type": "speech"})
-    return segments
\ No newline at end of file
+import logging
+import subprocess
+
+import numpy as np
+
+from video_pipeline.transcription import DEFAULT_WHISPER_MODEL, get_transcription
+from video_pipeline.video_writer import ffmpeg_binary
+
+logger = logging.getLogger(__name__)
+
+def detect_audio_language(audio_path, model_name=DEFAULT_WHISPER_MODEL, cache_dir=None):
+    return get_transcription(audio_path, model_name, cache_dir=cache_dir).language
+
+# ---------- SEGMENTATION AUDIO (parole / musique / silence) ----------
+# Toutes les étapes travaillent sur des tableaux de trames : aucune boucle Python par trame.
+
+SEGMENT_SR = 16000
+FRAME_LENGTH = 1024
+HOP_LENGTH = 512
+
+
+def load_audio(path, sr=SEGMENT_SR):
+    """
+    Décode la piste audio (vidéo ou fichier audio) en mono float32 via ffmpeg.
+    Une vidéo sans piste audio donne un signal vide (traité comme du silence).
+    """
+    cmd = [ffmpeg_binary(), "-nostdin", "-loglevel", "error", "-i", path,
+           "-vn", "-ac", "1", "-ar", str(sr), "-f", "f32le", "-"]
+    proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if proc.returncode != 0:
+        if b"does not contain any stream" in proc.stderr:
+            logger.info(f"Aucune piste audio dans {path}")
+            return np.zeros(0, dtype=np.float32), sr
+        raise subprocess.CalledProcessError(proc.returncode, cmd, proc.stdout, proc.stderr)
+    return np.frombuffer(proc.stdout, dtype=np.float32), sr
+
+
+def audio_features(y, frame_length=FRAME_LENGTH, hop_length=HOP_LENGTH):
+    """
+    Caractéristiques par trame, calculées en bloc :
+    rms_db (dB relatifs au maximum), flatness (planéité spectrale, 0 = tonal, 1 = bruit), zcr.
+    """
+    y = np.asarray(y, dtype=np.float32)
+    if len(y) < frame_length:
+        y = np.pad(y, (0, frame_length - len(y)))
+    frames = np.lib.stride_tricks.sliding_window_view(y, frame_length)[::hop_length]
+
+    rms = np.sqrt(np.mean(frames ** 2, axis=1))
+    rms_db = 20 * np.log10(np.maximum(rms, 1e-10) / max(float(rms.max()), 1e-10))
+
+    power = np.abs(np.fft.rfft(frames * np.hanning(frame_length), axis=1)) ** 2 + 1e-10
+    flatness = np.exp(np.mean(np.log(power), axis=1)) / np.mean(power, axis=1)
+
+    signs = np.signbit(frames)
+    zcr = np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+    return {"rms_db": rms_db, "flatness": flatness, "zcr": zcr}
+
+
+def hysteresis(x, low, high):
+    """Seuil à hystérésis vectorisé : actif au-dessus de high, inactif sous low, état conservé entre les deux"""
+    x = np.asarray(x)
+    events = np.where(x > high, 1, np.where(x < low, 0, -1))
+    idx = np.where(events >= 0, np.arange(len(x)), 0)
+    np.maximum.accumulate(idx, out=idx)
+    state = events[idx]
+    state[state < 0] = 0  # Avant le premier franchissement de seuil : inactif
+    return state.astype(bool)
+
+
+def _runs(labels):
+    """Encodage par plages : (débuts, longueurs, valeurs)"""
+    labels = np.asarray(labels)
+    if len(labels) == 0:
+        return np.array([], int), np.array([], int), labels
+    starts = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]])
+    lengths = np.diff(np.r_[starts, len(labels)])
+    return starts, lengths, labels[starts]
+
+
+def smooth_labels(labels, min_frames):
+    """Absorbe les plages plus courtes que min_frames dans la plage longue précédente (ou suivante)"""
+    starts, lengths, values = _runs(labels)
+    long_runs = lengths >= min_frames
+    if len(values) == 0 or long_runs.all() or not long_runs.any():
+        return np.asarray(labels)
+    idx = np.where(long_runs, np.arange(len(values)), -1)
+    np.maximum.accumulate(idx, out=idx)
+    idx[idx < 0] = np.argmax(long_runs)  # Plages courtes en tête : label de la première plage longue
+    return np.repeat(values[idx], lengths)
+
+
+def fill_gaps(mask, min_frames):
+    """Comble les plages inactives internes plus courtes que min_frames (pauses entre syllabes)"""
+    mask = np.asarray(mask, dtype=bool)
+    starts, lengths, values = _runs(mask)
+    inner = np.zeros(len(values), dtype=bool)
+    inner[1:-1] = True
+    gaps = ~values & inner & (lengths < min_frames)
+    return np.repeat(values | gaps, lengths)
+
+
+def rolling_std(x, window, valid=None):
+    """Écart-type glissant centré (sommes cumulées), limité aux trames `valid` si fourni"""
+    x = np.asarray(x, dtype=np.float64)
+    w = np.ones(len(x)) if valid is None else np.asarray(valid, dtype=np.float64)
+    pad = (window // 2, window - 1 - window // 2)
+    xp, wp = np.pad(x * w, pad), np.pad(w, pad)
+    c0 = np.cumsum(np.r_[0.0, wp])
+    c1 = np.cumsum(np.r_[0.0, xp])
+    c2 = np.cumsum(np.r_[0.0, xp * xp])
+    n = np.maximum(c0[window:] - c0[:-window], 1.0)
+    mean = (c1[window:] - c1[:-window]) / n
+    var = (c2[window:] - c2[:-window]) / n - mean ** 2
+    return np.sqrt(np.maximum(var, 0.0))
+
+
+def classify_frames(features, sr=SEGMENT_SR, hop_length=HOP_LENGTH, silence_db=-40.0,
+                    speech_modulation_db=6.0, min_duration=0.3):
+    """
+    Label par trame : 0 = silence, 1 = parole, 2 = musique.
+    - silence : énergie sous silence_db (hystérésis ±3 dB)
+    - parole : forte modulation d'énergie à l'échelle de la syllabe (écart-type glissant sur 1 s)
+      et spectre peu tonal ; musique : activité soutenue et/ou tonale
+    """
+    frames_per_second = sr / hop_length
+    min_frames = max(1, int(min_duration * frames_per_second))
+    rms_db = np.maximum(features["rms_db"], silence_db - 20.0)
+    active = fill_gaps(hysteresis(rms_db, silence_db - 3.0, silence_db + 3.0), min_frames)
+
+    # Statistiques glissantes restreintes aux trames actives : les silences voisins ne comptent pas
+    window = max(3, int(frames_per_second))
+    modulation = rolling_std(rms_db, window, active)
+    tonal = rolling_std(features["flatness"], window, active) < 0.02
+    speechy = hysteresis(modulation, speech_modulation_db - 1.5, speech_modulation_db + 1.5) & ~(
+        tonal & (features["flatness"] < 0.05))
+
+    labels = np.where(active, np.where(speechy, 1, 2), 0)
+    return smooth_labels(labels, min_frames)
+
+
+_LABELS = np.array(["silence", "speech", "music"])
+
+
+def segment_audio(audio_path=None, y=None, sr=SEGMENT_SR, min_duration=0.3, silence_db=-40.0):
+    """
+    Segmente l'audio en plages speech / music / silence.
+    Entrée : chemin (vidéo ou audio) ou signal mono `y` échantillonné à `sr`.
+    Retourne une liste de {"start", "end", "type"}.
+    """
+    if y is None:
+        y, sr = load_audio(audio_path)
+    if len(y) == 0:
+        return []
+    labels = classify_frames(audio_features(y), sr=sr, silence_db=silence_db, min_duration=min_duration)
+    starts, lengths, values = _runs(labels)
+    times = starts * HOP_LENGTH / sr
+    ends = np.minimum((starts + lengths) * HOP_LENGTH / sr, len(y) / sr)
+    ends[-1] = len(y) / sr
+    return [{"start": float(s), "end": float(e), "type": str(_LABELS[v])}
+            for s, e, v in zip(times, ends, values)]
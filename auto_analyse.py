@@ -1,49 +1,21 @@
-import moviepy.editor as mp
-import numpy as np
-import cv2
-import easyocr
-import whisper
+from video_pipeline.analysis import segment_audio
+from video_pipeline.text_presence import detect_text_presence
 
-def detect_audio_type(video_path, whisper_model="base"):
+def detect_audio_type(video_path, min_speech_seconds=1.0):
     """
     Analyse l'audio pour déterminer s'il y a de la parole, de la musique ou du silence.
-    Retourne : 'speech', 'music', 'silence', ou 'mix'
+    Retourne : 'speech' ou 'music_or_silence'
+    Segmentation par caractéristiques audio (énergie, planéité spectrale) : pas de transcription.
     """
-    audio_clip = mp.VideoFileClip(video_path).audio
-    audio_path = "temp_audio.wav"
-    audio_clip.write_audiofile(audio_path, verbose=False, logger=None)
-    
-    # Utilise Whisper pour détecter la parole
-    model = whisper.load_model(whisper_model)
-    result = model.transcribe(audio_path, language="fr")  # ou "en", à adapter
-    has_speech = len(result.get("segments", [])) > 0
-
-    # (Optionnel) Analyse simple du spectre pour détecter la musique
-    # À améliorer avec une vraie détection musique/bruit/silence
-    # Ici, on considère que s'il y a parole + "rythme" => mix
-    # TODO : Ajouter une vraie détection musique
+    segments = segment_audio(video_path)
+    speech_seconds = sum(seg["end"] - seg["start"] for seg in segments if seg["type"] == "speech")
+    has_speech = speech_seconds >= min_speech_seconds
 
     if has_speech:
         return "speech"
     else:
         return "music_or_silence"
 
-def detect_text_presence(video_path, frame_skip=10, ocr_model='en'):
-    """
-    Analyse quelques frames pour détecter la présence de texte à l'image.
-    Retourne True si du texte est détecté.
-    """
-    reader = easyocr.Reader([ocr_model])
-    clip = mp.VideoFileClip(video_path)
-    frames_to_check = np.linspace(0, clip.duration, num=6).astype(int)
-    for t in frames_to_check:
-        frame = clip.get_frame(t)
-        gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
-        result = reader.readtext(gray)
-        if any([conf > 0.5 for (_, _, conf) in result]):
-            return True
-    return False
-
 def analyse_video_type(video_path):
     audio_type = detect_audio_type(video_path)
     has_text = detect_text_presence(video_path)
@@ -1,5 +1,11 @@
 import subprocess
 
+import numpy as np
+
+from video_pipeline.analysis import (
+    HOP_LENGTH, audio_features, classify_frames, load_audio, rolling_std, segment_audio
+)
+
 def remove_silences(input_video, output_video, silence_threshold="-30dB"):
     """
     Utilise auto-editor pour supprimer les silences automatiquement.
@@ -12,12 +18,37 @@ def remove_silences(input_video, output_video, silence_threshold="-30dB"):
     subprocess.run(command, check=True)
     return output_video
 
-def detect_hesitations(audio_path):
+def detect_hesitations(audio_path, min_pause=0.4, max_pause=2.0, min_filled=0.35):
     """
-    Utilise librosa ou Whisper pour détecter les hésitations ("euuuh", répétitions).
-    TODO: Implémentation fine (analyse spectrogramme, mots répétés, pauses).
+    Détecte les hésitations à partir de la segmentation audio :
+    - "pause" : silence entre deux plages de parole, de durée dans [min_pause, max_pause]
+    - "filled_pause" : son voisé tenu ("euuuh") dans la parole, énergie stable et spectre tonal
+      pendant au moins min_filled secondes
+    Retourne une liste de {"start", "end", "type"} triée par début.
     """
-    pass
+    y, sr = load_audio(audio_path)
+    if len(y) == 0:
+        return []
+    hesitations = []
+
+    segments = segment_audio(y=y, sr=sr)
+    for prev, seg, nxt in zip(segments, segments[1:], segments[2:]):
+        if (seg["type"] == "silence" and prev["type"] == nxt["type"] == "speech"
+                and min_pause <= seg["end"] - seg["start"] <= max_pause):
+            hesitations.append({"start": seg["start"], "end": seg["end"], "type": "pause"})
+
+    features = audio_features(y)
+    speech = classify_frames(features, sr=sr) == 1
+    frames_per_second = sr / HOP_LENGTH
+    steady = rolling_std(features["rms_db"], max(3, int(0.3 * frames_per_second)), speech) < 2.0
+    filled = speech & steady & (features["flatness"] < 0.1)
+    edges = np.diff(np.r_[0, filled.astype(np.int8), 0])
+    for start, end in zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)):
+        if (end - start) / frames_per_second >= min_filled:
+            hesitations.append({"start": float(start / frames_per_second),
+                                "end": float(end / frames_per_second), "type": "filled_pause"})
+
+    return sorted(hesitations, key=lambda h: h["start"])
 
 def smart_cut(input_video, output_video):
     """
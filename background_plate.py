@@ -0,0 +1,64 @@
+import warnings
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+
+from video_pipeline.inpaint_engine import mask_roi
+
+
+@dataclass
+class BackgroundPlate:
+    """Fond reconstruit sur la zone roi (x0, y0, x1, y1) ; valid = pixel observé au moins une fois sans texte"""
+    roi: Tuple[int, int, int, int]
+    pixels: np.ndarray
+    valid: np.ndarray
+    motion_threshold: float = 8.0
+
+    def matches(self, frame, mask) -> bool:
+        """Vrai si la frame est cohérente avec le fond (plan fixe) hors zones texte"""
+        x0, y0, x1, y1 = self.roi
+        visible = self.valid & ~mask[y0:y1, x0:x1]
+        if not visible.any():
+            return False
+        diff = np.abs(frame[y0:y1, x0:x1][visible].astype(np.float32) - self.pixels[visible])
+        return float(diff.mean()) < self.motion_threshold
+
+    def fill(self, frame, mask, fallback: Optional[Callable] = None):
+        """
+        Remplit `mask` (booléen plein cadre) depuis le fond. Les pixels jamais observés sans texte
+        (ou toute la zone si la caméra a bougé) passent par fallback(frame, mask_uint8).
+        """
+        x0, y0, x1, y1 = self.roi
+        out = frame.copy()
+        residual = mask.copy()
+        if self.matches(frame, mask):
+            fill = mask[y0:y1, x0:x1] & self.valid
+            out[y0:y1, x0:x1][fill] = np.rint(self.pixels[fill]).astype(frame.dtype)
+            residual[y0:y1, x0:x1] &= ~self.valid
+        if residual.any() and fallback is not None:
+            out = fallback(out, residual.astype(np.uint8) * 255)
+        return out
+
+
+def build_background_plate(frames, masks, margin: int = 8, motion_threshold: float = 8.0
+                           ) -> Optional[BackgroundPlate]:
+    """
+    Médiane temporelle, sur une fenêtre de frames, des pixels non couverts par du texte.
+    frames : (T, H, W, C) ; masks : (T, H, W) booléens (True = texte).
+    Le calcul est entièrement vectorisé et limité à la zone englobant les masques.
+    """
+    masks = np.asarray(masks, dtype=bool)
+    roi = mask_roi(masks.any(axis=0), margin)
+    if roi is None:
+        return None
+    x0, y0, x1, y1 = roi
+    stack = np.stack([np.asarray(f)[y0:y1, x0:x1] for f in frames]).astype(np.float32)
+    covered = masks[:, y0:y1, x0:x1]
+    stack[covered] = np.nan
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # pixels jamais visibles : NaN
+        pixels = np.nanmedian(stack, axis=0)
+    valid = ~covered.all(axis=0)
+    pixels[~valid] = 0
+    return BackgroundPlate(roi=roi, pixels=pixels, valid=valid, motion_threshold=motion_threshold)
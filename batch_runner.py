@@ -0,0 +1,315 @@
+import argparse
+import hashlib
+import heapq
+import itertools
+import json
+import logging
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import cv2
+
+from video_pipeline.drive_sync import DriveSync
+from video_pipeline.drive_transfers import get_transfer_manager
+from video_pipeline.pipeline import (
+    CONFIG, cached_analysis, cached_extraction, cached_translation, improved_main,
+    open_stage_cache, setup_logging, shutdown_ocr_pools, validate_input_file
+)
+
+logger = logging.getLogger(__name__)
+
+DRIVE_PREFIX = "drive:"
+
+# Taille des pools par étape, partagés par toutes les vidéos du lot
+DEFAULT_STAGE_WORKERS = {"fetch": 4, "analysis": 2, "extraction": 2, "translation": 4, "render": 2}
+
+
+@dataclass
+class BatchJob:
+    """Une vidéo du lot, traitée étape par étape"""
+    source: str
+    lang: str
+    outdir: str
+    video_path: Optional[str] = None
+    drive_file_id: Optional[str] = None
+    drive_md5: Optional[str] = None
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    context: Dict[str, Any] = field(default_factory=dict)
+    results: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    @property
+    def priority(self) -> float:
+        """Plus courte d'abord : durée sondée à l'inventaire puis validée (inconnue = en dernier)"""
+        return float(self.metadata.get("duration", float("inf")))
+
+
+# ---------- SOURCES DU LOT ----------
+
+def _job_outdir(outdir: str, name: str, lang: str, uid: str) -> str:
+    """
+    Un dossier par (vidéo, langue). `uid` (id Drive ou empreinte du chemin local) distingue
+    les vidéos de même nom venues de dossiers différents.
+    """
+    return os.path.join(outdir, f"{os.path.splitext(os.path.basename(name))[0]}_{uid}_{lang}")
+
+
+def _path_uid(path: str) -> str:
+    return hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:10]
+
+
+def probe_duration(video_path: str) -> Optional[float]:
+    """Durée (s) lue dans l'en-tête du conteneur, sans décoder de frame ; None si illisible"""
+    cap = cv2.VideoCapture(video_path)
+    try:
+        if not cap.isOpened():
+            return None
+        fps, frame_count = cap.get(cv2.CAP_PROP_FPS), cap.get(cv2.CAP_PROP_FRAME_COUNT)
+        return frame_count / fps if fps > 0 and frame_count > 0 else None
+    finally:
+        cap.release()
+
+
+def _local_job(source: str, lang: str, outdir: str, path: str) -> BatchJob:
+    # Durée sondée dès l'inventaire : l'ordre d'admission suit déjà « plus courte d'abord »
+    duration = probe_duration(path)
+    return BatchJob(source=source, lang=lang, outdir=_job_outdir(outdir, path, lang, _path_uid(path)), video_path=path,
+                    metadata={"duration": duration} if duration is not None else {})
+
+
+def jobs_from_directory(directory: str, lang: str, outdir: str) -> List[BatchJob]:
+    names = sorted(n for n in os.listdir(directory)
+                   if os.path.splitext(n)[1].lower() in CONFIG.supported_formats)
+    return [_local_job(n, lang, outdir, os.path.join(directory, n)) for n in names]
+
+
+def jobs_from_manifest(manifest: str, lang: str, outdir: str) -> List[BatchJob]:
+    """
+    Manifeste JSON (liste de chemins ou de {"path", "lang"}) ou texte (une vidéo par ligne,
+    « chemin[,langue] »). Les chemins relatifs le sont au manifeste.
+    """
+    base = os.path.dirname(os.path.abspath(manifest))
+    with open(manifest, encoding="utf-8") as f:
+        if manifest.endswith(".json"):
+            entries = [e if isinstance(e, dict) else {"path": e} for e in json.load(f)]
+        else:
+            entries = []
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    path, _, job_lang = line.partition(",")
+                    entries.append({"path": path.strip(), "lang": job_lang.strip() or None})
+    jobs = []
+    for entry in entries:
+        job_lang = entry.get("lang") or lang
+        jobs.append(_local_job(entry["path"], job_lang, outdir, os.path.join(base, entry["path"])))
+    return jobs
+
+
+def drive_ledger(outdir: str, service=None) -> DriveSync:
+    from video_pipeline.drive import authentification_drive
+    service = service or authentification_drive()
+    if service is None:
+        raise RuntimeError("Service Google Drive indisponible")
+    return DriveSync(service, os.path.join(outdir, "cache", "drive_ledger.sqlite"))
+
+
+def _drive_duration(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Durée annoncée par Drive (videoMediaMetadata), connue avant le téléchargement"""
+    millis = (item.get("videoMediaMetadata") or {}).get("durationMillis")
+    return {"duration": int(millis) / 1000.0} if millis else {}
+
+
+def jobs_from_drive(folder_id: str, lang: str, outdir: str, sync: Optional[DriveSync] = None) -> List[BatchJob]:
+    """
+    Vidéos nouvelles ou modifiées du dossier (plus celles restées en attente d'un lot interrompu).
+    Sans `sync`, un registre est ouvert puis refermé pour ce seul inventaire.
+    """
+    own_sync = sync is None
+    sync = sync or drive_ledger(outdir)
+    try:
+        items = {item["id"]: item for item in sync.pending(folder_id)}
+        items.update((item["id"], item) for item in sync.poll(folder_id))
+    finally:
+        if own_sync:
+            sync.close()
+    return [BatchJob(source=item["name"], lang=lang, outdir=_job_outdir(outdir, item["name"], lang, item["id"]),
+                     drive_file_id=item["id"], drive_md5=item.get("md5Checksum"), metadata=_drive_duration(item))
+            for item in items.values()]
+
+
+def discover_jobs(source: str, lang: str, outdir: str, sync: Optional[DriveSync] = None) -> List[BatchJob]:
+    """Dossier local, manifeste (.json / .txt / .csv) ou dossier Drive (« drive:<folder_id> »)"""
+    if source.startswith(DRIVE_PREFIX):
+        return jobs_from_drive(source[len(DRIVE_PREFIX):], lang, outdir, sync=sync)
+    if os.path.isdir(source):
+        return jobs_from_directory(source, lang, outdir)
+    return jobs_from_manifest(source, lang, outdir)
+
+
+# ---------- ÉTAPES ----------
+
+def _fetch(job: BatchJob):
+    if job.video_path is None:
+        # Téléchargement en flux et reprenable ; le pool « fetch » borne les transferts simultanés
+        local_path = os.path.join(job.outdir, "source", os.path.basename(job.source))
+        job.video_path = get_transfer_manager().download(job.drive_file_id, local_path)
+    job.metadata = validate_input_file(job.video_path)
+
+
+def _analysis(job: BatchJob):
+    stages = open_stage_cache(job.video_path, job.outdir)
+    job.context.update(stages=stages, analysis=cached_analysis(stages, job.video_path))
+
+
+def _extraction(job: BatchJob):
+    ctx = job.context
+    analysis, analysis_hash = ctx["analysis"]
+    ctx["extraction"] = cached_extraction(
+        ctx["stages"], job.video_path, job.metadata, analysis["video_type"], analysis_hash,
+        cache_dir=os.path.join(job.outdir, "cache")
+    )
+
+
+def _translation(job: BatchJob):
+    ctx = job.context
+    extraction, extraction_hash = ctx["extraction"]
+    ctx["translations"] = {job.lang: cached_translation(
+        ctx["stages"], extraction["sentences"], job.lang, extraction_hash,
+        cache_dir=os.path.join(job.outdir, "cache")
+    )}
+
+
+def _render(job: BatchJob):
+    # Artefacts amont transmis tels quels : improved_main ne fait plus que rendu, TTS et rapport,
+    # sans rejouer d'étape même cache désactivé
+    job.results = improved_main(job.video_path, lang=job.lang, outdir=job.outdir,
+                                prepared=dict(job.context, metadata=job.metadata))
+    job.context.clear()
+
+
+PIPELINE_STAGES: List[Tuple[str, Callable[[BatchJob], None]]] = [
+    ("fetch", _fetch),
+    ("analysis", _analysis),
+    ("extraction", _extraction),
+    ("translation", _translation),
+    ("render", _render),
+]
+
+
+# ---------- ORDONNANCEMENT ----------
+
+class BatchRunner:
+    """
+    Exécute un lot de vidéos dans un seul processus : chaque étape a son pool de workers,
+    partagé par toutes les vidéos, si bien que l'encodage d'une vidéo recouvre l'OCR de la
+    suivante. Dans chaque étape, la vidéo la plus courte passe d'abord.
+    Contre-pression : une nouvelle vidéo n'entre dans la pipeline que si la file d'attente
+    de l'étape suivante reste sous `max_queue_depth` et si moins de `max_active_jobs` sont en cours.
+    """
+
+    def __init__(self, stages: Sequence[Tuple[str, Callable[[BatchJob], None]]] = PIPELINE_STAGES,
+                 workers: Optional[Dict[str, int]] = None, max_queue_depth: int = 2,
+                 max_active_jobs: Optional[int] = None):
+        self.stages = list(stages)
+        self.workers = dict(DEFAULT_STAGE_WORKERS)
+        self.workers.update(workers or {})
+        self.max_queue_depth = max_queue_depth
+        self.max_active_jobs = max_active_jobs or sum(self.workers.get(n, 1) for n, _ in self.stages)
+        self._counter = itertools.count()
+
+    def _push(self, queues, stage_idx, job):
+        heapq.heappush(queues[stage_idx], (job.priority, next(self._counter), job))
+
+    def run(self, jobs: Sequence[BatchJob]) -> List[BatchJob]:
+        names = [name for name, _ in self.stages]
+        executors = [ThreadPoolExecutor(max_workers=self.workers.get(n, 1), thread_name_prefix=f"batch-{n}")
+                     for n in names]
+        queues: List[List[Any]] = [[] for _ in self.stages]
+        in_flight = [0] * len(self.stages)
+        futures = {}
+        # Pas encore admis ; durée sondée à l'inventaire (en-tête local ou métadonnées Drive) : plus courte d'abord
+        waiting = sorted(jobs, key=lambda j: j.priority)
+        active = 0
+
+        try:
+            while waiting or futures or any(queues):
+                # Admission des nouvelles vidéos, bornée par la profondeur de la file suivante
+                while (waiting and active < self.max_active_jobs
+                       and (len(self.stages) < 2 or len(queues[1]) < self.max_queue_depth)
+                       and len(queues[0]) < self.workers.get(names[0], 1)):
+                    self._push(queues, 0, waiting.pop(0))
+                    active += 1
+
+                for idx, (name, fn) in enumerate(self.stages):
+                    while queues[idx] and in_flight[idx] < self.workers.get(name, 1):
+                        _, _, job = heapq.heappop(queues[idx])
+                        futures[executors[idx].submit(fn, job)] = (idx, job)
+                        in_flight[idx] += 1
+
+                if not futures:
+                    continue
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    idx, job = futures.pop(future)
+                    in_flight[idx] -= 1
+                    try:
+                        future.result()
+                    except Exception as e:
+                        job.error = f"{names[idx]} : {e}"
+                        job.context.clear()
+                        logger.error(f"Lot : échec de {job.source} à l'étape {names[idx]} : {e}")
+                        active -= 1
+                        continue
+                    if idx + 1 < len(self.stages):
+                        self._push(queues, idx + 1, job)
+                    else:
+                        active -= 1
+                        logger.info(f"Lot : {job.source} terminé")
+        finally:
+            for executor in executors:
+                executor.shutdown(wait=True)
+        return list(jobs)
+
+
+def run_batch(source: str, lang: str = "en", outdir: str = "outputs", **runner_kwargs) -> List[BatchJob]:
+    # Un seul registre Drive pour l'inventaire et le marquage des vidéos réussies
+    sync = drive_ledger(outdir) if source.startswith(DRIVE_PREFIX) else None
+    try:
+        jobs = discover_jobs(source, lang, outdir, sync=sync)
+        logger.info(f"Lot : {len(jobs)} vidéo(s) à traiter depuis {source}")
+        jobs = BatchRunner(**runner_kwargs).run(jobs)
+        if sync is not None:
+            # Les vidéos réussies ne seront plus proposées aux prochains polls
+            for job in jobs:
+                if not job.error and (job.results or {}).get("success"):
+                    sync.mark_processed({"id": job.drive_file_id, "md5Checksum": job.drive_md5})
+        return jobs
+    finally:
+        # Fin du lot : workers OCR et leurs segments partagés libérés sans attendre la sortie
+        shutdown_ocr_pools()
+        if sync is not None:
+            sync.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Traitement par lot de vidéos (un seul processus)")
+    parser.add_argument("source", help="Dossier, manifeste (.json/.txt/.csv) ou drive:<folder_id>")
+    parser.add_argument("--lang", default="en", help="Langue cible par défaut")
+    parser.add_argument("--outdir", default="outputs", help="Dossier de sortie")
+    parser.add_argument("--queue-depth", type=int, default=2, help="Profondeur max des files entre étapes")
+    args = parser.parse_args()
+    setup_logging()
+
+    jobs = run_batch(args.source, args.lang, args.outdir, max_queue_depth=args.queue_depth)
+    failed = [j for j in jobs if j.error or not (j.results or {}).get("success")]
+    for job in jobs:
+        status = "✗" if job in failed else "✓"
+        print(f"{status} {job.source} ({job.lang}) {job.error or ''}")
+    return 0 if not failed else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
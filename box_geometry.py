@@ -0,0 +1,19 @@
+from typing import Tuple
+
+Box = Tuple[int, int, int, int]
+
+
+def union_box(a: Box, b: Box) -> Box:
+    """Plus petite box (x, y, w, h) contenant a et b"""
+    x1, y1 = min(a[0], b[0]), min(a[1], b[1])
+    x2, y2 = max(a[0] + a[2], b[0] + b[2]), max(a[1] + a[3], b[1] + b[3])
+    return (x1, y1, x2 - x1, y2 - y1)
+
+
+def box_iou(a: Box, b: Box) -> float:
+    """Intersection sur union de deux boxes (x, y, w, h)"""
+    ix = max(0, min(a[0] + a[2], b[0] + b[2]) - max(a[0], b[0]))
+    iy = max(0, min(a[1] + a[3], b[1] + b[3]) - max(a[1], b[1]))
+    inter = ix * iy
+    union = a[2] * a[3] + b[2] * b[3] - inter
+    return inter / union if union > 0 else 0.0
@@ -1,17 +1,17 @@
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload, MediaFileUpload
 from google.oauth2.service_account import Credentials
-import io
 import os
 from config import Config
 from video_pipeline.utils import setup_logger
+from video_pipeline.drive_sync import iter_folder_videos
+from video_pipeline.drive_transfers import get_transfer_manager, upload_state_dir
 
 logger = setup_logger("video_pipeline.drive")
 
 SCOPES = ['https://www.googleapis.com/auth/drive']
 
-def authentification_drive():
-    """Authentifie le service Google Drive."""
+def identifiants_drive():
+    """Charge les identifiants du compte de service Google Drive (None si indisponibles)."""
     creds = None
     if Config.GOOGLE_CREDENTIALS and os.path.exists(Config.GOOGLE_CREDENTIALS):
         creds = Credentials.from_service_account_file(
@@ -19,6 +19,13 @@ def authentification_drive():
     if not creds or not creds.valid:
         logger.error("Impossible de charger les identifiants Google Drive ou credentials invalides.")
         return None
+    return creds
+
+def authentification_drive(creds=None):
+    """Authentifie le service Google Drive."""
+    creds = creds or identifiants_drive()
+    if creds is None:
+        return None
     try:
         service = build('drive', 'v3', credentials=creds)
         logger.info("✅ Authentification Google Drive réussie.")
@@ -28,12 +35,9 @@ def authentification_drive():
         return None
 
 def lister_videos_drive(service, folder_id):
-    """Liste les fichiers vidéo dans le dossier spécifié."""
+    """Liste les fichiers vidéo dans le dossier spécifié (toutes les pages)."""
     try:
-        results = service.files().list(
-            q=f"'{folder_id}' in parents and mimeType contains 'video/' and trashed=false",
-            fields="nextPageToken, files(id, name)").execute()
-        items = results.get('files', [])
+        items = list(iter_folder_videos(service, folder_id))
         if not items:
             logger.info(f"ℹ️ Aucun fichier vidéo trouvé dans le dossier : {folder_id}")
             return []
@@ -44,39 +48,21 @@ def lister_videos_drive(service, folder_id):
         return []
 
 def telecharger_video_drive(service, file_id, local_path):
-    """Télécharge un fichier depuis Google Drive."""
+    """Télécharge un fichier depuis Google Drive (en flux vers le disque, reprenable)."""
     try:
-        request = service.files().get_media(fileId=file_id)
-        fh = io.BytesIO()
-        downloader = MediaIoBaseDownload(fh, request)
-        done = False
-        while not done:
-            status, done = downloader.next_chunk()
-            if status:
-                logger.info(f"⬇️ Téléchargement {int(status.progress() * 100)}% du fichier ID : {file_id}")
-        fh.seek(0)
-        with open(local_path, 'wb') as f:
-            f.write(fh.read())
-        logger.info(f"✅ Fichier ID '{file_id}' téléchargé vers : {local_path}")
-        return local_path
+        return get_transfer_manager(service).download(file_id, local_path)
     except Exception as e:
         logger.error(f"❌ Erreur lors du téléchargement du fichier ID '{file_id}' : {e}")
         return None
 
-def uploader_video_drive(service, local_path, folder_id):
-    """Upload un fichier vers Google Drive."""
+def uploader_video_drive(service, local_path, folder_id, outdir=None):
+    """
+    Upload un fichier vers Google Drive (session résumable, par morceaux).
+    La session est conservée dans le cache du job (`outdir`, par défaut le dossier du fichier).
+    """
+    state_dir = upload_state_dir(outdir or os.path.dirname(os.path.abspath(local_path)))
     try:
-        file_name = os.path.basename(local_path)
-        media = MediaFileUpload(local_path, mimetype='video/*')
-        file_metadata = {'name': file_name, 'parents': [folder_id]}
-        request = service.files().create(media_body=media, body=file_metadata, fields='id')
-        response = None
-        while response is None:
-            status, response = request.next_chunk()
-            if status:
-                logger.info(f"⬆️ Upload {int(status.progress() * 100)}% du fichier : {file_name}")
-        logger.info(f"✅ Fichier '{file_name}' uploadé vers le dossier ID '{folder_id}', ID du fichier : '{response.get('id')}'")
-        return response.get('id')
+        return get_transfer_manager(service).upload(local_path, folder_id, state_dir=state_dir)
     except Exception as e:
         logger.error(f"❌ Erreur lors de l'upload du fichier '{os.path.basename(local_path)}' : {e}")
         return None
\ No newline at end of file
@@ -0,0 +1,100 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterator, List
+
+logger = logging.getLogger(__name__)
+
+VIDEO_FIELDS = "id, name, md5Checksum, modifiedTime, size, videoMediaMetadata(durationMillis)"
+
+
+def iter_folder_videos(service, folder_id: str, page_size: int = 1000) -> Iterator[Dict[str, Any]]:
+    """Toutes les vidéos du dossier, en suivant nextPageToken jusqu'à la dernière page"""
+    page_token = None
+    while True:
+        results = service.files().list(
+            q=f"'{folder_id}' in parents and mimeType contains 'video/' and trashed=false",
+            fields=f"nextPageToken, files({VIDEO_FIELDS})",
+            pageSize=page_size,
+            pageToken=page_token
+        ).execute()
+        yield from results.get("files", [])
+        page_token = results.get("nextPageToken")
+        if not page_token:
+            return
+
+
+class DriveSync:
+    """
+    Synchronisation incrémentale d'un dossier Drive.
+    Un registre SQLite local mémorise (id, md5Checksum, modifiedTime) de chaque vidéo vue :
+    chaque poll ne rend que les vidéos nouvelles ou modifiées. Une vidéo dont le md5 correspond
+    à une entrée déjà traitée (copie, renommage) est ignorée sans être téléchargée.
+    """
+
+    def __init__(self, service, ledger_path: str):
+        self.service = service
+        os.makedirs(os.path.dirname(os.path.abspath(ledger_path)), exist_ok=True)
+        self._conn = sqlite3.connect(ledger_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS drive_files (
+                    file_id TEXT PRIMARY KEY, folder_id TEXT, name TEXT, md5 TEXT,
+                    modified_time TEXT, status TEXT, updated_at REAL
+                );
+                CREATE TABLE IF NOT EXISTS processed_inputs (
+                    md5 TEXT PRIMARY KEY, file_id TEXT, processed_at REAL
+                );
+            """)
+            self._conn.commit()
+
+    def poll(self, folder_id: str) -> List[Dict[str, Any]]:
+        """Vidéos nouvelles ou modifiées depuis le dernier poll, non encore traitées"""
+        changed, skipped = [], 0
+        with self._lock:
+            known = {row[0]: (row[1], row[2]) for row in self._conn.execute(
+                "SELECT file_id, md5, modified_time FROM drive_files WHERE folder_id = ?", (folder_id,))}
+            processed = {row[0] for row in self._conn.execute("SELECT md5 FROM processed_inputs")}
+
+            for item in iter_folder_videos(self.service, folder_id):
+                md5, modified = item.get("md5Checksum"), item.get("modifiedTime")
+                if known.get(item["id"]) == (md5, modified):
+                    continue
+                status = "skipped" if md5 and md5 in processed else "pending"
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO drive_files VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (item["id"], folder_id, item.get("name"), md5, modified, status, time.time())
+                )
+                if status == "skipped":
+                    skipped += 1
+                else:
+                    changed.append(item)
+            self._conn.commit()
+
+        logger.info(f"🔍 Dossier {folder_id} : {len(changed)} vidéo(s) nouvelle(s) ou modifiée(s), "
+                    f"{skipped} déjà traitée(s)")
+        return changed
+
+    def pending(self, folder_id: str) -> List[Dict[str, Any]]:
+        """Vidéos vues mais pas encore marquées traitées (reprise après interruption)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT file_id, name, md5, modified_time FROM drive_files WHERE folder_id = ? AND status = 'pending'",
+                (folder_id,)).fetchall()
+        return [{"id": r[0], "name": r[1], "md5Checksum": r[2], "modifiedTime": r[3]} for r in rows]
+
+    def mark_processed(self, item: Dict[str, Any]):
+        with self._lock:
+            self._conn.execute("UPDATE drive_files SET status = 'done', updated_at = ? WHERE file_id = ?",
+                               (time.time(), item["id"]))
+            if item.get("md5Checksum"):
+                self._conn.execute("INSERT OR REPLACE INTO processed_inputs VALUES (?, ?, ?)",
+                                   (item["md5Checksum"], item["id"], time.time()))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,289 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024  # multiple de 256 Kio, exigé par l'upload résumable Drive
+UPLOAD_URL = "https://www.googleapis.com/upload/drive/v3/files?uploadType=resumable&fields=id"
+MEDIA_URL = "https://www.googleapis.com/drive/v3/files/{file_id}?alt=media"
+METADATA_URL = "https://www.googleapis.com/drive/v3/files/{file_id}?fields=id,name,size,md5Checksum"
+REQUEST_TIMEOUT = 120  # secondes, par requête (un morceau)
+
+
+class TransferError(Exception):
+    pass
+
+
+class GoogleDriveBackend:
+    """
+    Accès bas niveau à Drive pour les transferts par morceaux :
+    métadonnées, lectures par plage (Range) et sessions d'upload résumables, toutes via une
+    AuthorizedSession (requests) construite sur les identifiants, utilisable depuis plusieurs
+    threads (le transport httplib2 d'un service googleapiclient ne l'est pas).
+    """
+
+    def __init__(self, credentials, timeout: float = REQUEST_TIMEOUT):
+        from google.auth.transport.requests import AuthorizedSession
+        self.session = AuthorizedSession(credentials)
+        self.timeout = timeout
+
+    def metadata(self, file_id: str) -> Dict[str, str]:
+        resp = self.session.get(METADATA_URL.format(file_id=file_id), timeout=self.timeout)
+        if resp.status_code != 200:
+            raise TransferError(f"Métadonnées Drive {file_id} : HTTP {resp.status_code}")
+        return resp.json()
+
+    def read_range(self, file_id: str, start: int, end: int) -> bytes:
+        resp = self.session.get(MEDIA_URL.format(file_id=file_id), timeout=self.timeout,
+                                headers={"Range": f"bytes={start}-{end}"})
+        if resp.status_code not in (200, 206):
+            raise TransferError(f"Lecture Drive {file_id} [{start}-{end}] : HTTP {resp.status_code}")
+        return resp.content
+
+    def create_upload_session(self, name: str, folder_id: str, total_size: int, mimetype: str) -> str:
+        body = json.dumps({"name": name, "parents": [folder_id]})
+        resp = self.session.post(UPLOAD_URL, data=body, timeout=self.timeout, headers={
+            "Content-Type": "application/json; charset=UTF-8",
+            "X-Upload-Content-Type": mimetype,
+            "X-Upload-Content-Length": str(total_size),
+        })
+        if resp.status_code != 200 or "Location" not in resp.headers:
+            raise TransferError(f"Ouverture de session d'upload : HTTP {resp.status_code}")
+        return resp.headers["Location"]
+
+    def _parse_upload_response(self, resp):
+        if resp.status_code in (200, 201):
+            return None, resp.json()["id"]
+        if resp.status_code == 308:
+            committed = resp.headers.get("Range")
+            return (int(committed.rsplit("-", 1)[1]) + 1 if committed else 0), None
+        raise TransferError(f"Upload : HTTP {resp.status_code}")
+
+    def query_upload(self, session_uri: str, total_size: int):
+        """(octets déjà reçus par Drive, id du fichier si l'upload est terminé)"""
+        # 308 = « Resume Incomplete » côté Drive, pas une redirection à suivre
+        resp = self.session.put(session_uri, data=b"", timeout=self.timeout, allow_redirects=False, headers={
+            "Content-Length": "0", "Content-Range": f"bytes */{total_size}"})
+        if resp.status_code == 404:
+            raise TransferError("Session d'upload expirée")
+        return self._parse_upload_response(resp)
+
+    def put_chunk(self, session_uri: str, data: bytes, offset: int, total_size: int):
+        """Envoie un morceau ; retourne (octets reçus, id du fichier si l'upload est terminé)"""
+        resp = self.session.put(session_uri, data=data, timeout=self.timeout, allow_redirects=False, headers={
+            "Content-Length": str(len(data)),
+            "Content-Range": f"bytes {offset}-{offset + len(data) - 1}/{total_size}"})
+        return self._parse_upload_response(resp)
+
+
+def upload_state_dir(outdir: str) -> str:
+    """Dossier des sessions d'upload reprenables d'un job, à côté de ses autres caches"""
+    return os.path.join(outdir, "cache", "drive_transfers")
+
+
+def _md5(path: str, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.md5()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class DriveTransferManager:
+    """
+    Transferts Drive en flux, reprenables et concurrents :
+    - téléchargement par plages écrites au fil de l'eau dans `<dest>.part` (mémoire = un morceau),
+      repris à la taille du .part après une interruption, vérifié par md5 puis renommé
+    - upload par session résumable, dont l'URI est conservée sur disque pour reprendre
+      après un crash au dernier octet reçu par Drive
+    - pool borné de `max_workers` transferts simultanés ; `on_complete` reçoit chaque
+      fichier terminé (ex. file de traitement) dès qu'il est disponible
+    """
+
+    def __init__(self, backend, max_workers: int = 4, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 max_retries: int = 5, backoff: float = 1.0, state_dir: Optional[str] = None):
+        self.backend = backend
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.state_dir = state_dir
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="drive-transfer")
+        self._state_lock = threading.Lock()
+
+    # ----- retries -----
+
+    def _with_retries(self, label: str, step: Callable[[], bool]):
+        """Répète step() (un morceau) jusqu'à ce qu'il signale la fin ; réessaie les erreurs transitoires"""
+        failures = 0
+        while True:
+            try:
+                if step():
+                    return
+                failures = 0
+            except Exception as e:
+                failures += 1
+                if failures > self.max_retries:
+                    raise TransferError(f"{label} : abandon après {self.max_retries} essais ({e})") from e
+                delay = self.backoff * (2 ** (failures - 1))
+                logger.warning(f"{label} interrompu ({e}), reprise dans {delay:.1f}s")
+                time.sleep(delay)
+
+    # ----- téléchargement -----
+
+    def download(self, file_id: str, dest_path: str) -> str:
+        meta = self.backend.metadata(file_id)
+        total = int(meta.get("size", 0))
+        part_path = f"{dest_path}.part"
+        os.makedirs(os.path.dirname(os.path.abspath(dest_path)), exist_ok=True)
+        if os.path.exists(part_path) and os.path.getsize(part_path) > 0:
+            logger.info(f"⬇️ Reprise du téléchargement de {file_id} à {os.path.getsize(part_path)} octets")
+
+        def step():
+            with open(part_path, "ab") as f:
+                offset = f.tell()
+                if offset >= total:
+                    return True
+                end = min(offset + self.chunk_size, total) - 1
+                data = self.backend.read_range(file_id, offset, end)[:end - offset + 1]
+                if not data:
+                    raise TransferError("Réponse vide")
+                f.write(data)
+                return offset + len(data) >= total
+
+        self._with_retries(f"Téléchargement {file_id}", step)
+
+        expected_md5 = meta.get("md5Checksum")
+        if expected_md5 and _md5(part_path) != expected_md5:
+            os.remove(part_path)
+            raise TransferError(f"Somme de contrôle invalide pour {file_id}, fichier partiel supprimé")
+        os.replace(part_path, dest_path)
+        logger.info(f"✅ Fichier ID '{file_id}' téléchargé vers : {dest_path}")
+        return dest_path
+
+    # ----- upload -----
+
+    def _state_path(self, local_path: str, folder_id: str, state_dir: Optional[str] = None) -> Optional[str]:
+        state_dir = state_dir or self.state_dir
+        if not state_dir:
+            return None
+        st = os.stat(local_path)
+        raw = f"{os.path.abspath(local_path)}|{st.st_size}|{st.st_mtime_ns}|{folder_id}"
+        return os.path.join(state_dir, f"upload_{hashlib.sha1(raw.encode()).hexdigest()}.json")
+
+    def _load_session(self, state_path):
+        if state_path and os.path.exists(state_path):
+            with open(state_path, encoding="utf-8") as f:
+                return json.load(f).get("session_uri")
+        return None
+
+    def _save_session(self, state_path, session_uri):
+        if not state_path:
+            return
+        with self._state_lock:
+            os.makedirs(os.path.dirname(state_path), exist_ok=True)
+            with open(state_path, "w", encoding="utf-8") as f:
+                json.dump({"session_uri": session_uri}, f)
+
+    def upload(self, local_path: str, folder_id: str, name: Optional[str] = None,
+               mimetype: str = "video/*", state_dir: Optional[str] = None) -> str:
+        """
+        Upload reprenable. La session est conservée dans `state_dir` (par défaut celui du
+        gestionnaire ; sans dossier d'état, l'upload ne survit pas à un redémarrage).
+        """
+        name = name or os.path.basename(local_path)
+        total = os.path.getsize(local_path)
+        state_path = self._state_path(local_path, folder_id, state_dir)
+        result = {"offset": 0, "file_id": None, "session": self._load_session(state_path)}
+
+        if result["session"]:
+            try:
+                result["offset"], result["file_id"] = self.backend.query_upload(result["session"], total)
+                logger.info(f"⬆️ Reprise de l'upload de {name} à {result['offset']} octets")
+            except TransferError as e:
+                logger.warning(f"Session d'upload non reprenable ({e}), nouvel upload")
+                result["session"] = None
+        if not result["session"]:
+            result["session"] = self.backend.create_upload_session(name, folder_id, total, mimetype)
+            self._save_session(state_path, result["session"])
+
+        def step():
+            if result["file_id"]:
+                return True
+            with open(local_path, "rb") as f:
+                f.seek(result["offset"])
+                data = f.read(self.chunk_size)
+            try:
+                result["offset"], result["file_id"] = self.backend.put_chunk(
+                    result["session"], data, result["offset"], total)
+            except Exception:
+                # Position réelle côté Drive avant de réessayer
+                result["offset"], result["file_id"] = self.backend.query_upload(result["session"], total)
+                raise
+            return result["file_id"] is not None
+
+        self._with_retries(f"Upload {name}", step)
+        if state_path and os.path.exists(state_path):
+            os.remove(state_path)
+        logger.info(f"✅ Fichier '{name}' uploadé vers le dossier ID '{folder_id}', ID du fichier : '{result['file_id']}'")
+        return result["file_id"]
+
+    # ----- pool -----
+
+    def _submit(self, fn, args, on_complete) -> Future:
+        def run():
+            value = fn(*args)
+            if on_complete is not None:
+                on_complete(value)
+            return value
+        return self._executor.submit(run)
+
+    def submit_download(self, file_id: str, dest_path: str,
+                        on_complete: Optional[Callable[[str], None]] = None) -> Future:
+        return self._submit(self.download, (file_id, dest_path), on_complete)
+
+    def submit_upload(self, local_path: str, folder_id: str,
+                      on_complete: Optional[Callable[[str], None]] = None,
+                      state_dir: Optional[str] = None) -> Future:
+        return self._submit(self.upload, (local_path, folder_id, None, "video/*", state_dir), on_complete)
+
+    def download_all(self, items: Iterable[Dict[str, str]], dest_dir: str,
+                     on_complete: Optional[Callable[[str], None]] = None) -> List[Future]:
+        """Télécharge les fichiers listés ({"id", "name"}) en parallèle, chacun remis à on_complete dès la fin"""
+        return [self.submit_download(item["id"], os.path.join(dest_dir, item["name"]), on_complete)
+                for item in items]
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+
+# Gestionnaires partagés, un par service Drive (None : service authentifié par défaut).
+# Le service est conservé avec son gestionnaire pour que son id ne soit pas réattribué.
+_managers: Dict[Optional[int], Tuple[Any, DriveTransferManager]] = {}
+_managers_lock = threading.Lock()
+
+
+def get_transfer_manager(service=None, credentials=None, **kwargs) -> DriveTransferManager:
+    """
+    Gestionnaire de transferts partagé par le processus pour `service` (créé à son premier
+    appel, avec `kwargs`) ; sans service, gestionnaire par défaut du processus.
+    `credentials` : identifiants du service, par défaut ceux de la configuration ; les
+    transferts passent uniquement par eux, jamais par le client googleapiclient partagé.
+    Les sessions d'upload reprenables sont rangées par job (voir upload_state_dir).
+    """
+    key = None if service is None else id(service)
+    with _managers_lock:
+        entry = _managers.get(key)
+        if entry is None:
+            if credentials is None:
+                from video_pipeline.drive import identifiants_drive
+                credentials = identifiants_drive()
+                if credentials is None:
+                    raise TransferError("Identifiants Google Drive indisponibles")
+            entry = _managers[key] = (service, DriveTransferManager(GoogleDriveBackend(credentials), **kwargs))
+        return entry[1]
@@ -1,5 +1,8 @@
 import logging
 
+from video_pipeline.ocr_engines import ocr_engine
+from video_pipeline.translation_dispatcher import dispatch_translations
+
 # ---------- MULTI-OCR ----------
 def ocr_with_fallback(image, ocr_methods=None):
     """
@@ -37,10 +40,9 @@ def ocr_tesseract(image):
     return blocks
 
 def ocr_easyocr(image):
-    import easyocr
     import numpy as np
-    reader = easyocr.Reader(['fr', 'en'], gpu=False)
-    result = reader.readtext(np.array(image))
+    with ocr_engine("easyocr") as reader:
+        result = reader.readtext(np.array(image))
     blocks = []
     for (bbox, text, conf) in result:
         x1, y1 = bbox[0]
@@ -53,10 +55,9 @@ def ocr_easyocr(image):
     return blocks
 
 def ocr_paddle(image):
-    from paddleocr import PaddleOCR
     import numpy as np
-    ocr = PaddleOCR(use_angle_cls=True, lang="fr")
-    result = ocr.ocr(np.array(image), cls=True)
+    with ocr_engine("paddle") as ocr:
+        result = ocr.ocr(np.array(image), cls=True)
     blocks = []
     for line in result[0]:
         txt, conf = line[1][0], line[1][1]
@@ -70,49 +71,51 @@ def ocr_paddle(image):
     return blocks
 
 # ---------- MULTI-API TRADUCTION ----------
-def translate_with_fallback(texts, target_lang="en", engines=None):
+def translate_with_fallback(texts, target_lang="en", engines=None, memory=None):
     """
     Essaie chaque moteur de traduction jusqu'au succès.
     texts: list of str
     engines: liste de fonctions (texts, target_lang) -> [str]
-    Retourne la première traduction non vide.
+    memory: mémoire de traduction (par défaut, la mémoire partagée du processus)
+    Seuls les textes absents de la mémoire sont envoyés aux moteurs, par lots concurrents
+    (voir translation_dispatcher). Lève TranslationError si aucun moteur n'a traduit certains
+    textes (résultat partiel dans `partial`).
     """
+    return translate_many_with_fallback(texts, [target_lang], engines=engines, memory=memory)[target_lang]
+
+def translate_many_with_fallback(texts, target_langs, engines=None, memory=None):
+    """Comme translate_with_fallback, pour plusieurs langues en une passe : {lang: [str]}"""
     if engines is None:
         engines = [translate_google, translate_deepl, translate_gpt]
-    for engine in engines:
-        try:
-            trad = engine(texts, target_lang)
-            if trad and all(t.strip() for t in trad):
-                logging.info(f"Traduction réussie avec {engine.__name__}")
-                return trad
-        except Exception as e:
-            logging.warning(f"Traduction {engine.__name__} échouée : {e}")
-    logging.error("Toutes les API de traduction ont échoué.")
-    return [""] * len(texts)
+    return dispatch_translations(texts, target_langs, engines, memory=memory)
 
 def translate_google(texts, target_lang):
     from googletrans import Translator
     translator = Translator()
-    return [translator.translate(t, dest=target_lang).text for t in texts]
+    # googletrans accepte une liste : une seule requête pour tout le lot
+    return [r.text for r in translator.translate(list(texts), dest=target_lang)]
 
 def translate_deepl(texts, target_lang):
     import deepl
     auth_key = "YOUR_DEEPL_API_KEY"  # À configurer
     translator = deepl.Translator(auth_key)
-    return [translator.translate_text(t, target_lang=target_lang.upper()).text for t in texts]
+    return [r.text for r in translator.translate_text(list(texts), target_lang=target_lang.upper())]
 
 def translate_gpt(texts, target_lang):
+    import json
     import openai
     openai.api_key = "YOUR_OPENAI_API_KEY"
-    results = []
-    for t in texts:
-        prompt = f"Traduire en {target_lang} : {t}"
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=256,
-            temperature=0.2
-        )
-        trad = response.choices[0].message.content.strip()
-        results.append(trad)
-    return results
\ No newline at end of file
+    # Un seul appel pour tout le lot : entrée et sortie au format liste JSON
+    prompt = (f"Traduire en {target_lang} chaque élément de cette liste JSON. "
+              f"Répondre uniquement par une liste JSON de même longueur : "
+              f"{json.dumps(list(texts), ensure_ascii=False)}")
+    response = openai.ChatCompletion.create(
+        model="gpt-3.5-turbo",
+        messages=[{"role": "user", "content": prompt}],
+        max_tokens=256 * len(texts),
+        temperature=0.2
+    )
+    results = json.loads(response.choices[0].message.content.strip())
+    if not isinstance(results, list) or len(results) != len(texts):
+        raise ValueError("Réponse GPT inattendue (longueur de liste différente)")
+    return [str(r).strip() for r in results]
\ No newline at end of file
@@ -0,0 +1,50 @@
+import logging
+from typing import Any, Iterator, Optional, Tuple
+
+import cv2
+
+logger = logging.getLogger(__name__)
+
+
+def compute_sampling_interval(fps: float, duration: float) -> int:
+    """Calcule l'intervalle d'extraction (en frames) selon la durée de la vidéo"""
+    if duration <= 10:  # Vidéos courtes : plus de frames
+        return max(1, int(fps / 2))  # 2 frames par seconde
+    elif duration <= 60:  # Vidéos moyennes
+        return max(1, int(fps))  # 1 frame par seconde
+    else:  # Vidéos longues
+        return max(1, int(fps * 2))  # 1 frame toutes les 2 secondes
+
+
+def iter_sampled_frames(
+    cap: "cv2.VideoCapture",
+    interval: int = 1,
+    max_frames: Optional[int] = None,
+    start_frame: int = 0
+) -> Iterator[Tuple[int, Any]]:
+    """
+    Décode la vidéo une seule fois, du début à la fin, et produit (frame_index, frame_bgr)
+    toutes les `interval` frames.
+
+    Les frames ignorées sont seulement démultiplexées/décodées via `grab()` ; la conversion
+    en tableau BGR (`retrieve()`) n'a lieu que pour les frames conservées. Aucun seek n'est
+    effectué : sur du H.264 chaque `CAP_PROP_POS_FRAMES` force un retour à la keyframe
+    précédente, ce qui rend l'échantillonnage O(N × GOP).
+    """
+    interval = max(1, int(interval))
+    frame_idx = 0
+    yielded = 0
+
+    while max_frames is None or yielded < max_frames:
+        if not cap.grab():
+            break
+
+        if frame_idx >= start_frame and (frame_idx - start_frame) % interval == 0:
+            ret, frame = cap.retrieve()
+            if not ret or frame is None:
+                logger.warning(f"Frame {frame_idx} illisible, ignorée")
+            else:
+                yield frame_idx, frame
+                yielded += 1
+
+        frame_idx += 1
@@ -0,0 +1,93 @@
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Sequence, Tuple
+
+import numpy as np
+
+Box = Tuple[int, int, int, int]
+
+
+def clip_box(box: Box, shape: Tuple[int, ...]) -> Box:
+    """Restreint une box (x, y, w, h) aux dimensions de la frame"""
+    x, y, w, h = (int(v) for v in box)
+    x0, y0 = max(0, x), max(0, y)
+    x1, y1 = min(shape[1], x + w), min(shape[0], y + h)
+    return (x0, y0, max(0, x1 - x0), max(0, y1 - y0))
+
+
+def ring_pixels(frame, box: Box, margin: int) -> np.ndarray:
+    """Pixels de l'anneau de `margin` px autour de la box (hors box), aplatis en float32"""
+    x, y, w, h = box
+    fh, fw = frame.shape[:2]
+    x0, y0 = max(0, x - margin), max(0, y - margin)
+    x1, y1 = min(fw, x + w + margin), min(fh, y + h + margin)
+    parts = [
+        frame[y0:y, x0:x1],          # bande haute
+        frame[y + h:y1, x0:x1],      # bande basse
+        frame[y:y + h, x0:x],        # bande gauche
+        frame[y:y + h, x + w:x1],    # bande droite
+    ]
+    return np.concatenate([p.reshape(-1) for p in parts]).astype(np.float32)
+
+
+@dataclass
+class _CachedPatch:
+    box: Box
+    ring: np.ndarray
+    patch: np.ndarray
+
+
+class TemporalInpaintCache:
+    """
+    Réutilise l'inpainting d'une zone texte statique d'une frame à l'autre.
+    Clé : (id de piste, box). Tant que l'anneau de pixels autour de la box reste proche de
+    celui observé lors de l'inpainting (écart absolu moyen < threshold), le patch inpainté est
+    simplement recollé ; sinon la zone est réinpaintée et le patch mis à jour.
+    """
+
+    def __init__(self, margin: int = 6, threshold: float = 6.0):
+        self.margin = margin
+        self.threshold = threshold
+        self.hits = 0
+        self.misses = 0
+        self._patches: Dict[Hashable, _CachedPatch] = {}
+
+    def apply(self, key: Hashable, frame, box: Box, inpaint_fn: Callable[[Any, Box], Any]):
+        """
+        Retourne la frame avec la zone `box` inpaintée.
+        inpaint_fn(frame, box) -> frame inpaintée (appelée seulement si le fond a changé).
+        """
+        return self.apply_many(frame, [(key, box)], lambda img, boxes: inpaint_fn(img, boxes[0]))
+
+    def apply_many(self, frame, items: Sequence[Tuple[Hashable, Box]],
+                   inpaint_fn: Callable[[Any, List[Box]], Any]):
+        """
+        Variante multi-zones : les patches encore valides sont recollés, puis toutes les zones
+        dont le fond a changé sont inpaintées en un seul appel inpaint_fn(frame, boxes).
+        """
+        stale = []
+        for key, box in items:
+            box = clip_box(box, frame.shape)
+            x, y, w, h = box
+            if w == 0 or h == 0:
+                continue
+
+            ring = ring_pixels(frame, box, self.margin)
+            cached = self._patches.get(key)
+            if (cached is not None and cached.box == box and cached.ring.shape == ring.shape
+                    and (ring.size == 0 or float(np.abs(ring - cached.ring).mean()) < self.threshold)):
+                self.hits += 1
+                frame[y:y + h, x:x + w] = cached.patch
+            else:
+                stale.append((key, box, ring))
+
+        if not stale:
+            return frame
+
+        self.misses += len(stale)
+        result = inpaint_fn(frame, [box for _, box, _ in stale])
+        for key, (x, y, w, h), ring in stale:
+            self._patches[key] = _CachedPatch(box=(x, y, w, h), ring=ring, patch=result[y:y + h, x:x + w].copy())
+        return result
+
+    def forget(self, key: Hashable):
+        self._patches.pop(key, None)
@@ -0,0 +1,137 @@
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+Box = Tuple[int, int, int, int]
+
+INPAINT_METHODS = {"telea": cv2.INPAINT_TELEA, "ns": cv2.INPAINT_NS}
+
+# Contexte (px) conservé autour de chaque zone : suffisant pour le rayon d'inpainting
+DEFAULT_MARGIN = 16
+
+
+def _expand(box: Box, margin: int, shape) -> Tuple[int, int, int, int]:
+    """Box (x, y, w, h) → rectangle (x0, y0, x1, y1) élargi de `margin` et borné à la frame"""
+    x, y, w, h = (int(v) for v in box)
+    return (max(0, x - margin), max(0, y - margin),
+            min(shape[1], x + w + margin), min(shape[0], y + h + margin))
+
+
+def boxes_mask(shape, boxes: Iterable[Box], pad: int = 0) -> np.ndarray:
+    """Masque booléen (H, W) couvrant les boxes (x, y, w, h), élargies de `pad` px"""
+    mask = np.zeros(shape[:2], dtype=bool)
+    for x, y, w, h in boxes:
+        mask[max(0, y - pad):y + h + pad, max(0, x - pad):x + w + pad] = True
+    return mask
+
+
+def mask_roi(mask, margin: int) -> Optional[Tuple[int, int, int, int]]:
+    """Rectangle (x0, y0, x1, y1) englobant les pixels non nuls du masque, élargi de `margin` px"""
+    ys, xs = np.nonzero(mask)
+    if len(xs) == 0:
+        return None
+    h, w = mask.shape[:2]
+    return (max(0, xs.min() - margin), max(0, ys.min() - margin),
+            min(w, xs.max() + 1 + margin), min(h, ys.max() + 1 + margin))
+
+
+def merge_regions(rects: Iterable[Tuple[int, int, int, int]]) -> List[Tuple[int, int, int, int]]:
+    """Fusionne les rectangles (x0, y0, x1, y1) qui se chevauchent, jusqu'à stabilité"""
+    merged = [r for r in rects if r[2] > r[0] and r[3] > r[1]]
+    changed = True
+    while changed:
+        changed = False
+        out: List[Tuple[int, int, int, int]] = []
+        for r in merged:
+            for i, o in enumerate(out):
+                if r[0] < o[2] and o[0] < r[2] and r[1] < o[3] and o[1] < r[3]:
+                    out[i] = (min(r[0], o[0]), min(r[1], o[1]), max(r[2], o[2]), max(r[3], o[3]))
+                    changed = True
+                    break
+            else:
+                out.append(r)
+        merged = out
+    return merged
+
+
+def glyph_mask(region, threshold: int = 40, dilate: int = 2, max_fill: float = 0.6):
+    """
+    Resserre le masque d'une box aux pixels des caractères : le fond est estimé par la médiane
+    du bord de la box, les pixels qui s'en écartent de plus de `threshold` sont gardés puis
+    dilatés (anti-crénelage, contours). Si le seuillage ne trouve rien ou presque tout
+    (fond trop chargé), la box entière est masquée.
+    """
+    gray = cv2.cvtColor(region, cv2.COLOR_RGB2GRAY) if region.ndim == 3 else region
+    border = np.concatenate([gray[0], gray[-1], gray[:, 0], gray[:, -1]])
+    background = float(np.median(border))
+    mask = (np.abs(gray.astype(np.int16) - background) > threshold).astype(np.uint8) * 255
+    fill = np.count_nonzero(mask) / mask.size
+    if fill == 0 or fill > max_fill:
+        return np.full(gray.shape, 255, dtype=np.uint8)
+    if dilate > 0:
+        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (2 * dilate + 1, 2 * dilate + 1))
+        mask = cv2.dilate(mask, kernel)
+    return mask
+
+
+def _inpaint_crops(frame, boxes: Sequence[Box], crop_mask_fn, margin: int, method: str, radius: int):
+    flags = INPAINT_METHODS.get(method, cv2.INPAINT_TELEA)
+    result = frame.copy()
+    for x0, y0, x1, y1 in merge_regions(_expand(b, margin, frame.shape) for b in boxes):
+        crop_mask = crop_mask_fn(x0, y0, x1, y1)
+        if not crop_mask.any():
+            continue
+        crop = np.ascontiguousarray(frame[y0:y1, x0:x1])
+        result[y0:y1, x0:x1] = cv2.inpaint(crop, crop_mask, radius, flags)
+    return result
+
+
+def _tighten(frame, crop_mask, boxes: Sequence[Box], x0: int, y0: int):
+    """Remplace, dans le masque du crop, chaque box par le masque de ses caractères"""
+    for bx, by, bw, bh in boxes:
+        cx0, cy0 = max(bx, x0), max(by, y0)
+        cx1, cy1 = min(bx + bw, x0 + crop_mask.shape[1]), min(by + bh, y0 + crop_mask.shape[0])
+        if cx1 - cx0 < 3 or cy1 - cy0 < 3:
+            continue
+        roi = crop_mask[cy0 - y0:cy1 - y0, cx0 - x0:cx1 - x0]
+        roi &= glyph_mask(frame[cy0:cy1, cx0:cx1])
+    return crop_mask
+
+
+def inpaint_boxes(frame, boxes: Sequence[Box], margin: int = DEFAULT_MARGIN, method: str = "telea",
+                  radius: int = 3, tighten: bool = True):
+    """
+    Efface les boxes (x, y, w, h) de la frame en n'inpaintant que des crops : chaque box
+    élargie de `margin` px de contexte, les crops qui se chevauchent étant fusionnés.
+    Retourne une nouvelle frame.
+    """
+    boxes = [tuple(int(v) for v in b) for b in boxes if b[2] > 0 and b[3] > 0]
+
+    def crop_mask(x0, y0, x1, y1):
+        mask = np.zeros((y1 - y0, x1 - x0), dtype=np.uint8)
+        for bx, by, bw, bh in boxes:
+            mask[max(0, by - y0):max(0, by + bh - y0), max(0, bx - x0):max(0, bx + bw - x0)] = 255
+        return _tighten(frame, mask, boxes, x0, y0) if tighten else mask
+
+    return _inpaint_crops(frame, boxes, crop_mask, margin, method, radius)
+
+
+def inpaint_mask(frame, mask, margin: int = DEFAULT_MARGIN, method: str = "telea",
+                 radius: int = 3, tighten: bool = False, boxes: Optional[Sequence[Box]] = None):
+    """
+    Variante à partir d'un masque plein cadre : les zones sont les composantes connexes
+    du masque (ou `boxes` si fourni), inpaintées crop par crop comme dans inpaint_boxes.
+    """
+    binary = (mask > 0).astype(np.uint8)
+    if boxes is None:
+        n, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+        boxes = [tuple(int(v) for v in stats[i, :4]) for i in range(1, n)]
+    if not boxes:
+        return frame.copy()
+
+    def crop_mask(x0, y0, x1, y1):
+        crop = binary[y0:y1, x0:x1] * 255
+        return _tighten(frame, crop, boxes, x0, y0) if tighten else crop
+
+    return _inpaint_crops(frame, boxes, crop_mask, margin, method, radius)
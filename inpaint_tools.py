@@ -1,15 +1,16 @@
 import cv2
 import numpy as np
 
+from video_pipeline.inpaint_engine import inpaint_boxes
+
 def inpaint_text_on_frame(frame, bbox):
     """
     Efface la zone bbox (format: 4 points ou x,y,w,h) de la frame via inpainting OpenCV.
+    Seul le rectangle englobant (plus une marge de contexte) est inpainté.
     """
-    mask = np.zeros(frame.shape[:2], np.uint8)
-    # Pour bbox 4 points:
-    pts = np.array([bbox], dtype=np.int32)
-    cv2.fillPoly(mask, pts, 255)
-    # Pour bbox x,y,w,h, décommente:
-    # x, y, w, h = bbox; mask[y:y+h, x:x+w] = 255
-    inpainted = cv2.inpaint(frame, mask, 3, cv2.INPAINT_TELEA)
-    return inpainted
\ No newline at end of file
+    if len(bbox) == 4 and np.ndim(bbox[0]) == 0:
+        box = tuple(int(v) for v in bbox)
+    else:
+        # Pour bbox 4 points : rectangle englobant du polygone
+        box = cv2.boundingRect(np.array(bbox, dtype=np.int32))
+    return inpaint_boxes(frame, [box])
@@ -0,0 +1,130 @@
+import logging
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from video_pipeline.text_presence import text_line_mask
+
+logger = logging.getLogger(__name__)
+
+
+class TextChangeSelector:
+    """
+    Sélectionne, dans un flux de frames décodées, celles dont la zone texte a changé
+    depuis la dernière frame envoyée à l'OCR.
+
+    Les deux signaux sont restreints aux lignes de texte probables d'une miniature en niveaux
+    de gris (text_line_mask), si bien qu'un mouvement de caméra ou du sujet hors texte ne
+    déclenche pas d'OCR :
+    - différence absolue moyenne des pixels dans les zones texte (changement de légende)
+    - profil de densité de contours par ligne dans les zones texte (apparition / disparition
+      de lignes de texte)
+    """
+
+    def __init__(
+        self,
+        diff_threshold: float = 0.04,
+        edge_threshold: float = 0.1,
+        max_gap_frames: Optional[int] = None,
+        thumb_width: int = 192
+    ):
+        self.diff_threshold = diff_threshold
+        self.edge_threshold = edge_threshold
+        self.max_gap_frames = max_gap_frames
+        self.thumb_width = thumb_width
+        self._last = None
+        self._last_idx = None
+
+    def signature(self, frame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(miniature, masque des lignes de texte, profil de contours par ligne dans ce masque)"""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        h, w = gray.shape[:2]
+        thumb_h = max(1, int(h * self.thumb_width / max(1, w)))
+        thumb = cv2.resize(gray, (self.thumb_width, thumb_h), interpolation=cv2.INTER_AREA)
+        mask, edges = text_line_mask(thumb)
+        profile = ((edges > 0) & mask).mean(axis=1, dtype=np.float32)
+        total = profile.sum()
+        if total > 0:
+            profile /= total
+        return thumb.astype(np.float32), mask, profile
+
+    def changed(self, frame_idx: int, signature) -> bool:
+        """La frame diffère-t-elle, dans ses zones texte, de la dernière frame acceptée ?"""
+        if self._last is None or signature[0].shape != self._last[0].shape:
+            return True
+        if self.max_gap_frames is not None and frame_idx - self._last_idx >= self.max_gap_frames:
+            return True
+        thumb, mask, profile = signature
+        last_thumb, last_mask, last_profile = self._last
+        union = mask | last_mask
+        pixel_diff = float(np.abs(thumb - last_thumb)[union].mean()) / 255.0 if union.any() else 0.0
+        edge_diff = float(np.abs(profile - last_profile).sum()) / 2.0
+        return pixel_diff >= self.diff_threshold or edge_diff >= self.edge_threshold
+
+    def accept(self, frame_idx: int, signature):
+        """Mémorise la frame envoyée à l'OCR comme nouvelle référence"""
+        self._last = signature
+        self._last_idx = frame_idx
+
+    def is_keyframe(self, frame_idx: int, frame) -> bool:
+        """Retourne True si la frame doit être envoyée à l'OCR (et la mémorise comme référence)"""
+        signature = self.signature(frame)
+        keep = self.changed(frame_idx, signature)
+        if keep:
+            self.accept(frame_idx, signature)
+        return keep
+
+
+def select_keyframes(
+    frames: Iterable[Tuple[int, Any]],
+    selector: TextChangeSelector,
+    min_gap_frames: Optional[int] = None,
+    baseline_frames: Optional[int] = None,
+    stats: Optional[Dict[str, Any]] = None
+) -> Iterator[Tuple[int, Any]]:
+    """
+    Filtre un flux (frame_index, frame) pour ne garder que les frames dont le texte a changé.
+    - min_gap_frames : écart minimal entre deux frames OCR, pour répartir un budget de frames
+      sur toute la durée de la vidéo ; un changement survenu trop tôt est reporté à la première
+      candidate qui respecte l'écart, au lieu d'arrêter la sélection ; s'il est encore en attente
+      à la fin du flux, la dernière candidate est émise pour que ce texte soit lu
+    - baseline_frames : nombre de frames du planning fixe remplacé, référence de `ocr_calls_saved`
+    `stats` (optionnel) est mis à jour au fil de l'eau avec les compteurs de sélection.
+    """
+    if stats is None:
+        stats = {}
+    stats.update({"decoded_candidates": 0, "ocr_frames": 0, "deferred_changes": 0})
+    last_idx = None
+    pending = None  # dernière candidate (frame_idx, frame, signature) d'un changement reporté
+
+    for frame_idx, frame in frames:
+        stats["decoded_candidates"] += 1
+        signature = selector.signature(frame)
+        changed = pending is not None or selector.changed(frame_idx, signature)
+        if changed and min_gap_frames and last_idx is not None and frame_idx - last_idx < min_gap_frames:
+            if pending is None:
+                stats["deferred_changes"] += 1
+            pending = (frame_idx, frame, signature)
+            continue
+        if changed:
+            selector.accept(frame_idx, signature)
+            last_idx, pending = frame_idx, None
+            stats["ocr_frames"] += 1
+            yield frame_idx, frame
+
+    if pending is not None:
+        # Changement survenu dans les dernières frames : lu sur la dernière candidate
+        frame_idx, frame, signature = pending
+        selector.accept(frame_idx, signature)
+        stats["ocr_frames"] += 1
+        yield frame_idx, frame
+
+    baseline = baseline_frames if baseline_frames is not None else stats["decoded_candidates"]
+    stats["baseline_frames"] = baseline
+    stats["ocr_calls_saved"] = max(0, baseline - stats["ocr_frames"])
+    logger.info(
+        f"Sélection de keyframes : {stats['ocr_frames']} frames envoyées à l'OCR sur "
+        f"{stats['decoded_candidates']} candidates ({stats['ocr_calls_saved']} appels économisés "
+        f"par rapport au planning fixe de {baseline} frames)"
+    )
@@ -0,0 +1,149 @@
+import logging
+import threading
+import time
+
+import cv2
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+from video_pipeline.inpaint_engine import boxes_mask, inpaint_mask, mask_roi
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LAMA_URL = "http://localhost:5000/inpaint"
+
+
+class CircuitBreaker:
+    """
+    Disjoncteur : après `failure_threshold` échecs consécutifs, le service est considéré
+    indisponible pendant `reset_timeout` secondes (appels court-circuités), puis un appel
+    d'essai est autorisé.
+    """
+
+    def __init__(self, failure_threshold=2, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                # Semi-ouvert : un appel d'essai, réarmé immédiatement en cas de nouvel échec
+                self.opened_at = None
+                self.failures = self.failure_threshold - 1
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold and self.opened_at is None:
+                self.opened_at = time.monotonic()
+                logger.warning(f"Inpainting IA indisponible, bascule OpenCV pendant {self.reset_timeout:.0f}s")
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None
+
+
+class LamaInpaintClient:
+    """
+    Client du serveur d'inpainting LaMa :
+    - session HTTP keep-alive (connexions réutilisées entre frames)
+    - une seule requête par frame : toutes les boxes fusionnées dans un masque
+    - seule la zone utile (masque + marge de contexte) est envoyée, en PNG à compression rapide
+    - disjoncteur : bascule immédiate sur OpenCV quand le serveur ne répond plus
+    """
+
+    def __init__(self, url=DEFAULT_LAMA_URL, connect_timeout=0.5, read_timeout=30.0,
+                 context_margin=32, png_compression=1, breaker=None, pool_size=4):
+        self.url = url
+        self.timeout = (connect_timeout, read_timeout)
+        self.context_margin = context_margin
+        self.png_params = [cv2.IMWRITE_PNG_COMPRESSION, png_compression]
+        self.breaker = breaker or CircuitBreaker()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.requests_sent = 0
+
+    def _request(self, crop_rgb, crop_mask):
+        _, frame_png = cv2.imencode('.png', cv2.cvtColor(crop_rgb, cv2.COLOR_RGB2BGR), self.png_params)
+        _, mask_png = cv2.imencode('.png', crop_mask, self.png_params)
+        files = {
+            'image': ('frame.png', frame_png.tobytes(), 'image/png'),
+            'mask': ('mask.png', mask_png.tobytes(), 'image/png')
+        }
+        self.requests_sent += 1
+        response = self.session.post(self.url, files=files, timeout=self.timeout)
+        response.raise_for_status()
+        result = cv2.imdecode(np.frombuffer(response.content, np.uint8), cv2.IMREAD_COLOR)
+        if result is None or result.shape[:2] != crop_rgb.shape[:2]:
+            raise ValueError("Réponse d'inpainting invalide")
+        return cv2.cvtColor(result, cv2.COLOR_BGR2RGB)
+
+    def inpaint(self, frame, mask, fallback=None):
+        """
+        Inpainte `frame` (RGB) sur `mask`. Retourne une nouvelle frame.
+        fallback(frame, mask) est utilisé si le serveur échoue ou si le disjoncteur est ouvert
+        (par défaut inpainting OpenCV TELEA par crops, masque resserré aux caractères).
+        """
+        if fallback is None:
+            fallback = _opencv_fallback
+        roi = mask_roi(mask, self.context_margin)
+        if roi is None:
+            return frame
+        if not self.breaker.allow():
+            return fallback(frame, mask)
+
+        x0, y0, x1, y1 = roi
+        crop_mask = mask[y0:y1, x0:x1]
+        try:
+            inpainted = self._request(np.ascontiguousarray(frame[y0:y1, x0:x1]), crop_mask)
+        except Exception as e:
+            logger.warning(f"Inpainting IA échoué ({e}), fallback OpenCV.")
+            self.breaker.record_failure()
+            return fallback(frame, mask)
+
+        self.breaker.record_success()
+        result = frame.copy()
+        # Seuls les pixels masqués sont remplacés : le contexte reste strictement identique
+        region = result[y0:y1, x0:x1]
+        region[crop_mask > 0] = inpainted[crop_mask > 0]
+        return result
+
+    def inpaint_boxes(self, frame, boxes, fallback=None):
+        """Fusionne toutes les boxes d'une frame en un masque et une seule requête"""
+        mask = boxes_mask(frame.shape, boxes).astype(np.uint8) * 255  # 255 = à effacer
+        return self.inpaint(frame, mask, fallback=fallback)
+
+    def close(self):
+        self.session.close()
+
+
+def _opencv_fallback(frame, mask):
+    return inpaint_mask(frame, mask, tighten=True)
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def get_lama_client():
+    """Client LaMa partagé par le processus (session et disjoncteur communs)"""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = LamaInpaintClient()
+        return _default_client
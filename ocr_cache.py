@@ -0,0 +1,161 @@
+import copy
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# À incrémenter si le format des blocs OCR ou le prétraitement change
+OCR_CACHE_VERSION = 2
+
+_BACKEND_PACKAGES = ("pytesseract", "easyocr", "paddleocr")
+
+
+def frame_digest(frame) -> str:
+    """
+    Empreinte exacte des pixels de la frame (dimensions comprises).
+    Un hash perceptuel de la frame entière ne voit presque pas un sous-titre : deux légendes
+    différentes sur le même fond partageraient leur résultat OCR.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{frame.shape}|{frame.dtype.str}".encode())
+    h.update(memoryview(frame if frame.flags.c_contiguous else frame.copy()).cast("B"))
+    return h.hexdigest()
+
+
+def ocr_backend_signature(backends=_BACKEND_PACKAGES) -> str:
+    """Identifie la chaîne OCR (noms + versions installées) pour invalider le cache en cas de mise à jour"""
+    from importlib import metadata
+
+    parts = []
+    for name in backends:
+        try:
+            version = metadata.version(name)
+        except Exception:
+            version = "absent"
+        parts.append(f"{name}={version}")
+    return f"v{OCR_CACHE_VERSION}:" + ",".join(parts)
+
+
+class OCRResultCache:
+    """
+    Cache des résultats OCR bruts, adressé par l'empreinte exacte de la frame (frame_digest).
+    - tier mémoire : LRU
+    - tier disque : SQLite sous le dossier de sortie, éviction par ancienneté d'accès
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        backend: Optional[str] = None,
+        memory_entries: int = 512,
+        max_disk_entries: int = 20000
+    ):
+        self.backend = backend or ocr_backend_signature()
+        self.memory_entries = memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+
+        if db_path:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS ocr_results ("
+                " frame_key TEXT NOT NULL, backend TEXT NOT NULL, blocks TEXT NOT NULL,"
+                " last_access REAL NOT NULL, PRIMARY KEY (frame_key, backend))"
+            )
+            self._conn.commit()
+
+    def _memory_lookup(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        blocks = self._memory.get(key)
+        if blocks is not None:
+            self._memory.move_to_end(key)
+        return blocks
+
+    def _memory_store(self, key: str, blocks: List[Dict[str, Any]]):
+        self._memory[key] = blocks
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            blocks = self._memory_lookup(key)
+            if blocks is None and self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT blocks FROM ocr_results WHERE frame_key = ? AND backend = ?",
+                    (key, self.backend)
+                ).fetchone()
+                if row is not None:
+                    blocks = json.loads(row[0])
+                    self._conn.execute(
+                        "UPDATE ocr_results SET last_access = ? WHERE frame_key = ? AND backend = ?",
+                        (time.time(), key, self.backend)
+                    )
+                    self._conn.commit()
+                    self._memory_store(key, blocks)
+
+            if blocks is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return copy.deepcopy(blocks)
+
+    def put(self, key: str, blocks: List[Dict[str, Any]]):
+        stored = [{k: v for k, v in b.items() if k != "frame_idx"} for b in blocks]
+        with self._lock:
+            self._memory_store(key, stored)
+            if self._conn is None:
+                return
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ocr_results (frame_key, backend, blocks, last_access) VALUES (?, ?, ?, ?)",
+                (key, self.backend, json.dumps(stored, ensure_ascii=False), time.time())
+            )
+            self._evict_disk()
+            self._conn.commit()
+
+    def _evict_disk(self):
+        count = self._conn.execute("SELECT COUNT(*) FROM ocr_results").fetchone()[0]
+        if count <= self.max_disk_entries:
+            return
+        # On libère 10 % de marge pour ne pas évincer à chaque insertion
+        excess = count - int(self.max_disk_entries * 0.9)
+        self._conn.execute(
+            "DELETE FROM ocr_results WHERE rowid IN ("
+            " SELECT rowid FROM ocr_results ORDER BY last_access ASC LIMIT ?)",
+            (excess,)
+        )
+        logger.debug(f"Cache OCR : {excess} entrées évincées")
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_caches: Dict[str, OCRResultCache] = {}
+_caches_lock = threading.Lock()
+
+
+def open_ocr_cache(cache_dir: Optional[str] = None, **kwargs) -> OCRResultCache:
+    """Retourne le cache OCR du dossier donné (une instance par processus et par dossier)"""
+    key = os.path.abspath(cache_dir) if cache_dir else ""
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            db_path = os.path.join(cache_dir, "ocr_cache.sqlite") if cache_dir else None
+            cache = OCRResultCache(db_path=db_path, **kwargs)
+            _caches[key] = cache
+        return cache
@@ -0,0 +1,108 @@
+import logging
+import threading
+from contextlib import contextmanager
+
+# ---------- REGISTRE DES MOTEURS OCR ----------
+# Chaque backend est chargé paresseusement, une seule fois par processus.
+# - thread_safe=False : une instance partagée, accès sérialisé par un verrou
+# - per_worker=True   : une instance par thread (backends gourmands en parallèle)
+
+
+def _create_easyocr():
+    import easyocr
+    return easyocr.Reader(['fr', 'en'], gpu=False)
+
+
+def _create_paddle():
+    from paddleocr import PaddleOCR
+    return PaddleOCR(use_angle_cls=True, lang="fr")
+
+
+_BACKENDS = {
+    "easyocr": {"factory": _create_easyocr, "thread_safe": False, "per_worker": False},
+    "paddle": {"factory": _create_paddle, "thread_safe": False, "per_worker": False},
+}
+
+_registry_lock = threading.Lock()
+_shared_engines = {}
+_engine_locks = {}
+# Instances per_worker de tous les threads (ident du thread -> {backend: moteur}),
+# pour que release_ocr_engines puisse les libérer depuis n'importe quel thread
+_worker_engines = {}
+
+
+def register_ocr_backend(name, factory, thread_safe=False, per_worker=False):
+    """Déclare (ou remplace) un backend OCR : factory() -> instance du moteur."""
+    with _registry_lock:
+        _BACKENDS[name] = {"factory": factory, "thread_safe": thread_safe, "per_worker": per_worker}
+        _shared_engines.pop(name, None)
+        for engines in _worker_engines.values():
+            engines.pop(name, None)
+
+
+def _load_shared(name):
+    engine = _shared_engines.get(name)
+    if engine is not None:
+        return engine
+    with _registry_lock:
+        engine = _shared_engines.get(name)
+        if engine is None:
+            logging.info(f"Chargement du moteur OCR '{name}'")
+            engine = _BACKENDS[name]["factory"]()
+            _shared_engines[name] = engine
+            _engine_locks.setdefault(name, threading.Lock())
+        return engine
+
+
+def _load_per_worker(name):
+    with _registry_lock:
+        engines = _worker_engines.setdefault(threading.get_ident(), {})
+    if name not in engines:
+        logging.info(f"Chargement du moteur OCR '{name}' pour {threading.current_thread().name}")
+        engines[name] = _BACKENDS[name]["factory"]()
+    return engines[name]
+
+
+@contextmanager
+def ocr_engine(name):
+    """
+    Fournit le moteur OCR `name` prêt à l'emploi.
+    L'accès est sérialisé si le backend n'est pas thread-safe.
+    """
+    if name not in _BACKENDS:
+        raise KeyError(f"Backend OCR inconnu : {name}")
+    spec = _BACKENDS[name]
+    if spec["per_worker"]:
+        yield _load_per_worker(name)
+        return
+    engine = _load_shared(name)
+    if spec["thread_safe"]:
+        yield engine
+    else:
+        with _engine_locks[name]:
+            yield engine
+
+
+def warm_up_ocr_engines(names=None):
+    """Charge les modèles à l'avance (une seule fois) pour que le premier frame ne paie pas le chargement."""
+    loaded = []
+    for name in names or list(_BACKENDS):
+        try:
+            with ocr_engine(name):
+                pass
+            loaded.append(name)
+        except Exception as e:
+            logging.warning(f"Préchargement OCR '{name}' impossible : {e}")
+    return loaded
+
+
+def release_ocr_engines(names=None):
+    """Libère les moteurs chargés, partagés ou propres à chaque thread (fin de lot, tests)."""
+    with _registry_lock:
+        for name in names or list(_shared_engines):
+            _shared_engines.pop(name, None)
+        for ident, engines in list(_worker_engines.items()):
+            for name in names or list(engines):
+                engines.pop(name, None)
+            if not engines:
+                del _worker_engines[ident]
@@ -0,0 +1,257 @@
+import logging
+import queue
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from video_pipeline.fallback_tools import ocr_with_fallback
+from video_pipeline.ocr_cache import OCRResultCache, frame_digest
+from video_pipeline.ocr_engines import warm_up_ocr_engines
+
+logger = logging.getLogger(__name__)
+
+
+def filter_ocr_blocks(blocks: List[Dict[str, Any]], frame_idx: int, min_conf: float) -> List[Dict[str, Any]]:
+    """Filtrage par confiance et rattachement des blocs à leur frame"""
+    valid_blocks = []
+    for block in blocks:
+        if block.get('conf', 0) >= min_conf:
+            block['frame_idx'] = frame_idx
+            valid_blocks.append(block)
+        else:
+            logger.debug(f"Block ignoré (confiance trop faible): {block.get('conf', 0)}")
+
+    return valid_blocks
+
+
+def ocr_frame_blocks(frame_idx: int, frame, min_conf: float,
+                     cache: Optional[OCRResultCache] = None) -> List[Dict[str, Any]]:
+    """OCR d'une frame + filtrage par confiance (logique commune aux modes thread et process)"""
+    logger.debug(f"Traitement OCR frame {frame_idx}, type: {type(frame)}")
+
+    # Vérification de la validité du frame
+    if frame is None or frame.size == 0:
+        logger.warning(f"Frame {frame_idx} invalide, ignorée")
+        return []
+
+    if cache is None:
+        return filter_ocr_blocks(ocr_with_fallback(frame), frame_idx, min_conf)
+
+    key = frame_digest(frame)
+    blocks = cache.get(key)
+    if blocks is None:
+        blocks = ocr_with_fallback(frame)
+        cache.put(key, blocks)
+    else:
+        logger.debug(f"Frame {frame_idx} : résultat OCR servi par le cache")
+    return filter_ocr_blocks(blocks, frame_idx, min_conf)
+
+
+# ---------- CÔTÉ WORKER ----------
+# Segments partagés déjà ouverts par ce processus worker (nom -> SharedMemory)
+_attached_segments: Dict[str, shared_memory.SharedMemory] = {}
+
+
+def _attach_segment(name: str) -> shared_memory.SharedMemory:
+    shm = _attached_segments.get(name)
+    if shm is None:
+        # Le segment appartient au processus parent, seul responsable de son unlink
+        if sys.version_info >= (3, 13):
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            shm = shared_memory.SharedMemory(name=name)
+        _attached_segments[name] = shm
+    return shm
+
+
+def _init_worker(warmup_backends: Optional[Sequence[str]]):
+    if warmup_backends:
+        warm_up_ocr_engines(warmup_backends)
+
+
+def _ocr_from_slot(slot_name: str, shape: Tuple[int, ...], dtype: str) -> List[Dict[str, Any]]:
+    shm = _attach_segment(slot_name)
+    frame = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+    return ocr_with_fallback(frame)
+
+
+def _ocr_from_array(frame) -> List[Dict[str, Any]]:
+    return ocr_with_fallback(frame)
+
+
+# ---------- CÔTÉ PARENT ----------
+class SharedFrameRing:
+    """Anneau de segments de mémoire partagée, chacun dimensionné pour une frame"""
+
+    def __init__(self, n_slots: int, slot_size: int):
+        self.slot_size = slot_size
+        self.slots = [shared_memory.SharedMemory(create=True, size=slot_size) for _ in range(n_slots)]
+        self._free = queue.Queue()
+        for i in range(n_slots):
+            self._free.put(i)
+
+    def try_acquire(self) -> Optional[int]:
+        try:
+            return self._free.get_nowait()
+        except queue.Empty:
+            return None
+
+    def write(self, slot: int, frame) -> str:
+        shm = self.slots[slot]
+        view = np.ndarray(frame.shape, dtype=frame.dtype, buffer=shm.buf)
+        view[...] = frame
+        return shm.name
+
+    def release(self, slot: int):
+        self._free.put(slot)
+
+    def close(self):
+        for shm in self.slots:
+            try:
+                shm.close()
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+        self.slots = []
+
+
+class ProcessOCRExecutor:
+    """
+    Exécute l'OCR dans un pool de processus.
+    Les frames transitent par un anneau de segments `shared_memory` (pas de pickling des
+    tableaux) et chaque worker garde son propre moteur OCR chaud.
+    Le cache OCR éventuel est consulté et alimenté côté parent.
+
+    Le pool et ses anneaux vivent d'un appel de `process` à l'autre (les moteurs ne sont
+    chargés qu'une fois par worker) ; plusieurs threads peuvent appeler `process` en même
+    temps. `shutdown` arrête les workers et libère les segments.
+    """
+
+    def __init__(self, max_workers: int = 4, min_conf: float = 0.5,
+                 n_slots: int = 0, warmup_backends: Optional[Sequence[str]] = None,
+                 cache: Optional[OCRResultCache] = None):
+        self.max_workers = max_workers
+        self.min_conf = min_conf
+        self.n_slots = n_slots or max_workers * 2
+        self.warmup_backends = warmup_backends
+        self.cache = cache
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # Anneaux libres (réutilisés par les appels suivants) et anneaux prêtés à un appel en cours
+        self._free_rings: List[SharedFrameRing] = []
+        self._rings: List[SharedFrameRing] = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                                 initargs=(self.warmup_backends,))
+            return self._pool
+
+    def _borrow_ring(self, nbytes: int) -> SharedFrameRing:
+        # Plus petit anneau libre assez grand ; sinon un nouvel anneau dimensionné pour cette frame
+        with self._lock:
+            fitting = [ring for ring in self._free_rings if ring.slot_size >= nbytes]
+            if fitting:
+                ring = min(fitting, key=lambda r: r.slot_size)
+                self._free_rings.remove(ring)
+                return ring
+            ring = SharedFrameRing(self.n_slots, nbytes)
+            self._rings.append(ring)
+            return ring
+
+    def _return_ring(self, ring: SharedFrameRing):
+        with self._lock:
+            if ring in self._rings:
+                self._free_rings.append(ring)
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            pool, self._pool = self._pool, None
+            rings, self._rings, self._free_rings = self._rings, [], []
+        if pool is not None:
+            pool.shutdown(wait=wait)
+        for ring in rings:
+            ring.close()
+
+    def process(self, frames: Iterable[Tuple[int, Any]], cache: Optional[OCRResultCache] = None,
+                min_conf: Optional[float] = None) -> List[Dict[str, Any]]:
+        """OCR des frames ; `cache` et `min_conf` remplacent ceux du constructeur pour cet appel"""
+        cache = cache if cache is not None else self.cache
+        min_conf = self.min_conf if min_conf is None else min_conf
+        executor = self._executor()
+        ocr_boxes = []
+        ring = None
+        pending = {}
+
+        def collect(done_futures):
+            for future in done_futures:
+                frame_idx, slot, cache_key = pending.pop(future)
+                if slot is not None:
+                    ring.release(slot)
+                try:
+                    blocks = future.result()
+                    if cache is not None:
+                        cache.put(cache_key, blocks)
+                    ocr_boxes.extend(filter_ocr_blocks(blocks, frame_idx, min_conf))
+                except Exception as e:
+                    logger.error(f"Erreur dans le traitement OCR (process) frame {frame_idx}: {e}")
+
+        try:
+            for frame_idx, frame in frames:
+                if frame is None or frame.size == 0:
+                    logger.warning(f"Frame {frame_idx} invalide, ignorée")
+                    continue
+                cache_key = None
+                if cache is not None:
+                    cache_key = frame_digest(frame)
+                    cached = cache.get(cache_key)
+                    if cached is not None:
+                        ocr_boxes.extend(filter_ocr_blocks(cached, frame_idx, min_conf))
+                        continue
+
+                frame = np.ascontiguousarray(frame)
+                if ring is None:
+                    ring = self._borrow_ring(frame.nbytes)
+
+                slot = ring.try_acquire()
+                while slot is None:
+                    # Contre-pression : tous les slots sont occupés par des frames en cours
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                    slot = ring.try_acquire()
+
+                if frame.nbytes <= ring.slot_size:
+                    name = ring.write(slot, frame)
+                    future = executor.submit(_ocr_from_slot, name, frame.shape, frame.dtype.str)
+                else:
+                    # Frame plus grande que les slots (changement de résolution) : envoi classique
+                    logger.debug(f"Frame {frame_idx} hors gabarit, transmise par pickling")
+                    future = executor.submit(_ocr_from_array, frame)
+                pending[future] = (frame_idx, slot, cache_key)
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+        finally:
+            # Le pool reste ouvert : on n'attend que les frames de cet appel avant de rendre l'anneau
+            for future in pending:
+                future.cancel()
+            wait(pending)
+            if ring is not None:
+                for _, slot, _ in pending.values():
+                    if slot is not None:
+                        ring.release(slot)
+                self._return_ring(ring)
+
+        return ocr_boxes
@@ -0,0 +1,120 @@
+import os
+from dataclasses import dataclass
+from typing import Any, Iterable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+Box = Tuple[int, int, int, int]
+
+# Marge de sécurité (fraction de la largeur / hauteur du cadre) pour replacer les overlays
+SAFE_MARGIN = 0.04
+
+
+@dataclass(frozen=True)
+class OutputProfile:
+    """
+    Un format de sortie. width/height à 0 : dimensions de la source.
+    fit = "crop" remplit le cadre (recadrage centré), "pad" garde toute l'image (bandes noires).
+    """
+    name: str
+    width: int = 0
+    height: int = 0
+    fit: str = "crop"
+    quality: Optional[str] = None
+
+
+SOURCE_PROFILE = OutputProfile("source")
+
+PROFILE_PRESETS = {
+    "source": SOURCE_PROFILE,
+    "9x16": OutputProfile("9x16", 1080, 1920),
+    "9x16_720": OutputProfile("9x16_720", 720, 1280),
+    "1x1": OutputProfile("1x1", 1080, 1080),
+    "16x9": OutputProfile("16x9", 1920, 1080),
+    "16x9_720": OutputProfile("16x9_720", 1280, 720),
+}
+
+
+def resolve_profiles(specs: Optional[Iterable[Any]]) -> List[OutputProfile]:
+    """Noms de préréglages, dicts {name, width, height, fit, quality} ou OutputProfile"""
+    profiles = []
+    for spec in specs or ["source"]:
+        if isinstance(spec, OutputProfile):
+            profile = spec
+        elif isinstance(spec, dict):
+            profile = OutputProfile(**spec)
+        elif spec in PROFILE_PRESETS:
+            profile = PROFILE_PRESETS[spec]
+        else:
+            raise ValueError(f"Profil de sortie inconnu : {spec} (préréglages : {sorted(PROFILE_PRESETS)})")
+        if profile.fit not in ("crop", "pad"):
+            raise ValueError(f"Profil {profile.name} : fit doit valoir 'crop' ou 'pad'")
+        profiles.append(profile)
+    names = [p.name for p in profiles]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Noms de profils en double : {names}")
+    return profiles
+
+
+def profile_output_path(path: str, profile: OutputProfile) -> str:
+    """video_edited_en.mp4 → video_edited_en_9x16.mp4 (la source garde le chemin d'origine)"""
+    if profile.name == SOURCE_PROFILE.name:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}_{profile.name}{ext}"
+
+
+class ProfileTransform:
+    """
+    Passage des coordonnées de la source à celles d'un profil : mise à l'échelle puis
+    recadrage (offset > 0) ou bandes (offset < 0) centrés. Calculé une fois par profil.
+    """
+
+    def __init__(self, profile: OutputProfile, src_size: Tuple[int, int]):
+        src_w, src_h = (int(v) for v in src_size)
+        self.profile = profile
+        self.name = profile.name
+        self.width = profile.width or src_w
+        self.height = profile.height or src_h
+        fx, fy = self.width / src_w, self.height / src_h
+        self.scale = max(fx, fy) if profile.fit == "crop" else min(fx, fy)
+        self.scaled = (max(1, round(src_w * self.scale)), max(1, round(src_h * self.scale)))
+        self.offset = ((self.scaled[0] - self.width) // 2, (self.scaled[1] - self.height) // 2)
+        self.identity = self.scaled == (src_w, src_h) and self.offset == (0, 0)
+
+    def apply(self, frame):
+        """Frame source → frame du profil (la frame elle-même si le profil est la source)"""
+        if self.identity:
+            return frame
+        interpolation = cv2.INTER_AREA if self.scale < 1 else cv2.INTER_LINEAR
+        resized = cv2.resize(frame, self.scaled, interpolation=interpolation)
+        ox, oy = self.offset
+        if ox >= 0 and oy >= 0:
+            return np.ascontiguousarray(resized[oy:oy + self.height, ox:ox + self.width])
+        out = np.zeros((self.height, self.width) + frame.shape[2:], dtype=frame.dtype)
+        sx, sy = max(ox, 0), max(oy, 0)
+        dx, dy = max(-ox, 0), max(-oy, 0)
+        cw, ch = min(self.scaled[0] - sx, self.width - dx), min(self.scaled[1] - sy, self.height - dy)
+        out[dy:dy + ch, dx:dx + cw] = resized[sy:sy + ch, sx:sx + cw]
+        return out
+
+    def map_box(self, box: Box) -> Box:
+        x, y, w, h = box
+        s, (ox, oy) = self.scale, self.offset
+        return (round(x * s) - ox, round(y * s) - oy, max(1, round(w * s)), max(1, round(h * s)))
+
+    def layout(self, box: Box) -> Box:
+        """
+        Zone d'un overlay dans le profil : box source transformée, puis ramenée dans la zone
+        de sécurité du cadre (un sous-titre coupé par un recadrage 9:16 est resserré et recentré,
+        le texte se réajuste à la nouvelle largeur). La source garde la mise en page d'origine.
+        """
+        if self.identity:
+            return tuple(box)
+        x, y, w, h = self.map_box(box)
+        mx, my = round(self.width * SAFE_MARGIN), round(self.height * SAFE_MARGIN)
+        w, h = min(w, self.width - 2 * mx), min(h, self.height - 2 * my)
+        x = min(max(x, mx), self.width - mx - w)
+        y = min(max(y, my), self.height - my - h)
+        return (x, y, w, h)
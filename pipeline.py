@@ -1,25 +1,35 @@
+import atexit
 import cv2
 import os
 import sys
 import logging
-from typing import List, Dict, Optional, Tuple, Any
-from dataclasses import dataclass
+import threading
+import time
+from typing import List, Dict, Optional, Tuple, Any, Iterable, Iterator
+from dataclasses import asdict, dataclass
 from contextlib import contextmanager
-from functools import lru_cache
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
 import json
 from pathlib import Path
-from difflib import SequenceMatcher
 
 # Imports des modules existants
 from video_pipeline.auto_analyse import analyse_video_type
-from video_pipeline.ocr_cleaning import clean_ocr_blocks
-from video_pipeline.translation import translate_blocks
-from video_pipeline.video_editing import edit_video_with_translations
+from video_pipeline.ocr_cleaning import filter_by_confidence, remove_symbols
+from video_pipeline.video_editing import edit_video_multilang
+from video_pipeline.output_profiles import resolve_profiles
 from video_pipeline.audio_sync import generate_tts_segments, align_overlay_timing_with_tts, merge_audio_on_video
 from video_pipeline.quality_control import generate_quality_report
-from video_pipeline.fallback_tools import ocr_with_fallback, translate_with_fallback
+from video_pipeline.fallback_tools import translate_many_with_fallback
+from video_pipeline.translation_dispatcher import TranslationError
+from video_pipeline.translation_memory import get_translation_memory
+from video_pipeline.frame_sampler import compute_sampling_interval, iter_sampled_frames
+from video_pipeline.keyframe_selector import TextChangeSelector, select_keyframes
+from video_pipeline.ocr_executor import ProcessOCRExecutor, ocr_frame_blocks
+from video_pipeline.ocr_cache import OCRResultCache, frame_digest, open_ocr_cache
+from video_pipeline.transcription import get_transcription
+from video_pipeline.stage_cache import StageCache, file_digest
+from video_pipeline.text_matching import match_texts
+from video_pipeline.text_tracker import track_text_blocks
 
 # Configuration centralisée
 @dataclass
@@ -29,6 +39,13 @@ class PipelineConfig:
     frame_extraction_interval: int = 30
     max_frames_to_process: int = 100
     
+    # Sélection adaptative des keyframes (changement de scène / de texte)
+    adaptive_keyframes: bool = True
+    keyframe_candidate_fps: float = 5.0
+    keyframe_diff_threshold: float = 0.04
+    keyframe_edge_threshold: float = 0.1
+    keyframe_max_gap_seconds: float = 3.0
+    
     # Vidéo
     supported_formats: List[str] = None
     max_file_size_mb: float = 500.0
@@ -37,24 +54,45 @@ class PipelineConfig:
     
     # OCR et correspondance
     text_similarity_threshold: float = 0.7
+    overlay_match_window_seconds: float = 10.0  # écart max box ↔ segment parlé
     ocr_confidence_threshold: float = 0.5
     
+    # Suivi des textes d'une frame échantillonnée à l'autre
+    track_iou_threshold: float = 0.3
+    track_text_threshold: float = 0.6
+    track_max_missed_samples: int = 1
+    
     # Traitement parallèle
     max_workers: int = 4
+    ocr_executor: str = "thread"  # thread, process
+    ocr_shm_slots: int = 0  # 0 = 2 × max_workers (mode process)
+    ocr_warmup_backends: List[str] = None  # moteurs chargés au démarrage de chaque worker (mode process)
     enable_caching: bool = True
     
+    # Cache OCR (empreinte exacte des frames)
+    ocr_cache_memory_entries: int = 512
+    ocr_cache_max_entries: int = 20000
+    
+    # Transcription (modèle Whisper partagé par toutes les étapes)
+    whisper_model: str = "small"
+    
     # Sortie
     output_quality: str = "high"  # low, medium, high
+    output_profiles: List[Any] = None  # préréglages (source, 9x16, 1x1, 16x9, ...) ou dicts OutputProfile
     generate_debug_files: bool = True
     
     def __post_init__(self):
         if self.supported_formats is None:
             self.supported_formats = ['.mp4', '.avi', '.mov', '.mkv', '.webm']
+        if self.output_profiles is None:
+            self.output_profiles = ["source"]
+        if self.ocr_warmup_backends is None:
+            self.ocr_warmup_backends = ["easyocr"]
 
 # Configuration globale
 CONFIG = PipelineConfig()
 
-# Configuration du logging
+# Configuration du logging (à l'exécution seulement : l'import du module n'écrit aucun fichier)
 def setup_logging(log_level: str = "INFO", log_file: str = "pipeline.log"):
     """Configure le système de logging"""
     logging.basicConfig(
@@ -67,7 +105,7 @@ def setup_logging(log_level: str = "INFO", log_file: str = "pipeline.log"):
     )
     return logging.getLogger(__name__)
 
-logger = setup_logging()
+logger = logging.getLogger(__name__)
 
 # Exceptions personnalisées
 class PipelineError(Exception):
@@ -137,97 +175,166 @@ def validate_input_file(video_path: str) -> Dict[str, Any]:
     return metadata
 
 def calculate_frame_hash(frame) -> str:
-    """Calcule un hash pour un frame (pour le cache)"""
-    return hashlib.md5(frame.tobytes()).hexdigest()
+    """Empreinte exacte d'un frame (clé du cache OCR)"""
+    return frame_digest(frame)
 
-@lru_cache(maxsize=128)
-def cached_frame_analysis(frame_hash: str, frame_bytes: bytes) -> str:
-    """Cache pour l'analyse de frames (placeholder pour l'implémentation réelle)"""
-    # Cette fonction serait implémentée avec l'OCR réel
-    return frame_hash
+def get_ocr_cache(cache_dir: Optional[str] = None) -> Optional[OCRResultCache]:
+    """Retourne le cache OCR (mémoire + SQLite sous cache_dir) si le cache est activé"""
+    if not CONFIG.enable_caching:
+        return None
+    return open_ocr_cache(
+        cache_dir,
+        memory_entries=CONFIG.ocr_cache_memory_entries,
+        max_disk_entries=CONFIG.ocr_cache_max_entries
+    )
 
-def extract_frames_optimized(video_path: str, metadata: Dict[str, Any]) -> List[Tuple[int, Any]]:
+def extract_frames_optimized(video_path: str, metadata: Dict[str, Any],
+                             stats: Optional[Dict[str, Any]] = None) -> Iterator[Tuple[int, Any]]:
     """
     Extraction optimisée de frames avec gestion intelligente de l'intervalle
-    Retourne une liste de tuples (frame_index, frame_array)
+    Générateur de tuples (frame_index, frame_array) : la vidéo est décodée une seule fois
+    en flux, l'OCR peut donc démarrer avant la fin de l'extraction
+    
+    En mode adaptatif, les frames candidates sont décodées plus densément et seules celles
+    dont la zone texte a changé depuis la dernière frame OCR sont produites.
+    `stats` (optionnel) reçoit les compteurs d'extraction.
     """
+    if stats is None:
+        stats = {}
     fps = metadata['fps']
     duration = metadata['duration']
     
     # Calcul intelligent de l'intervalle d'extraction
-    if duration <= 10:  # Vidéos courtes : plus de frames
-        interval = max(1, int(fps / 2))  # 2 frames par seconde
-    elif duration <= 60:  # Vidéos moyennes
-        interval = int(fps)  # 1 frame par seconde
-    else:  # Vidéos longues
-        interval = int(fps * 2)  # 1 frame toutes les 2 secondes
+    interval = compute_sampling_interval(fps, duration)
     
     # Limitation du nombre total de frames
     max_frames = min(CONFIG.max_frames_to_process, int(duration * fps / interval))
+    stats["fixed_schedule_frames"] = max_frames
     
-    frames = []
+    extracted = 0
     with video_capture_context(video_path) as cap:
-        frame_idx = 0
-        processed_count = 0
+        if CONFIG.adaptive_keyframes:
+            interval = max(1, int(round(fps / CONFIG.keyframe_candidate_fps)))
+            selector = TextChangeSelector(
+                diff_threshold=CONFIG.keyframe_diff_threshold,
+                edge_threshold=CONFIG.keyframe_edge_threshold,
+                max_gap_frames=int(CONFIG.keyframe_max_gap_seconds * fps) or None
+            )
+            # Budget de frames OCR réparti sur toute la durée plutôt que tronqué
+            total_frames = int(duration * fps)
+            frames = select_keyframes(
+                iter_sampled_frames(cap, interval=interval),
+                selector,
+                min_gap_frames=-(-total_frames // max(1, CONFIG.max_frames_to_process)),
+                baseline_frames=max_frames,
+                stats=stats
+            )
+        else:
+            frames = iter_sampled_frames(cap, interval=interval, max_frames=max_frames)
         
-        while processed_count < max_frames:
-            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
-            ret, frame = cap.read()
-            
-            if not ret:
-                break
-                
-            frames.append((frame_idx, frame))
-            frame_idx += interval
-            processed_count += 1
+        for frame_idx, frame in frames:
+            extracted += 1
+            yield frame_idx, frame
     
-    logger.info(f"Extraction terminée : {len(frames)} frames extraites (intervalle={interval})")
-    return frames
+    stats["extracted_frames"] = extracted
+    stats["interval"] = interval
+    logger.info(f"Extraction terminée : {extracted} frames extraites (intervalle={interval})")
+
+# Pools OCR partagés par tous les appels (et toutes les vidéos d'un lot) : des extractions
+# concurrentes se répartissent CONFIG.max_workers workers au lieu d'en créer chacune.
+# Créés au premier besoin, arrêtés par shutdown_ocr_pools (fin de lot ou sortie du processus)
+_process_ocr_pool: Optional[ProcessOCRExecutor] = None
+_thread_ocr_pool: Optional[ThreadPoolExecutor] = None
+_ocr_pool_lock = threading.Lock()
+
+def get_process_ocr_pool() -> ProcessOCRExecutor:
+    """Pool de processus OCR unique, moteurs préchauffés une fois par worker"""
+    global _process_ocr_pool
+    with _ocr_pool_lock:
+        if _process_ocr_pool is None:
+            _process_ocr_pool = ProcessOCRExecutor(
+                max_workers=CONFIG.max_workers,
+                min_conf=CONFIG.ocr_confidence_threshold,
+                n_slots=CONFIG.ocr_shm_slots,
+                warmup_backends=CONFIG.ocr_warmup_backends
+            )
+        return _process_ocr_pool
+
+def get_thread_ocr_pool() -> ThreadPoolExecutor:
+    """Pool de threads OCR unique (mode thread)"""
+    global _thread_ocr_pool
+    with _ocr_pool_lock:
+        if _thread_ocr_pool is None:
+            _thread_ocr_pool = ThreadPoolExecutor(max_workers=CONFIG.max_workers, thread_name_prefix="ocr")
+        return _thread_ocr_pool
+
+def shutdown_ocr_pools():
+    """Arrête les workers OCR partagés et libère leur mémoire partagée"""
+    global _process_ocr_pool, _thread_ocr_pool
+    with _ocr_pool_lock:
+        pools = [_process_ocr_pool, _thread_ocr_pool]
+        _process_ocr_pool = _thread_ocr_pool = None
+    for pool in pools:
+        if pool is not None:
+            pool.shutdown(wait=True)
 
-def parallel_ocr_processing(frames: List[Tuple[int, Any]]) -> List[Dict[str, Any]]:
-    """Traitement OCR parallèle avec gestion d'erreurs robuste"""
+atexit.register(shutdown_ocr_pools)
+
+def parallel_ocr_processing(frames: Iterable[Tuple[int, Any]],
+                            cache: Optional[OCRResultCache] = None,
+                            executor: Any = None) -> List[Dict[str, Any]]:
+    """
+    Traitement OCR parallèle avec gestion d'erreurs robuste
+    `frames` peut être un générateur : au plus 2 × max_workers frames sont en vol à la fois
+    `executor` : pool fourni par l'appelant (ThreadPoolExecutor ou ProcessOCRExecutor) ;
+    par défaut, le pool partagé du mode CONFIG.ocr_executor
+    """
     ocr_boxes = []
+    if executor is None and CONFIG.max_workers > 1:
+        executor = get_process_ocr_pool() if CONFIG.ocr_executor == "process" else get_thread_ocr_pool()
+    
+    # Mode processus : frames transmises par mémoire partagée, un moteur OCR chaud par worker
+    if isinstance(executor, ProcessOCRExecutor):
+        ocr_boxes = executor.process(
+            frames, cache=cache, min_conf=CONFIG.ocr_confidence_threshold
+        )
+        logger.info(f"OCR terminé : {len(ocr_boxes)} blocs détectés")
+        return ocr_boxes
     
     def process_single_frame(frame_data: Tuple[int, Any]) -> List[Dict[str, Any]]:
         frame_idx, frame = frame_data
         try:
-            logger.debug(f"Traitement OCR frame {frame_idx}, type: {type(frame)}")
-            
-            # Vérification de la validité du frame
-            if frame is None or frame.size == 0:
-                logger.warning(f"Frame {frame_idx} invalide, ignorée")
-                return []
-            
-            blocks = ocr_with_fallback(frame)
-            
-            # Filtrage par confiance
-            valid_blocks = []
-            for block in blocks:
-                if block.get('conf', 0) >= CONFIG.ocr_confidence_threshold:
-                    block['frame_idx'] = frame_idx
-                    valid_blocks.append(block)
-                else:
-                    logger.debug(f"Block ignoré (confiance trop faible): {block.get('conf', 0)}")
-            
-            return valid_blocks
+            return ocr_frame_blocks(frame_idx, frame, CONFIG.ocr_confidence_threshold, cache=cache)
             
         except Exception as e:
             logger.error(f"Erreur OCR sur frame {frame_idx}: {e}")
             return []
     
-    # Traitement parallèle
-    if CONFIG.max_workers > 1 and len(frames) > 1:
-        with ThreadPoolExecutor(max_workers=CONFIG.max_workers) as executor:
-            future_to_frame = {executor.submit(process_single_frame, frame_data): frame_data[0] 
-                             for frame_data in frames}
+    def collect(done_futures):
+        for future in done_futures:
+            frame_idx = pending.pop(future)
+            try:
+                blocks = future.result()
+                ocr_boxes.extend(blocks)
+            except Exception as e:
+                logger.error(f"Erreur dans le traitement parallèle frame {frame_idx}: {e}")
+    
+    # Traitement parallèle (pool partagé : on n'attend que les frames de cet appel)
+    if executor is not None:
+        max_in_flight = CONFIG.max_workers * 2
+        pending = {}
+        try:
+            for frame_data in frames:
+                # Contre-pression : on ne décode pas plus vite que l'OCR ne consomme
+                if len(pending) >= max_in_flight:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                pending[executor.submit(process_single_frame, frame_data)] = frame_data[0]
             
-            for future in as_completed(future_to_frame):
-                frame_idx = future_to_frame[future]
-                try:
-                    blocks = future.result()
-                    ocr_boxes.extend(blocks)
-                except Exception as e:
-                    logger.error(f"Erreur dans le traitement parallèle frame {frame_idx}: {e}")
+            collect(list(as_completed(pending)))
+        finally:
+            for future in pending:
+                future.cancel()
     else:
         # Traitement séquentiel si parallélisme désactivé
         for frame_data in frames:
@@ -237,111 +344,107 @@ def parallel_ocr_processing(frames: List[Tuple[int, Any]]) -> List[Dict[str, Any
     logger.info(f"OCR terminé : {len(ocr_boxes)} blocs détectés")
     return ocr_boxes
 
-def smart_text_matching(text1: str, text2: str, threshold: float = None) -> bool:
-    """Correspondance de texte intelligente avec similarité floue"""
-    if threshold is None:
-        threshold = CONFIG.text_similarity_threshold
-    
-    # Nettoyage des textes
-    clean_text1 = text1.strip().lower()
-    clean_text2 = text2.strip().lower()
-    
-    # Correspondance exacte d'abord
-    if clean_text1 == clean_text2:
-        return True
-    
-    # Correspondance floue
-    similarity = SequenceMatcher(None, clean_text1, clean_text2).ratio()
-    return similarity >= threshold
-
-def enhanced_overlay_timing(ocr_boxes: List[Dict], transcription: List[Dict]) -> Dict[int, Dict]:
-    """Génération de timing d'overlay améliorée avec correspondance intelligente"""
+def enhanced_overlay_timing(ocr_boxes: List[Dict], transcription: List[Dict],
+                            fps: Optional[float] = None) -> Dict[int, Dict]:
+    """
+    Génération de timing d'overlay : appariement un-pour-un boxes ↔ segments via un index
+    trigrammes (et une fenêtre temporelle autour de la frame si fps est connu)
+    """
     timing = {}
-    used_transcription_indices = set()
+    matches = match_texts(
+        ocr_boxes,
+        transcription,
+        threshold=CONFIG.text_similarity_threshold,
+        fps=fps,
+        time_window=CONFIG.overlay_match_window_seconds if fps else None
+    )
     
-    for box in ocr_boxes:
-        best_match = None
-        best_similarity = 0
-        best_idx = -1
-        
-        for idx, transcript_seg in enumerate(transcription):
-            if idx in used_transcription_indices:
-                continue
-                
-            if smart_text_matching(box.get('text', ''), transcript_seg.get('text', '')):
-                similarity = SequenceMatcher(None, 
-                                           box.get('text', '').lower(), 
-                                           transcript_seg.get('text', '').lower()).ratio()
-                
-                if similarity > best_similarity:
-                    best_similarity = similarity
-                    best_match = transcript_seg
-                    best_idx = idx
-        
-        if best_match and best_similarity >= CONFIG.text_similarity_threshold:
-            timing[box['frame_idx']] = {
-                'start': best_match['start'],
-                'end': best_match['end'],
-                'confidence': best_similarity
-            }
-            used_transcription_indices.add(best_idx)
-            logger.debug(f"Correspondance trouvée : '{box.get('text', '')}' -> '{best_match.get('text', '')}' (conf={best_similarity:.2f})")
+    for box_idx, seg_idx, similarity in matches:
+        box, segment = ocr_boxes[box_idx], transcription[seg_idx]
+        frame_idx = box['frame_idx']
+        if frame_idx in timing and timing[frame_idx]['confidence'] >= similarity:
+            continue
+        timing[frame_idx] = {
+            'start': segment['start'],
+            'end': segment['end'],
+            'confidence': similarity
+        }
+        logger.debug(f"Correspondance trouvée : '{box.get('text', '')}' -> '{segment.get('text', '')}' (conf={similarity:.2f})")
     
     logger.info(f"Timing généré pour {len(timing)} éléments")
     return timing
 
-def enhanced_transcription_stub(video_path: str) -> List[Dict[str, Any]]:
-    """Version améliorée du stub de transcription (à remplacer par Whisper)"""
-    # TODO: Remplacer par une vraie implémentation Whisper
-    # Pour l'instant, données d'exemple plus réalistes
-    return [
-        {"text": "Bonjour et bienvenue", "start": 0.5, "end": 2.0, "confidence": 0.95},
-        {"text": "dans cette vidéo", "start": 2.1, "end": 3.5, "confidence": 0.92},
-        {"text": "nous allons voir", "start": 3.6, "end": 5.0, "confidence": 0.88},
-        {"text": "comment améliorer", "start": 5.1, "end": 6.5, "confidence": 0.90},
-        {"text": "vos compétences", "start": 6.6, "end": 8.0, "confidence": 0.93},
-    ]
-
-def process_text_content(video_path: str, metadata: Dict) -> Tuple[List[Dict], List[Dict], Dict[int, Dict]]:
+def process_text_content(video_path: str, metadata: Dict,
+                         extraction_stats: Optional[Dict[str, Any]] = None,
+                         cache_dir: Optional[str] = None) -> Tuple[List[Dict], List[Dict], Dict[int, Dict]]:
     """Traitement du contenu textuel (OCR + nettoyage + timing)"""
     logger.info("Début du traitement textuel")
     
-    # 1. Extraction de frames optimisée
-    frames = extract_frames_optimized(video_path, metadata)
-    if not frames:
+    # 1. Extraction de frames optimisée (flux, décodage séquentiel)
+    frames = extract_frames_optimized(video_path, metadata, stats=extraction_stats)
+    sampled_frames: List[int] = []
+    
+    def record_samples(frames):
+        # Frames passées à l'OCR, avec ou sans texte : bornes d'affichage des pistes
+        for frame_idx, frame in frames:
+            sampled_frames.append(frame_idx)
+            yield frame_idx, frame
+    
+    # 2. OCR parallèle, alimenté au fil du décodage
+    ocr_cache = get_ocr_cache(cache_dir)
+    hits_before = ocr_cache.hits if ocr_cache else 0
+    ocr_boxes = parallel_ocr_processing(record_samples(frames), cache=ocr_cache)
+    if not sampled_frames:
         raise VideoProcessingError("Aucune frame extraite")
-    
-    # 2. OCR parallèle
-    ocr_boxes = parallel_ocr_processing(frames)
+    if ocr_cache is not None and extraction_stats is not None:
+        extraction_stats["ocr_cache_hits"] = ocr_cache.hits - hits_before
     if not ocr_boxes:
         logger.warning("Aucun texte détecté dans la vidéo")
         return [], [], {}
     
-    # 3. Nettoyage OCR
-    try:
-        sentences = clean_ocr_blocks(ocr_boxes)
-        logger.info(f"Nettoyage OCR : {len(sentences)} phrases extraites")
-    except Exception as e:
-        logger.error(f"Erreur nettoyage OCR : {e}")
-        sentences = [box.get('text', '') for box in ocr_boxes if box.get('text')]
+    # 3. Suivi inter-frames : un texte affiché pendant N frames échantillonnées devient une
+    #    seule piste, traduite, effacée et incrustée une seule fois
+    detections = len(ocr_boxes)
+    tracks = track_text_blocks(
+        ocr_boxes,
+        iou_threshold=CONFIG.track_iou_threshold,
+        text_threshold=CONFIG.track_text_threshold,
+        max_missed_samples=CONFIG.track_max_missed_samples,
+        sampled_frames=sampled_frames,
+        last_frame=max(0, int(metadata['duration'] * metadata['fps']) - 1)
+    )
     
-    # 4. Timing avec transcription
+    # 4. Nettoyage OCR : une phrase par piste, reliée à sa box par block_idx
+    ocr_boxes, sentences = [], []
+    for block in filter_by_confidence([track.to_block() for track in tracks]):
+        text = remove_symbols(block["text"]).strip()
+        if text:
+            block["block_idx"] = len(sentences)
+            ocr_boxes.append(block)
+            sentences.append(text)
+    if extraction_stats is not None:
+        extraction_stats["ocr_detections"] = detections
+        extraction_stats["ocr_tracks"] = len(ocr_boxes)
+    logger.info(f"Suivi OCR : {detections} détections → {len(ocr_boxes)} pistes de texte")
+    
+    # 5. Timing avec transcription
     try:
-        transcription = enhanced_transcription_stub(video_path)
-        overlay_timing = enhanced_overlay_timing(ocr_boxes, transcription)
+        transcription = get_transcription(video_path, CONFIG.whisper_model, cache_dir=cache_dir)
+        overlay_timing = enhanced_overlay_timing(ocr_boxes, transcription.segments, fps=metadata.get('fps'))
     except Exception as e:
         logger.error(f"Erreur génération timing : {e}")
         overlay_timing = {}
     
     return ocr_boxes, sentences, overlay_timing
 
-def process_audio_content(video_path: str) -> Tuple[List[Dict], List[str], Dict[int, Dict]]:
+def process_audio_content(video_path: str,
+                          cache_dir: Optional[str] = None) -> Tuple[List[Dict], List[str], Dict[int, Dict]]:
     """Traitement du contenu audio (transcription + timing)"""
     logger.info("Début du traitement audio")
     
     try:
-        # Transcription audio
-        transcription = enhanced_transcription_stub(video_path)
+        # Transcription audio (déjà produite lors de l'analyse du type de vidéo)
+        transcription = get_transcription(video_path, CONFIG.whisper_model, cache_dir=cache_dir).segments
         sentences = [seg["text"] for seg in transcription]
         
         # Génération de boxes fictives pour l'overlay
@@ -373,37 +476,53 @@ def process_audio_content(video_path: str) -> Tuple[List[Dict], List[str], Dict[
         logger.error(f"Erreur traitement audio : {e}")
         return [], [], {}
 
-def safe_translation(sentences: List[str], target_lang: str) -> List[Dict[str, str]]:
-    """Traduction sécurisée avec gestion d'erreurs"""
+def _trad_blocks(sentences: List[str], target_lang: str, translations: List[str]) -> List[Dict[str, str]]:
+    trad_blocks = []
+    for i, sentence in enumerate(sentences):
+        if i < len(translations) and translations[i]:
+            trad_blocks.append({
+                "text": sentence,
+                f"text_{target_lang}": translations[i],
+                "translation_confidence": 0.9  # TODO: obtenir la vraie confiance
+            })
+        else:
+            logger.warning(f"Traduction manquante pour la phrase {i} ({target_lang})")
+            trad_blocks.append({
+                "text": sentence,
+                f"text_{target_lang}": sentence,  # Fallback: texte original
+                "translation_confidence": 0.0
+            })
+    logger.info(f"Traduction terminée ({target_lang}) : {len(trad_blocks)} éléments traduits")
+    return trad_blocks
+
+def safe_translations(sentences: List[str], target_langs: List[str],
+                      cache_dir: Optional[str] = None) -> Dict[str, List[Dict[str, str]]]:
+    """Traduction sécurisée vers toutes les langues cibles en un seul lot (mémoire de traduction sous cache_dir)"""
     if not sentences:
-        return []
+        return {lang: [] for lang in target_langs}
     
     try:
-        translations = translate_with_fallback(sentences, target_lang=target_lang)
-        
-        trad_blocks = []
-        for i, sentence in enumerate(sentences):
-            if i < len(translations):
-                trad_blocks.append({
-                    "text": sentence,
-                    f"text_{target_lang}": translations[i],
-                    "translation_confidence": 0.9  # TODO: obtenir la vraie confiance
-                })
-            else:
-                logger.warning(f"Traduction manquante pour la phrase {i}")
-                trad_blocks.append({
-                    "text": sentence,
-                    f"text_{target_lang}": sentence,  # Fallback: texte original
-                    "translation_confidence": 0.0
-                })
-        
-        logger.info(f"Traduction terminée : {len(trad_blocks)} éléments traduits")
-        return trad_blocks
-        
+        translations = translate_many_with_fallback(sentences, list(target_langs),
+                                                    memory=get_translation_memory(cache_dir=cache_dir))
+    except TranslationError as e:
+        # Résultat partiel : les phrases non traduites restent en texte source (confiance 0.0)
+        logger.error(f"Erreur traduction : {e}")
+        translations = e.partial
     except Exception as e:
         logger.error(f"Erreur traduction : {e}")
         # Fallback : retourner le texte original
-        return [{"text": s, f"text_{target_lang}": s, "translation_confidence": 0.0} for s in sentences]
+        return {lang: [{"text": s, f"text_{lang}": s, "translation_confidence": 0.0} for s in sentences]
+                for lang in target_langs}
+    return {lang: _trad_blocks(sentences, lang, translations.get(lang, [])) for lang in target_langs}
+
+def failed_translations(trad_blocks: List[Dict[str, Any]]) -> int:
+    """Nombre de phrases restées en texte source (aucun moteur n'a répondu)"""
+    return sum(1 for block in trad_blocks if block.get("translation_confidence", 0.0) <= 0.0)
+
+def safe_translation(sentences: List[str], target_lang: str,
+                     cache_dir: Optional[str] = None) -> List[Dict[str, str]]:
+    """Traduction sécurisée avec gestion d'erreurs"""
+    return safe_translations(sentences, [target_lang], cache_dir=cache_dir)[target_lang]
 
 def save_debug_data(data: Dict[str, Any], outdir: str, filename: str):
     """Sauvegarde des données de debug en JSON"""
@@ -421,18 +540,178 @@ def save_debug_data(data: Dict[str, Any], outdir: str, filename: str):
     except Exception as e:
         logger.error(f"Erreur sauvegarde debug {filepath}: {e}")
 
-def improved_main(video_path: str, lang: str = "en", outdir: str = "outputs") -> Dict[str, Any]:
+# ---------- ÉTAPES DE LA PIPELINE ----------
+# Chaque étape rend un dict sérialisable en JSON : c'est l'artefact mis en cache (StageCache).
+
+# Champs de configuration dont dépend chaque étape (ils entrent dans la clé de cache)
+EXTRACTION_CONFIG_FIELDS = (
+    "frame_extraction_interval", "max_frames_to_process", "adaptive_keyframes",
+    "keyframe_candidate_fps", "keyframe_diff_threshold", "keyframe_edge_threshold",
+    "keyframe_max_gap_seconds", "text_similarity_threshold", "overlay_match_window_seconds",
+    "ocr_confidence_threshold", "track_iou_threshold", "track_text_threshold", "track_max_missed_samples",
+    "whisper_model",
+)
+RENDER_CONFIG_FIELDS = ("output_quality", "output_profiles")
+
+
+def _stage_config(fields: Iterable[str], **extra) -> Dict[str, Any]:
+    config = {name: getattr(CONFIG, name) for name in fields}
+    config.update(extra)
+    return config
+
+
+def _int_keys(timing: Dict[Any, Dict]) -> Dict[int, Dict]:
+    """Les clés de overlay_timing redeviennent des index de frame (JSON les stocke en texte)"""
+    return {int(k): v for k, v in (timing or {}).items()}
+
+
+def stage_analysis(video_path: str) -> Dict[str, Any]:
+    return {"video_type": analyse_video_type(video_path)}
+
+
+def stage_extraction(video_path: str, metadata: Dict, video_type: str,
+                     cache_dir: Optional[str] = None) -> Dict[str, Any]:
+    extraction_stats = {}
+    if video_type in ("music_or_silence", "text", "speech+text"):
+        logger.info("Phase 2: Traitement contenu textuel")
+        ocr_boxes, sentences, overlay_timing = process_text_content(
+            video_path, metadata, extraction_stats, cache_dir=cache_dir
+        )
+    elif video_type == "speech":
+        logger.info("Phase 2: Traitement contenu audio")
+        ocr_boxes, sentences, overlay_timing = process_audio_content(video_path, cache_dir=cache_dir)
+    else:
+        raise VideoProcessingError(f"Type de vidéo non supporté : {video_type}")
+    return {
+        "ocr_boxes": ocr_boxes,
+        "sentences": sentences,
+        "overlay_timing": overlay_timing,
+        "extraction_stats": extraction_stats
+    }
+
+
+def stage_translations(sentences: List[str], langs: List[str],
+                       cache_dir: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    return {lang: {"trad_blocks": blocks}
+            for lang, blocks in safe_translations(sentences, langs, cache_dir=cache_dir).items()}
+
+
+def merge_translations(trad_by_lang: Dict[str, List[Dict]], langs: List[str]) -> List[Dict]:
+    """Un bloc par phrase portant le champ text_<lang> de chaque langue"""
+    merged = [dict(block) for block in trad_by_lang[langs[0]]]
+    for lang in langs[1:]:
+        for block, other in zip(merged, trad_by_lang[lang]):
+            block[f"text_{lang}"] = other[f"text_{lang}"]
+    return merged
+
+
+def stage_render(video_path: str, extraction: Dict[str, Any], trad_blocks: List[Dict],
+                 langs: List[str], outdir: str) -> Dict[str, Any]:
+    """
+    Décodage, inpainting et composition une seule fois ; un encodeur par (langue, profil de sortie).
+    out_videos : sortie du premier profil de chaque langue, reprise par le TTS.
+    """
+    profiles = resolve_profiles(CONFIG.output_profiles)
+    profile_videos = edit_video_multilang(
+        video_path,
+        extraction["ocr_boxes"],
+        trad_blocks,
+        {lang: os.path.join(outdir, f"video_edited_{lang}.mp4") for lang in langs},
+        overlay_timing=_int_keys(extraction["overlay_timing"]),
+        quality=CONFIG.output_quality,
+        profiles=profiles
+    )
+    for paths in profile_videos.values():
+        for out_video in paths.values():
+            logger.info(f"Vidéo éditée exportée : {out_video}")
+    return {
+        "out_videos": {lang: profile_videos[lang][profiles[0].name] for lang in langs},
+        "profile_videos": profile_videos
+    }
+
+
+def stage_tts(out_video: str, ocr_boxes: List[Dict], trad_blocks: List[Dict], lang: str,
+              fps: float, outdir: str) -> Dict[str, Any]:
+    final_video = os.path.join(outdir, f"video_final_{lang}.mp4")
+    tts_segments = generate_tts_segments(trad_blocks, lang=lang)
+    tts_timing = align_overlay_timing_with_tts(ocr_boxes, tts_segments, fps=fps)
+    merge_audio_on_video(out_video, tts_segments, out_path=final_video)
+    logger.info(f"Vidéo finale avec audio : {final_video}")
+    return {"final_video": final_video, "tts_segments": tts_segments, "tts_timing": tts_timing}
+
+
+def open_stage_cache(video_path: str, outdir: str) -> StageCache:
+    return StageCache(os.path.join(outdir, "cache", "stages"), file_digest(video_path),
+                      enabled=CONFIG.enable_caching)
+
+
+def cached_analysis(stages: StageCache, video_path: str) -> Tuple[Dict[str, Any], str]:
+    return stages.run("analysis", lambda: stage_analysis(video_path))
+
+
+def cached_extraction(stages: StageCache, video_path: str, metadata: Dict, video_type: str,
+                      analysis_hash: str, cache_dir: Optional[str] = None) -> Tuple[Dict[str, Any], str]:
+    return stages.run(
+        "extraction",
+        lambda: stage_extraction(video_path, metadata, video_type, cache_dir=cache_dir),
+        config=_stage_config(EXTRACTION_CONFIG_FIELDS),
+        upstream=[analysis_hash]
+    )
+
+
+def cached_translations(stages: StageCache, sentences: List[str], langs: List[str],
+                        extraction_hash: str, cache_dir: Optional[str] = None) -> Dict[str, Tuple[Dict[str, Any], str]]:
+    """
+    Un artefact par langue ; les langues absentes du cache sont traduites en un seul lot.
+    Une traduction incomplète (texte source conservé) n'est pas mise en cache : elle sera retentée.
+    """
+    return stages.run_many(
+        "translation",
+        lambda missing: stage_translations(sentences, missing, cache_dir=cache_dir),
+        configs={lang: {"lang": lang} for lang in langs},
+        upstream=[extraction_hash],
+        cacheable=lambda value: failed_translations(value["trad_blocks"]) == 0
+    )
+
+
+def cached_translation(stages: StageCache, sentences: List[str], lang: str,
+                       extraction_hash: str, cache_dir: Optional[str] = None) -> Tuple[Dict[str, Any], str]:
+    return cached_translations(stages, sentences, [lang], extraction_hash, cache_dir=cache_dir)[lang]
+
+
+def improved_main(video_path: str, lang: str = "en", outdir: str = "outputs",
+                  langs: Optional[List[str]] = None,
+                  prepared: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
     Pipeline principale améliorée avec gestion d'erreurs robuste et logging complet
     
+    Mode multilingue (`langs=[...]`) : analyse, OCR, suivi et inpainting ne sont faits qu'une
+    fois ; toutes les langues sont traduites en un seul lot, et chaque frame nettoyée alimente
+    un encodeur par langue dans la même passe de décodage. Seuls le TTS et le rapport qualité
+    restent par langue.
+    
+    Les résultats de chaque étape sont mis en cache dans <outdir>/cache/stages : une exécution
+    interrompue reprend à la première étape manquante, et un traitement déjà terminé pour la
+    même vidéo, la même langue et la même configuration est renvoyé tel quel.
+    
+    `prepared` : artefacts déjà produits par un appelant qui exécute les étapes séparément
+    (runner par lot) — "metadata", "stages", "analysis", "extraction" (tuples (valeur, empreinte))
+    et "translations" ({langue: (valeur, empreinte)}). Les étapes fournies ne sont pas rejouées,
+    même cache désactivé.
+    
     Returns:
         Dict contenant les résultats et métriques de traitement
     """
     start_time = time.time()
+    prepared = prepared or {}
+    langs = list(dict.fromkeys(langs or [lang]))
+    lang = langs[0]
+    multi = len(langs) > 1
     results = {
         "success": False,
         "video_path": video_path,
         "target_language": lang,
+        "target_languages": langs,
         "output_directory": outdir,
         "errors": [],
         "warnings": [],
@@ -443,123 +722,154 @@ def improved_main(video_path: str, lang: str = "en", outdir: str = "outputs") ->
     try:
         logger.info(f"=== DÉBUT TRAITEMENT VIDÉO ===")
         logger.info(f"Fichier: {video_path}")
-        logger.info(f"Langue cible: {lang}")
+        logger.info(f"Langue(s) cible(s): {', '.join(langs)}")
         logger.info(f"Dossier sortie: {outdir}")
         
         # Création du dossier de sortie
         os.makedirs(outdir, exist_ok=True)
+        cache_dir = os.path.join(outdir, "cache")
         
         # PHASE 1: Validation et analyse
         logger.info("Phase 1: Validation et analyse")
-        metadata = validate_input_file(video_path)
-        video_type = analyse_video_type(video_path)
+        metadata = prepared.get("metadata") or validate_input_file(video_path)
+        stages = prepared.get("stages") or open_stage_cache(video_path, outdir)
+        
+        # Traitement complet déjà effectué : résultats précédents
+        job_key = stages.key("job", {"langs": langs, "config": asdict(CONFIG)})
+        previous = stages.load("job", job_key)
+        if previous and all(os.path.exists(p) for p in previous["value"]["files_generated"]):
+            logger.info("Traitement déjà effectué pour cette vidéo et ces langues : résultats réutilisés")
+            cached_results = previous["value"]
+            cached_results["from_cache"] = True
+            cached_results["processing_time"] = time.time() - start_time
+            return cached_results
+        
+        analysis, analysis_hash = prepared.get("analysis") or cached_analysis(stages, video_path)
+        video_type = analysis["video_type"]
         
         logger.info(f"Type de vidéo détecté : {video_type}")
         results["video_type"] = video_type
         results["metadata"] = metadata
         
         # PHASE 2: Traitement selon le type
-        ocr_boxes = []
-        sentences = []
-        overlay_timing = {}
-        
-        if video_type in ("music_or_silence", "text", "speech+text"):
-            logger.info("Phase 2: Traitement contenu textuel")
-            ocr_boxes, sentences, overlay_timing = process_text_content(video_path, metadata)
-            
-        elif video_type == "speech":
-            logger.info("Phase 2: Traitement contenu audio")
-            ocr_boxes, sentences, overlay_timing = process_audio_content(video_path)
-            
-        else:
-            raise VideoProcessingError(f"Type de vidéo non supporté : {video_type}")
+        extraction, extraction_hash = prepared.get("extraction") or cached_extraction(
+            stages, video_path, metadata, video_type, analysis_hash, cache_dir=cache_dir
+        )
+        ocr_boxes = extraction["ocr_boxes"]
+        sentences = extraction["sentences"]
+        overlay_timing = _int_keys(extraction["overlay_timing"])
+        if extraction["extraction_stats"]:
+            results["extraction_stats"] = extraction["extraction_stats"]
         
         # Sauvegarde debug
-        save_debug_data({
-            "ocr_boxes": ocr_boxes,
-            "sentences": sentences,
-            "overlay_timing": overlay_timing
-        }, outdir, "extraction_data")
+        save_debug_data(extraction, outdir, "extraction_data")
         
-        # PHASE 3: Traduction
+        # PHASE 3: Traduction (toutes les langues en un seul lot)
         logger.info("Phase 3: Traduction")
-        trad_blocks = safe_translation(sentences, lang)
+        translations = dict(prepared.get("translations") or {})
+        missing = [l for l in langs if l not in translations]
+        if missing:
+            translations.update(cached_translations(stages, sentences, missing, extraction_hash,
+                                                    cache_dir=cache_dir))
+        trad_by_lang = {l: translations[l][0]["trad_blocks"] for l in langs}
+        translation_hashes = [translations[l][1] for l in langs]
         
-        if not trad_blocks:
+        if not all(trad_by_lang.values()):
             results["warnings"].append("Aucune traduction générée")
             logger.warning("Aucune traduction générée")
+        for l in langs:
+            failed = failed_translations(trad_by_lang[l])
+            if failed:
+                # Erreur, pas avertissement : le traitement ne doit pas être mémorisé comme réussi
+                error_msg = f"Traduction incomplète ({l}) : {failed} phrase(s) laissée(s) en texte source"
+                results["errors"].append(error_msg)
+                logger.error(error_msg)
         
-        save_debug_data({"translations": trad_blocks}, outdir, "translation_data")
+        for l in langs:
+            save_debug_data({"translations": trad_by_lang[l]}, outdir,
+                            f"translation_data_{l}" if multi else "translation_data")
         
-        # PHASE 4: Édition vidéo
+        # PHASE 4: Édition vidéo (un décodage, un encodeur par langue)
         logger.info("Phase 4: Édition vidéo")
-        if ocr_boxes and trad_blocks:
-            out_video = os.path.join(outdir, f"video_edited_{lang}.mp4")
-            
+        out_videos = {}
+        render_hash = None
+        if ocr_boxes and all(trad_by_lang.values()):
             try:
-                edit_video_with_translations(
-                    video_path,
-                    ocr_boxes,
-                    trad_blocks,
-                    out_path=out_video,
-                    lang=lang,
-                    overlay_timing=overlay_timing
+                render, render_hash = stages.run(
+                    "render",
+                    lambda: stage_render(video_path, extraction, merge_translations(trad_by_lang, langs),
+                                         langs, outdir),
+                    config=_stage_config(RENDER_CONFIG_FIELDS, langs=langs, outdir=outdir),
+                    upstream=[extraction_hash] + translation_hashes,
+                    files=lambda value: [p for paths in value["profile_videos"].values() for p in paths.values()]
                 )
-                results["files_generated"].append(out_video)
-                logger.info(f"Vidéo éditée exportée : {out_video}")
+                out_videos = render["out_videos"]
+                results["files_generated"].extend(
+                    p for l in langs for p in render["profile_videos"][l].values())
                 
             except Exception as e:
                 error_msg = f"Erreur édition vidéo : {e}"
                 results["errors"].append(error_msg)
                 logger.error(error_msg)
         
-        # PHASE 5: Synchronisation audio TTS
+        # PHASE 5: Synchronisation audio TTS (par langue)
         logger.info("Phase 5: Génération et synchronisation audio")
-        if trad_blocks and out_video:
+        tts_by_lang = {l: [] for l in langs}
+        for l, translation_hash in zip(langs, translation_hashes):
+            trad_blocks, out_video = trad_by_lang[l], out_videos.get(l)
+            if not (trad_blocks and out_video):
+                continue
             try:
-                final_video = os.path.join(outdir, f"video_final_{lang}.mp4")
-                
-                tts_segments = generate_tts_segments(trad_blocks, lang=lang)
-                tts_timing = align_overlay_timing_with_tts(ocr_boxes, tts_segments, fps=metadata.get('fps', 25))
-                merge_audio_on_video(out_video, tts_segments, out_path=final_video)
-                
-                results["files_generated"].append(final_video)
-                logger.info(f"Vidéo finale avec audio : {final_video}")
+                tts, _ = stages.run(
+                    "tts",
+                    lambda: stage_tts(out_video, ocr_boxes, trad_blocks, l,
+                                      metadata.get('fps', 25), outdir),
+                    config={"lang": l, "outdir": outdir},
+                    upstream=[render_hash, translation_hash],
+                    files=lambda value: [value["final_video"]]
+                )
+                tts_by_lang[l] = tts["tts_segments"]
+                results["files_generated"].append(tts["final_video"])
                 
                 save_debug_data({
-                    "tts_segments": tts_segments,
-                    "tts_timing": tts_timing
-                }, outdir, "tts_data")
+                    "tts_segments": tts["tts_segments"],
+                    "tts_timing": tts["tts_timing"]
+                }, outdir, f"tts_data_{l}" if multi else "tts_data")
                 
             except Exception as e:
-                error_msg = f"Erreur synchronisation audio : {e}"
+                error_msg = f"Erreur synchronisation audio ({l}) : {e}"
                 results["errors"].append(error_msg)
                 logger.error(error_msg)
         
-        # PHASE 6: Contrôle qualité
+        # PHASE 6: Contrôle qualité (un rapport par langue, dans <outdir>/<lang> en multilingue)
         logger.info("Phase 6: Contrôle qualité")
-        try:
-            generate_quality_report(
-                video_path,
-                ocr_boxes,
-                trad_blocks,
-                tts_segments if 'tts_segments' in locals() else [],
-                errors=results["errors"],
-                outdir=outdir
-            )
-            
-            quality_report_path = os.path.join(outdir, "quality_report.json")
-            if os.path.exists(quality_report_path):
-                results["files_generated"].append(quality_report_path)
+        for l in langs:
+            report_dir = os.path.join(outdir, l) if multi else outdir
+            try:
+                generate_quality_report(
+                    video_path,
+                    ocr_boxes,
+                    trad_by_lang[l],
+                    tts_by_lang[l],
+                    errors=results["errors"],
+                    outdir=report_dir
+                )
                 
-        except Exception as e:
-            error_msg = f"Erreur génération rapport qualité : {e}"
-            results["errors"].append(error_msg)
-            logger.error(error_msg)
+                quality_report_path = os.path.join(report_dir, "quality_report.json")
+                if os.path.exists(quality_report_path):
+                    results["files_generated"].append(quality_report_path)
+                    
+            except Exception as e:
+                error_msg = f"Erreur génération rapport qualité ({l}) : {e}"
+                results["errors"].append(error_msg)
+                logger.error(error_msg)
         
         # Finalisation
         results["success"] = len(results["errors"]) == 0
         results["processing_time"] = time.time() - start_time
+        results["stage_cache"] = {"hits": stages.hits, "misses": stages.misses}
+        if results["success"]:
+            stages.save("job", job_key, results)
         
         logger.info(f"=== TRAITEMENT TERMINÉ ===")
         logger.info(f"Succès: {results['success']}")
@@ -578,16 +888,15 @@ def improved_main(video_path: str, lang: str = "en", outdir: str = "outputs") ->
         return results
 
 if __name__ == "__main__":
-    import time
-    
+    setup_logging()
     if len(sys.argv) < 2:
-        print("Usage: python improved_pipeline.py <video_path> [lang] [outdir] [config_file]")
-        print("Exemple: python improved_pipeline.py video.mp4 en outputs config.json")
+        print("Usage: python improved_pipeline.py <video_path> [lang[,lang...]] [outdir] [config_file]")
+        print("Exemple: python improved_pipeline.py video.mp4 en,es,de outputs config.json")
         sys.exit(1)
     
     # Paramètres
     video_path = sys.argv[1]
-    lang = sys.argv[2] if len(sys.argv) > 2 else "en"
+    langs = (sys.argv[2] if len(sys.argv) > 2 else "en").split(",")
     outdir = sys.argv[3] if len(sys.argv) > 3 else "outputs"
     config_file = sys.argv[4] if len(sys.argv) > 4 else None
     
@@ -605,7 +914,7 @@ if __name__ == "__main__":
             logger.error(f"Erreur chargement configuration {config_file}: {e}")
     
     # Exécution de la pipeline
-    results = improved_main(video_path, lang=lang, outdir=outdir)
+    results = improved_main(video_path, outdir=outdir, langs=langs)
     
     # Affichage des résultats
     print("\n" + "="*60)
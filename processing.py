@@ -1,9 +1,9 @@
 from moviepy.editor import VideoFileClip, AudioFileClip, TextClip, CompositeVideoClip, vfx
-import whisper
 from googletrans import Translator
 import os
 from config import Config  # Importez la classe Config centralisée
 from video_pipeline.utils import setup_logger  # Pour utiliser le même logger
+from video_pipeline.transcription import get_transcription
 
 logger = setup_logger("video_pipeline.processing")
 
@@ -51,10 +51,9 @@ def extraire_audio(video_path, audio_output_path):
 def transcrire_audio(audio_path, model_name="small"):
     """Transcrit l'audio en utilisant Whisper."""
     try:
-        model = whisper.load_model(model_name)
-        result = model.transcribe(audio_path)
-        logger.info(f"✅ Transcription audio réussie (langue détectée: {result.get('language', 'inconnu')}).")
-        return result['text'].strip()
+        result = get_transcription(audio_path, model_name)
+        logger.info(f"✅ Transcription audio réussie (langue détectée: {result.language}).")
+        return result.text
     except Exception as e:
         logger.error(f"❌ Erreur lors de la transcription audio de : {audio_path} - {e}")
         return None
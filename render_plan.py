@@ -0,0 +1,178 @@
+from bisect import bisect_right
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from video_pipeline.box_geometry import box_iou, union_box
+from video_pipeline.text_matching import normalize_text
+
+# Durée des fondus d'entrée / de sortie (secondes)
+FADE_SECONDS = 0.5
+
+
+@dataclass
+class OverlayEntry:
+    """Un overlay à afficher sur l'intervalle [start_frame, end_frame] (bornes incluses)"""
+    start_frame: int
+    end_frame: int
+    box: Tuple[int, int, int, int]
+    text: str
+    color: Tuple[int, int, int] = (255, 255, 255)
+    animation: Optional[str] = None
+    track_id: Any = None
+    start_time: float = 0.0
+    end_time: float = 0.0
+
+    def progress(self, frame_idx: int, fps: float) -> float:
+        """Progression de l'animation : 0→1 pendant le fondu d'entrée, 1→0 pendant le fondu de sortie"""
+        if not self.animation:
+            return 1.0
+        cur_time = frame_idx / fps
+        fade_in = min(1.0, max(0.0, (cur_time - self.start_time) / FADE_SECONDS))
+        fade_out = min(1.0, max(0.0, (self.end_time - cur_time) / FADE_SECONDS))
+        return min(fade_in, fade_out)
+
+
+class RenderPlan:
+    """
+    Index d'intervalles frame → overlays actifs, construit une fois avant le décodage.
+    Les bornes des overlays découpent la timeline en segments élémentaires dont l'ensemble
+    d'overlays actifs est précalculé : chaque frame fait une recherche dichotomique O(log n).
+    """
+
+    def __init__(self, entries: Sequence[OverlayEntry]):
+        self.entries = sorted(entries, key=lambda e: (e.start_frame, e.end_frame))
+        self._bounds: List[int] = sorted({e.start_frame for e in self.entries} |
+                                         {e.end_frame + 1 for e in self.entries})
+        starts, stops = defaultdict(list), defaultdict(list)
+        for e in self.entries:
+            starts[e.start_frame].append(e)
+            stops[e.end_frame + 1].append(e)
+
+        # Balayage des bornes : ensemble actif de chaque segment élémentaire
+        self._active: List[List[OverlayEntry]] = []
+        current: List[OverlayEntry] = []
+        for bound in self._bounds:
+            if stops[bound]:
+                ended = {id(e) for e in stops[bound]}
+                current = [e for e in current if id(e) not in ended]
+            current = current + starts[bound]
+            self._active.append(current)
+
+    def active(self, frame_idx: int) -> List[OverlayEntry]:
+        i = bisect_right(self._bounds, frame_idx) - 1
+        if i < 0:
+            return []
+        return self._active[i]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+def _box_frame(box: Dict[str, Any]) -> int:
+    return int(box.get("frame_idx", box.get("frame", 0)))
+
+
+class _BlockMatcher:
+    """Associe une box OCR à son bloc traduit par identité (track_id, index) puis par texte"""
+
+    def __init__(self, trad_blocs: Sequence[Dict[str, Any]]):
+        self.trad_blocs = trad_blocs
+        self.by_track = {b["track_id"]: i for i, b in enumerate(trad_blocs) if "track_id" in b}
+        self.by_text = {}
+        for i, b in enumerate(trad_blocs):
+            self.by_text.setdefault(normalize_text(b.get("text", "")), i)
+
+    def match(self, box: Dict[str, Any]) -> Optional[int]:
+        if box.get("track_id") in self.by_track:
+            return self.by_track[box["track_id"]]
+        if isinstance(box.get("block_idx"), int) and box["block_idx"] < len(self.trad_blocs):
+            return box["block_idx"]
+        text = normalize_text(box.get("text", ""))
+        if not text:
+            return None
+        if text in self.by_text:
+            return self.by_text[text]
+        # Box = fragment (mot, ligne) d'une phrase traduite
+        padded = f" {text} "
+        for norm, i in self.by_text.items():
+            if padded in f" {norm} ":
+                return i
+        return None
+
+
+def build_render_plan(
+    ocr_boxes: Sequence[Dict[str, Any]],
+    trad_blocs: Sequence[Dict[str, Any]],
+    fps: float,
+    lang: str = "en",
+    overlay_timing: Optional[Dict[Any, Dict[str, float]]] = None,
+    color: Tuple[int, int, int] = (255, 255, 255),
+    animation: Optional[str] = "fade",
+    default_hold_seconds: float = 1.0
+) -> RenderPlan:
+    """
+    Construit le plan de rendu :
+    - chaque box est reliée à son bloc traduit par identité (track_id / block_idx) ou par texte
+    - les boxes d'une même frame appartenant au même bloc sont fusionnées en une seule zone
+    - l'intervalle d'affichage vient de overlay_timing, sinon de `end_frame`, sinon d'une durée par défaut
+    - les observations successives d'un même bloc au même endroit sont fusionnées
+    """
+    overlay_timing = overlay_timing or {}
+    matcher = _BlockMatcher(trad_blocs)
+    hold_frames = max(1, int(round(default_hold_seconds * fps)))
+
+    # 1. Regroupement (frame, bloc) → zone englobante
+    grouped: Dict[Tuple[int, int], Dict[str, Any]] = {}
+    for box in ocr_boxes:
+        block_idx = matcher.match(box)
+        if block_idx is None:
+            continue
+        frame_idx = _box_frame(box)
+        key = (frame_idx, block_idx)
+        if key in grouped:
+            grouped[key]["box"] = union_box(grouped[key]["box"], tuple(box["box"]))
+            grouped[key]["end_frame"] = max(grouped[key]["end_frame"], int(box.get("end_frame", frame_idx)))
+        else:
+            grouped[key] = {"box": tuple(box["box"]), "end_frame": int(box.get("end_frame", frame_idx)),
+                            "track_id": box.get("track_id")}
+
+    # 2. Intervalles d'affichage
+    raw = []
+    for (frame_idx, block_idx), data in grouped.items():
+        timing = overlay_timing.get(frame_idx) or overlay_timing.get(str(frame_idx))
+        if timing:
+            start = int(timing["start"] * fps)
+            end = max(start, int(timing["end"] * fps))
+        elif data["end_frame"] > frame_idx:
+            start, end = frame_idx, data["end_frame"]
+        else:
+            start, end = frame_idx, frame_idx + hold_frames - 1
+        raw.append((block_idx, start, end, data))
+
+    # 3. Fusion des observations successives d'un même bloc
+    raw.sort(key=lambda r: (r[0], r[1]))
+    merged: List[List[Any]] = []
+    for block_idx, start, end, data in raw:
+        last = merged[-1] if merged else None
+        if (last and last[0] == block_idx and start <= last[2] + hold_frames
+                and box_iou(last[3]["box"], data["box"]) >= 0.5):
+            last[2] = max(last[2], end)
+        else:
+            merged.append([block_idx, start, end, dict(data)])
+
+    entries = []
+    for block_idx, start, end, data in merged:
+        trad = trad_blocs[block_idx]
+        entries.append(OverlayEntry(
+            start_frame=start,
+            end_frame=end,
+            box=data["box"],
+            text=trad.get(f"text_{lang}", trad.get("text", "")),
+            color=color,
+            animation=animation,
+            track_id=data["track_id"] if data["track_id"] is not None else block_idx,
+            start_time=start / fps,
+            end_time=(end + 1) / fps
+        ))
+    return RenderPlan(entries)
@@ -0,0 +1,152 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# À incrémenter si le format des artefacts change : invalide tous les artefacts existants
+STAGE_CACHE_VERSION = 1
+
+_digest_cache: Dict[Tuple[str, int, int], str] = {}
+_digest_lock = threading.Lock()
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 du contenu du fichier (lecture en flux), mémorisé par (chemin, taille, mtime)"""
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    with _digest_lock:
+        if key in _digest_cache:
+            return _digest_cache[key]
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    digest = h.hexdigest()
+    with _digest_lock:
+        _digest_cache[key] = digest
+    return digest
+
+
+def _json_default(obj: Any) -> Any:
+    if hasattr(obj, "tolist"):  # scalaires et tableaux numpy
+        return obj.tolist()
+    return str(obj)
+
+
+def stable_hash(obj: Any) -> str:
+    """Empreinte d'une valeur sérialisable en JSON, indépendante de l'ordre des clés"""
+    raw = json.dumps(obj, sort_keys=True, ensure_ascii=False, default=_json_default)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class StageCache:
+    """
+    Cache d'artefacts par étape, adressé par contenu :
+    clé = (empreinte du fichier d'entrée, nom de l'étape, configuration de l'étape,
+    empreintes des artefacts amont). Un artefact n'est écrit qu'une fois l'étape réussie
+    (écriture atomique), donc une exécution interrompue reprend à la première étape manquante.
+    """
+
+    def __init__(self, root: str, input_hash: str, enabled: bool = True):
+        self.root = root
+        self.input_hash = input_hash
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, stage: str, config: Optional[Dict[str, Any]] = None,
+            upstream: Iterable[str] = ()) -> str:
+        return stable_hash({
+            "version": STAGE_CACHE_VERSION,
+            "input": self.input_hash,
+            "stage": stage,
+            "config": config or {},
+            "upstream": list(upstream),
+        })
+
+    def _path(self, stage: str, key: str) -> str:
+        return os.path.join(self.root, stage, f"{key}.json")
+
+    def load(self, stage: str, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(stage, key)
+        if not self.enabled or not os.path.exists(path):
+            return None
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Artefact illisible ignoré {path} : {e}")
+            return None
+
+    def save(self, stage: str, key: str, value: Any) -> str:
+        artifact_hash = stable_hash(value)
+        if not self.enabled:
+            return artifact_hash
+        path = self._path(stage, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"stage": stage, "hash": artifact_hash, "value": value}, f,
+                      ensure_ascii=False, default=_json_default)
+        os.replace(tmp, path)
+        return artifact_hash
+
+    def run(self, stage: str, fn: Callable[[], Any], config: Optional[Dict[str, Any]] = None,
+            upstream: Iterable[str] = (), files: Optional[Callable[[Any], Iterable[str]]] = None
+            ) -> Tuple[Any, str]:
+        """
+        Retourne (valeur, empreinte de l'artefact) de l'étape, calculée par fn() si absente.
+        files(valeur) : fichiers produits par l'étape ; s'il en manque un, l'étape est rejouée.
+        """
+        key = self.key(stage, config, upstream)
+        record = self.load(stage, key)
+        if record is not None:
+            value = record["value"]
+            if files is None or all(os.path.exists(p) for p in files(value)):
+                self.hits += 1
+                logger.info(f"Étape '{stage}' reprise depuis le cache")
+                return value, record["hash"]
+            logger.info(f"Étape '{stage}' : fichiers de sortie manquants, recalcul")
+
+        self.misses += 1
+        # Aller-retour JSON : la valeur rendue est identique à celle relue lors d'une reprise
+        value = json.loads(json.dumps(fn(), ensure_ascii=False, default=_json_default))
+        return value, self.save(stage, key, value)
+
+    def run_many(self, stage: str, fn: Callable[[List[str]], Dict[str, Any]],
+                 configs: Dict[str, Dict[str, Any]], upstream: Iterable[str] = (),
+                 cacheable: Optional[Callable[[Any], bool]] = None
+                 ) -> Dict[str, Tuple[Any, str]]:
+        """
+        Variantes d'une même étape (ex. une par langue), chacune avec sa propre clé, comme run.
+        Les variantes absentes du cache sont calculées ensemble par fn(noms manquants) → {nom: valeur}.
+        cacheable(valeur) : faux pour un résultat dégradé, rendu mais non écrit (recalculé au prochain passage).
+        """
+        upstream = list(upstream)
+        keys = {name: self.key(stage, config, upstream) for name, config in configs.items()}
+        results, missing = {}, []
+        for name, key in keys.items():
+            record = self.load(stage, key)
+            if record is None:
+                missing.append(name)
+                continue
+            self.hits += 1
+            results[name] = (record["value"], record["hash"])
+        if results:
+            logger.info(f"Étape '{stage}' reprise depuis le cache pour {sorted(results)}")
+
+        if missing:
+            self.misses += len(missing)
+            values = fn(missing)
+            for name in missing:
+                value = json.loads(json.dumps(values[name], ensure_ascii=False, default=_json_default))
+                if cacheable is not None and not cacheable(value):
+                    logger.warning(f"Étape '{stage}' ({name}) : résultat dégradé, non mis en cache")
+                    results[name] = (value, stable_hash(value))
+                    continue
+                results[name] = (value, self.save(stage, keys[name], value))
+        return {name: results[name] for name in configs}
@@ -1,7 +1,7 @@
 import os
-import json
 from config import Config  # Utilisez la classe Config centralisée
 from video_pipeline.utils import setup_logger
+from video_pipeline.translation_memory import GOOGLE_ENGINE, get_translation_memory
 from googletrans import Translator  # Bien que la traduction soit dans processing, on en a besoin ici pour translate_segments
 
 logger = setup_logger("video_pipeline.subtitles")
@@ -24,37 +24,29 @@ def _format_vtt_time(seconds):
     s = s % 60
     return f"{h:02d}:{m:02d}:{s:02d}.{ms:03d}"
 
-def load_cache(path):
-    """Charge le cache JSON depuis un fichier."""
-    if path and os.path.exists(path):
-        with open(path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return {}
-
-def save_cache(path, data):
-    """Sauvegarde les données JSON dans un fichier."""
-    if path:
-        with open(path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+def _googletrans_batch(texts, dest_lang):
+    """Traduit un lot de textes en une seule requête googletrans."""
+    translator = Translator()
+    translations = translator.translate(list(texts), dest=dest_lang)
+    if not isinstance(translations, list):
+        translations = [translations]
+    return [trans.text for trans in translations]
 
 def translate_segments(list_of_texts, dest_lang, cache_path=None):
-    """Traduit une liste de textes en utilisant un cache."""
-    cache = load_cache(cache_path) if cache_path else {}
-    untranslated = [t for t in list_of_texts if t not in cache]
-    if untranslated:
-        try:
-            translator = Translator()
-            translations = translator.translate(untranslated, dest=dest_lang)
-            if not isinstance(translations, list):
-                translations = [translations]
-            for orig, trans in zip(untranslated, translations):
-                cache[orig] = trans.text.strip()
-            if cache_path:
-                save_cache(cache_path, cache)
-        except Exception as e:
-            logger.error(f"❌ Erreur de traduction batch pour {dest_lang}: {e}")
-            raise
-    return [cache.get(t, f"[ERREUR: non traduit]") for t in list_of_texts]
+    """
+    Traduit une liste de textes via la mémoire de traduction partagée.
+    cache_path : base SQLite de la mémoire (un ancien chemin .json est converti en .sqlite).
+    """
+    if cache_path and cache_path.endswith(".json"):
+        cache_path = os.path.splitext(cache_path)[0] + ".sqlite"
+    memory = get_translation_memory(cache_path)
+    try:
+        translated = memory.translate(list_of_texts, dest_lang, GOOGLE_ENGINE,
+                                      lambda batch: _googletrans_batch(batch, dest_lang))
+    except Exception as e:
+        logger.error(f"❌ Erreur de traduction batch pour {dest_lang}: {e}")
+        raise
+    return [t if t else f"[ERREUR: non traduit]" for t in translated]
 
 def export_srt(
     translated_text, 
@@ -1,5 +1,7 @@
 from deep_translator import GoogleTranslator
 
+from video_pipeline.translation_memory import GOOGLE_ENGINE, get_translation_memory
+
 def generate_summary(texts, style="default", gpt_client=None):
     texte_complet = " ".join([t["text"] for t in texts])
     # Option : GPT pour résumé stylisé (fun, pro, poétique...)
@@ -10,13 +12,17 @@ def generate_summary(texts, style="default", gpt_client=None):
         return "[résumé GPT ici]"
     return texte_complet[:300]
 
-def translate_summary(summary, src_lang, target_langs):
+def translate_summary(summary, src_lang, target_langs, cache_dir=None):
+    """Traduit le résumé ; cache_dir : dossier de la mémoire de traduction persistée"""
+    memory = get_translation_memory(cache_dir=cache_dir)
     trad = {}
     for lang in target_langs:
         if lang == src_lang:
             continue
+        translator = GoogleTranslator(source=src_lang, target=lang)
         try:
-            trad[f"summary_{lang}"] = GoogleTranslator(source=src_lang, target=lang).translate(summary)
+            trad[f"summary_{lang}"] = memory.translate([summary], lang, GOOGLE_ENGINE,
+                                                       translator.translate_batch, source_lang=src_lang)[0]
         except Exception:
             trad[f"summary_{lang}"] = "[translation failed]"
     return trad
\ No newline at end of file
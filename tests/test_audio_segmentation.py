@@ -0,0 +1,47 @@
+import cv2
+import numpy as np
+
+from video_pipeline.analysis import fill_gaps, hysteresis, load_audio, segment_audio
+from video_pipeline.auto_analyse import detect_audio_type
+
+SR = 16000
+
+
+def _signal():
+    t = np.arange(3 * SR) / SR
+    rng = np.random.default_rng(0)
+    # Parole simulée : bruit modulé à 4 Hz (syllabes) ; musique : accord tenu
+    speech = rng.normal(0, 0.3, len(t)) * (np.sin(2 * np.pi * 4 * t) > 0)
+    music = 0.1 * (np.sin(2 * np.pi * 440 * t) + np.sin(2 * np.pi * 554 * t) + np.sin(2 * np.pi * 659 * t))
+    silence = np.zeros(2 * SR)
+    return np.concatenate([silence, speech, silence, music, silence]).astype(np.float32)
+
+
+def test_speech_music_and_silence_are_separated():
+    segments = segment_audio(y=_signal(), sr=SR)
+
+    assert [s["type"] for s in segments] == ["silence", "speech", "silence", "music", "silence"]
+    speech, music = segments[1], segments[3]
+    assert abs(speech["start"] - 2.0) < 0.1 and abs(speech["end"] - 5.0) < 0.2
+    assert abs(music["start"] - 7.0) < 0.1 and abs(music["end"] - 10.0) < 0.1
+    assert segments[-1]["end"] == 12.0
+
+
+def test_hysteresis_and_gap_filling():
+    x = np.array([0, 5, 10, 5, 0, 5, 10, 10, 5, 0])
+    assert hysteresis(x, 2, 8).astype(int).tolist() == [0, 0, 1, 1, 0, 0, 1, 1, 1, 0]
+    mask = np.array([0, 1, 1, 0, 1, 1, 0, 0, 0, 1], dtype=bool)
+    assert fill_gaps(mask, 2).astype(int).tolist() == [0, 1, 1, 1, 1, 1, 0, 0, 0, 1]
+
+
+def test_video_without_audio_track_is_silent(tmp_path):
+    path = str(tmp_path / "muet.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48))
+    for _ in range(10):
+        writer.write(np.zeros((48, 64, 3), dtype=np.uint8))
+    writer.release()
+
+    y, sr = load_audio(path)
+    assert len(y) == 0 and sr == SR
+    assert segment_audio(path) == []
+    assert detect_audio_type(path) == "music_or_silence"
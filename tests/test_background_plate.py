@@ -0,0 +1,43 @@
+import numpy as np
+
+from video_pipeline.text_removal import remove_text_with_background_plate
+
+
+def test_moving_caption_is_filled_from_other_frames():
+    rng = np.random.default_rng(0)
+    background = rng.integers(0, 255, (120, 200, 3), dtype=np.uint8)
+    frames, boxes = [], []
+    for t in range(10):
+        frame = background.copy()
+        box = (10 + 15 * t, 50, 40, 20)
+        frame[50:70, box[0]:box[0] + 40] = 255
+        frames.append(frame)
+        boxes.append([box])
+
+    calls = []
+
+    def fallback(frame, mask):
+        calls.append(int(np.count_nonzero(mask)))
+        return frame
+
+    cleaned = list(remove_text_with_background_plate(frames, boxes, window=10, fallback=fallback))
+
+    assert len(cleaned) == 10
+    for out in cleaned:
+        assert np.array_equal(out, background)
+    assert calls == []
+
+
+def test_never_visible_pixels_go_to_fallback():
+    background = np.full((60, 60, 3), 100, dtype=np.uint8)
+    frames = [background.copy() for _ in range(5)]
+    for f in frames:
+        f[20:30, 20:30] = 255
+
+    def fallback(frame, mask):
+        out = frame.copy()
+        out[mask > 0] = 100
+        return out
+
+    cleaned = list(remove_text_with_background_plate(frames, [[(20, 20, 10, 10)]] * 5, fallback=fallback))
+    assert all(np.array_equal(out, background) for out in cleaned)
@@ -0,0 +1,176 @@
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from video_pipeline import batch_runner
+from video_pipeline.batch_runner import BatchJob, BatchRunner, jobs_from_manifest, run_batch
+
+
+def test_stages_overlap_across_jobs_shortest_first():
+    log = []
+    lock = threading.Lock()
+
+    def stage(name, seconds):
+        def run(job):
+            with lock:
+                log.append((name, job.source, "start"))
+            time.sleep(seconds)
+            if job.source == "broken" and name == "ocr":
+                raise RuntimeError("OCR impossible")
+            with lock:
+                log.append((name, job.source, "end"))
+        return run
+
+    durations = {"long": 60.0, "short": 5.0, "medium": 20.0, "broken": 1.0}
+    jobs = [BatchJob(source=s, lang="en", outdir="out", metadata={"duration": d}) for s, d in durations.items()]
+    runner = BatchRunner(
+        stages=[("fetch", stage("fetch", 0.01)), ("ocr", stage("ocr", 0.05)), ("render", stage("render", 0.05))],
+        workers={"fetch": 1, "ocr": 1, "render": 1},
+        max_queue_depth=4
+    )
+    runner.run(jobs)
+
+    ocr_order = [src for name, src, ev in log if name == "ocr" and ev == "start"]
+    assert ocr_order == ["broken", "short", "medium", "long"]
+    assert [j.source for j in jobs if j.error] == ["broken"]
+    # Le rendu d'une vidéo commence avant la fin de l'OCR de la suivante
+    render_short = log.index(("render", "short", "start"))
+    assert render_short < log.index(("ocr", "medium", "end"))
+
+
+def test_manifest_entries_with_language(tmp_path):
+    manifest = tmp_path / "lot.txt"
+    manifest.write_text("# vidéos\na.mp4\nsub/b.mp4, es\nautre/b.mp4, es\n", encoding="utf-8")
+    jobs = jobs_from_manifest(str(manifest), "en", str(tmp_path / "out"))
+    assert [(j.source, j.lang) for j in jobs] == [("a.mp4", "en"), ("sub/b.mp4", "es"), ("autre/b.mp4", "es")]
+    assert jobs[1].video_path == str(tmp_path / "sub/b.mp4")
+    # Même nom de fichier, dossiers différents : sorties distinctes
+    assert os.path.dirname(jobs[1].outdir) == str(tmp_path / "out")
+    assert os.path.basename(jobs[1].outdir).startswith("b_") and jobs[1].outdir.endswith("_es")
+    assert jobs[1].outdir != jobs[2].outdir
+
+
+class _FakeLedger:
+    def __init__(self):
+        self.processed = []
+        self.closed = 0
+
+    def pending(self, folder_id):
+        return [{"id": "ancien", "name": "ancien.mp4"}]
+
+    def poll(self, folder_id):
+        return [{"id": "nouveau", "name": "nouveau.mp4", "md5Checksum": "abc"}]
+
+    def mark_processed(self, item):
+        self.processed.append(item)
+
+    def close(self):
+        self.closed += 1
+
+
+def test_batch_uses_one_drive_ledger_and_closes_it(tmp_path, monkeypatch):
+    ledgers = []
+
+    def open_ledger(outdir, service=None):
+        ledgers.append(_FakeLedger())
+        return ledgers[-1]
+
+    class FakeRunner:
+        def __init__(self, fail=False):
+            self.fail = fail
+
+        def run(self, jobs):
+            if self.fail:
+                raise RuntimeError("lot interrompu")
+            for job in jobs:
+                job.results = {"success": job.drive_file_id == "nouveau"}
+            return jobs
+
+    monkeypatch.setattr(batch_runner, "drive_ledger", open_ledger)
+    monkeypatch.setattr(batch_runner, "BatchRunner", FakeRunner)
+
+    jobs = run_batch("drive:dossier", "en", str(tmp_path))
+    assert sorted(j.drive_file_id for j in jobs) == ["ancien", "nouveau"]
+    assert len(ledgers) == 1
+    assert ledgers[0].processed == [{"id": "nouveau", "md5Checksum": "abc"}]
+    assert ledgers[0].closed == 1
+
+    with pytest.raises(RuntimeError):
+        run_batch("drive:dossier", "en", str(tmp_path), fail=True)
+    assert len(ledgers) == 2 and ledgers[1].closed == 1
+
+    # Inventaire seul : le registre ouvert pour l'occasion est refermé
+    batch_runner.jobs_from_drive("dossier", "en", str(tmp_path))
+    assert len(ledgers) == 3 and ledgers[2].closed == 1
+
+
+def _write_video(path, n_frames, fps=10):
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), fps, (32, 24))
+    for _ in range(n_frames):
+        writer.write(np.zeros((24, 32, 3), dtype=np.uint8))
+    writer.release()
+
+
+def test_local_durations_are_probed_before_admission(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch_runner.CONFIG, "supported_formats", [".avi"])
+    videos = tmp_path / "videos"
+    videos.mkdir()
+    for name, n_frames in (("a_long.avi", 50), ("b_short.avi", 10), ("c_medium.avi", 30)):
+        _write_video(videos / name, n_frames)
+    (videos / "d_broken.avi").write_bytes(b"pas une video")
+
+    jobs = batch_runner.jobs_from_directory(str(videos), "en", str(tmp_path / "out"))
+    assert [round(j.priority, 1) for j in jobs] == [5.0, 1.0, 3.0, float("inf")]
+
+    admitted = []
+    BatchRunner(stages=[("fetch", lambda job: admitted.append(job.source))],
+                workers={"fetch": 1}).run(jobs)
+    assert admitted == ["b_short.avi", "c_medium.avi", "a_long.avi", "d_broken.avi"]
+
+
+def test_drive_jobs_use_the_announced_duration(tmp_path, monkeypatch):
+    class Ledger(_FakeLedger):
+        def poll(self, folder_id):
+            return [{"id": "nouveau", "name": "nouveau.mp4", "videoMediaMetadata": {"durationMillis": "12500"}}]
+
+    jobs = batch_runner.jobs_from_drive("dossier", "en", str(tmp_path), sync=Ledger())
+    assert {j.drive_file_id: j.priority for j in jobs} == {"ancien": float("inf"), "nouveau": 12.5}
+    # Dossier de sortie distinct par fichier Drive, même à nom identique
+    assert sorted(os.path.basename(j.outdir) for j in jobs) == ["ancien_ancien_en", "nouveau_nouveau_en"]
+
+
+def test_render_reuses_upstream_artifacts_without_cache(tmp_path, monkeypatch):
+    from video_pipeline import pipeline
+
+    monkeypatch.setattr(pipeline.CONFIG, "enable_caching", False)
+    video = tmp_path / "clip.avi"
+    _write_video(video, 20)
+    calls = []
+
+    def stage(name, value):
+        def run(*args, **kwargs):
+            calls.append(name)
+            return value
+        return run
+
+    blocks = [{"text": "Bonjour", "text_en": "Hello", "translation_confidence": 1.0}]
+    monkeypatch.setattr(pipeline, "stage_analysis", stage("analysis", {"video_type": "text"}))
+    monkeypatch.setattr(pipeline, "stage_extraction", stage("extraction", {
+        "ocr_boxes": [{"text": "Bonjour", "frame": 0, "block_idx": 0}], "sentences": ["Bonjour"],
+        "overlay_timing": {}, "extraction_stats": {}}))
+    monkeypatch.setattr(pipeline, "stage_translations", stage("translation", {"en": {"trad_blocks": blocks}}))
+    monkeypatch.setattr(pipeline, "stage_render", stage("render", {
+        "out_videos": {"en": str(video)}, "profile_videos": {"en": {"source": str(video)}}}))
+    monkeypatch.setattr(pipeline, "stage_tts", stage("tts", {
+        "final_video": str(video), "tts_segments": [], "tts_timing": {}}))
+    monkeypatch.setattr(pipeline, "generate_quality_report", stage("report", None))
+
+    job = BatchJob(source="clip.avi", lang="en", outdir=str(tmp_path / "out"), video_path=str(video))
+    BatchRunner(workers={name: 1 for name, _ in batch_runner.PIPELINE_STAGES}).run([job])
+
+    assert job.error is None and job.results["success"]
+    assert calls == ["analysis", "extraction", "translation", "render", "tts", "report"]
@@ -0,0 +1,63 @@
+from video_pipeline.drive_sync import DriveSync, iter_folder_videos
+
+
+class _Request:
+    def __init__(self, result):
+        self.result = result
+
+    def execute(self):
+        return self.result
+
+
+class FakeDriveService:
+    """Service Drive local : listing paginé d'un dossier"""
+
+    def __init__(self, files, page_size=2):
+        self.folder = files
+        self.page_size = page_size
+        self.list_calls = 0
+
+    def files(self):
+        return self
+
+    def list(self, q, fields, pageSize=None, pageToken=None):
+        self.list_calls += 1
+        start = int(pageToken or 0)
+        page = self.folder[start:start + self.page_size]
+        result = {"files": page}
+        if start + self.page_size < len(self.folder):
+            result["nextPageToken"] = str(start + self.page_size)
+        return _Request(result)
+
+
+def _video(file_id, md5, modified="2024-01-01T00:00:00Z"):
+    return {"id": file_id, "name": f"{file_id}.mp4", "md5Checksum": md5, "modifiedTime": modified}
+
+
+def test_listing_follows_every_page():
+    service = FakeDriveService([_video(f"v{i}", f"m{i}") for i in range(5)])
+    assert [v["id"] for v in iter_folder_videos(service, "dossier")] == ["v0", "v1", "v2", "v3", "v4"]
+    assert service.list_calls == 3
+
+
+def test_polls_only_return_new_or_changed_unprocessed_videos(tmp_path):
+    service = FakeDriveService([_video("a", "m1"), _video("b", "m2"), _video("c", "m3")])
+    sync = DriveSync(service, str(tmp_path / "ledger.sqlite"))
+
+    first = sync.poll("dossier")
+    assert [v["id"] for v in first] == ["a", "b", "c"]
+    for item in first[:2]:
+        sync.mark_processed(item)
+    assert sync.poll("dossier") == []
+    assert [v["id"] for v in sync.pending("dossier")] == ["c"]
+
+    # Nouvelle version de b, copie de a (même md5), nouvelle vidéo d
+    service.folder = [_video("a", "m1"), _video("b", "m2b", "2024-02-01T00:00:00Z"), _video("c", "m3"),
+                      _video("a-copie", "m1"), _video("d", "m4")]
+    assert [v["id"] for v in sync.poll("dossier")] == ["b", "d"]
+    sync.close()
+
+    # Le registre survit au redémarrage
+    again = DriveSync(service, str(tmp_path / "ledger.sqlite"))
+    assert again.poll("dossier") == []
+    again.close()
@@ -0,0 +1,177 @@
+import hashlib
+import os
+import threading
+
+import pytest
+
+from video_pipeline import drive_transfers
+from video_pipeline.drive_transfers import DriveTransferManager, TransferError, get_transfer_manager, upload_state_dir
+
+
+class FakeDriveBackend:
+    """Drive local en mémoire, avec coupures réseau simulées"""
+
+    def __init__(self, files=None):
+        self.files = dict(files or {})
+        self.sessions = {}
+        self.ranges = []
+        self.fail_after = None  # nombre d'appels réseau avant coupure
+        self.lock = threading.Lock()
+
+    def _maybe_fail(self):
+        if self.fail_after is not None:
+            if self.fail_after == 0:
+                raise ConnectionError("connexion coupée")
+            self.fail_after -= 1
+
+    def metadata(self, file_id):
+        data = self.files[file_id]
+        return {"id": file_id, "size": str(len(data)), "md5Checksum": hashlib.md5(data).hexdigest()}
+
+    def read_range(self, file_id, start, end):
+        self._maybe_fail()
+        with self.lock:
+            self.ranges.append((file_id, start, end))
+        return self.files[file_id][start:end + 1]
+
+    def create_upload_session(self, name, folder_id, total_size, mimetype):
+        uri = f"session-{len(self.sessions)}"
+        self.sessions[uri] = {"name": name, "data": b"", "total": total_size}
+        return uri
+
+    def query_upload(self, uri, total_size):
+        session = self.sessions[uri]
+        if len(session["data"]) == total_size:
+            return None, session["name"]
+        return len(session["data"]), None
+
+    def put_chunk(self, uri, data, offset, total_size):
+        self._maybe_fail()
+        session = self.sessions[uri]
+        session["data"] = session["data"][:offset] + data
+        if len(session["data"]) == total_size:
+            self.files[session["name"]] = session["data"]
+            return None, session["name"]
+        return len(session["data"]), None
+
+
+def test_download_streams_and_resumes_after_interruption(tmp_path):
+    payload = os.urandom(10_000)
+    backend = FakeDriveBackend({"vid": payload})
+    manager = DriveTransferManager(backend, chunk_size=1024, max_retries=0)
+    dest = tmp_path / "video.mp4"
+
+    backend.fail_after = 4
+    with pytest.raises(TransferError):
+        manager.download("vid", str(dest))
+    assert os.path.getsize(f"{dest}.part") == 4 * 1024 and not dest.exists()
+
+    backend.fail_after = None
+    backend.ranges.clear()
+    manager.download("vid", str(dest))
+    assert dest.read_bytes() == payload
+    assert backend.ranges[0][1] == 4 * 1024
+    assert not os.path.exists(f"{dest}.part")
+    manager.shutdown()
+
+
+def test_upload_resumes_from_saved_session(tmp_path):
+    local = tmp_path / "final.mp4"
+    local.write_bytes(os.urandom(5000))
+    backend = FakeDriveBackend()
+    state_dir = str(tmp_path / "state")
+
+    backend.fail_after = 2
+    with pytest.raises(TransferError):
+        DriveTransferManager(backend, chunk_size=1024, max_retries=0, state_dir=state_dir).upload(str(local), "dossier")
+
+    # Nouveau gestionnaire (redémarrage) : même session, reprise au dernier octet reçu
+    backend.fail_after = None
+    manager = DriveTransferManager(backend, chunk_size=1024, state_dir=state_dir)
+    file_id = manager.upload(str(local), "dossier")
+    assert backend.files[file_id] == local.read_bytes()
+    assert len(backend.sessions) == 1
+    assert os.listdir(state_dir) == []
+
+
+def test_concurrent_downloads_feed_the_processing_queue(tmp_path):
+    files = {f"id{i}": os.urandom(3000 + i) for i in range(6)}
+    backend = FakeDriveBackend(files)
+    manager = DriveTransferManager(backend, max_workers=3, chunk_size=1000)
+    ready = []
+    futures = manager.download_all([{"id": k, "name": f"{k}.mp4"} for k in files], str(tmp_path), ready.append)
+    for future in futures:
+        future.result()
+    manager.shutdown()
+    assert sorted(ready) == sorted(str(tmp_path / f"{k}.mp4") for k in files)
+
+
+def test_upload_session_is_kept_under_the_job_outdir(tmp_path):
+    local = tmp_path / "job" / "final.mp4"
+    local.parent.mkdir()
+    local.write_bytes(os.urandom(3000))
+    backend = FakeDriveBackend()
+    state_dir = upload_state_dir(str(tmp_path / "job"))
+
+    backend.fail_after = 1
+    with pytest.raises(TransferError):
+        DriveTransferManager(backend, chunk_size=1024, max_retries=0).upload(str(local), "dossier", state_dir=state_dir)
+    assert state_dir == str(tmp_path / "job" / "cache" / "drive_transfers")
+    assert len(os.listdir(state_dir)) == 1
+
+    backend.fail_after = None
+    DriveTransferManager(backend, chunk_size=1024).upload(str(local), "dossier", state_dir=state_dir)
+    assert len(backend.sessions) == 1
+    assert os.listdir(state_dir) == []
+
+
+def test_one_shared_manager_per_service(monkeypatch):
+    monkeypatch.setattr(drive_transfers, "_managers", {})
+    monkeypatch.setattr(drive_transfers, "GoogleDriveBackend", lambda credentials: credentials)
+    first, second = object(), object()
+
+    manager = get_transfer_manager(first, credentials="identifiants du premier")
+    assert get_transfer_manager(first) is manager
+    other = get_transfer_manager(second, credentials="identifiants du second")
+    assert other is not manager
+    assert (manager.backend, other.backend) == ("identifiants du premier", "identifiants du second")
+    for m in (manager, other):
+        m.shutdown()
+
+
+class _Response:
+    def __init__(self, status_code, headers=None, body=None, content=b""):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = content
+        self._body = body
+
+    def json(self):
+        return self._body
+
+
+def test_backend_speaks_http_through_the_authorized_session():
+    calls = []
+
+    class FakeSession:
+        def get(self, url, **kwargs):
+            if "alt=media" not in url:
+                calls.append(("GET", url))
+                return _Response(200, body={"id": "vid", "size": "3", "md5Checksum": "m"})
+            calls.append(("GET", kwargs["headers"]))
+            return _Response(206, content=b"abc")
+
+        def put(self, url, **kwargs):
+            calls.append(("PUT", kwargs["allow_redirects"]))
+            return _Response(308, {"Range": "bytes=0-1023"}) if len(calls) < 4 else _Response(200, body={"id": "f1"})
+
+    backend = drive_transfers.GoogleDriveBackend.__new__(drive_transfers.GoogleDriveBackend)
+    backend.session, backend.timeout = FakeSession(), 5
+
+    assert backend.metadata("vid")["size"] == "3"
+    assert backend.read_range("vid", 0, 2) == b"abc"
+    assert backend.put_chunk("uri", b"x" * 1024, 0, 2048) == (1024, None)
+    assert backend.query_upload("uri", 2048) == (None, "f1")
+    # 308 = « Resume Incomplete » : jamais suivi comme une redirection
+    assert calls == [("GET", drive_transfers.METADATA_URL.format(file_id="vid")),
+                     ("GET", {"Range": "bytes=0-2"}), ("PUT", False), ("PUT", False)]
@@ -0,0 +1,66 @@
+import cv2
+import numpy as np
+import pytest
+
+from video_pipeline import pipeline
+from video_pipeline.frame_sampler import iter_sampled_frames
+
+
+class _FakeCapture:
+    """Capture factice : n frames dont la valeur est l'index, certaines illisibles"""
+
+    def __init__(self, n_frames, unreadable=()):
+        self.n_frames = n_frames
+        self.unreadable = set(unreadable)
+        self.position = -1
+        self.retrieved = []
+
+    def grab(self):
+        self.position += 1
+        return self.position < self.n_frames
+
+    def retrieve(self):
+        self.retrieved.append(self.position)
+        if self.position in self.unreadable:
+            return False, None
+        return True, np.full((4, 4, 3), self.position, dtype=np.uint8)
+
+    def set(self, *args):
+        raise AssertionError("aucun seek attendu")
+
+
+def test_only_kept_frames_are_retrieved():
+    cap = _FakeCapture(20, unreadable={10})
+    sampled = list(iter_sampled_frames(cap, interval=5, start_frame=3))
+
+    assert [idx for idx, _ in sampled] == [3, 8, 13, 18]
+    assert all(int(frame[0, 0, 0]) == idx for idx, frame in sampled)
+    assert cap.retrieved == [3, 8, 13, 18]
+
+    cap = _FakeCapture(20, unreadable={10})
+    # Une frame illisible est ignorée sans compter dans max_frames
+    assert [idx for idx, _ in iter_sampled_frames(cap, interval=5, max_frames=3)] == [0, 5, 15]
+
+
+def test_sampling_a_real_video(tmp_path):
+    path = str(tmp_path / "video.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10, (32, 24))
+    for value in range(0, 250, 10):
+        writer.write(np.full((24, 32, 3), value, dtype=np.uint8))
+    writer.release()
+
+    cap = cv2.VideoCapture(path)
+    try:
+        sampled = list(iter_sampled_frames(cap, interval=4))
+    finally:
+        cap.release()
+    assert [idx for idx, _ in sampled] == [0, 4, 8, 12, 16, 20, 24]
+    assert [round(frame.mean() / 10) for _, frame in sampled] == [0, 4, 8, 12, 16, 20, 24]
+
+
+def test_no_sampled_frame_is_an_error(monkeypatch):
+    monkeypatch.setattr(pipeline, "extract_frames_optimized", lambda *args, **kwargs: iter(()))
+    monkeypatch.setattr(pipeline, "get_ocr_cache", lambda cache_dir: None)
+
+    with pytest.raises(pipeline.VideoProcessingError, match="Aucune frame extraite"):
+        pipeline.process_text_content("video.mp4", {"duration": 1.0, "fps": 25})
@@ -0,0 +1,65 @@
+import numpy as np
+
+from video_pipeline.inpaint_cache import TemporalInpaintCache
+
+
+def _frame(background=90):
+    frame = np.full((120, 160, 3), background, dtype=np.uint8)
+    frame[50:70, 40:120] = 255  # légende
+    return frame
+
+
+def _counting_inpaint(calls):
+    def inpaint(frame, boxes):
+        calls.append(list(boxes))
+        out = frame.copy()
+        for x, y, w, h in boxes:
+            out[y:y + h, x:x + w] = len(calls)  # valeur propre à chaque appel
+        return out
+    return inpaint
+
+
+def test_static_background_reuses_the_patch():
+    calls = []
+    cache = TemporalInpaintCache(margin=4, threshold=6.0)
+    box = (40, 50, 80, 20)
+
+    first = cache.apply_many(_frame(), [("piste", box)], _counting_inpaint(calls))
+    # Léger bruit de compression sur le fond : le patch est recollé sans nouvel inpainting
+    second = cache.apply_many(_frame(background=92), [("piste", box)], _counting_inpaint(calls))
+
+    assert len(calls) == 1
+    assert (cache.misses, cache.hits) == (1, 1)
+    assert np.array_equal(second[50:70, 40:120], first[50:70, 40:120])
+
+
+def test_background_change_box_change_or_forget_invalidates():
+    calls = []
+    cache = TemporalInpaintCache(margin=4, threshold=6.0)
+    inpaint = _counting_inpaint(calls)
+    box = (40, 50, 80, 20)
+
+    cache.apply_many(_frame(), [("piste", box)], inpaint)
+    out = cache.apply_many(_frame(background=150), [("piste", box)], inpaint)  # changement de plan
+    assert (out[50:70, 40:120] == 2).all()
+    cache.apply_many(_frame(background=150), [("piste", (40, 50, 80, 22))], inpaint)  # box déplacée
+    cache.forget("piste")
+    cache.apply_many(_frame(background=150), [("piste", (40, 50, 80, 22))], inpaint)
+
+    assert len(calls) == 4
+    assert (cache.misses, cache.hits) == (4, 0)
+
+
+def test_only_stale_zones_are_inpainted_in_one_call():
+    calls = []
+    cache = TemporalInpaintCache(margin=4, threshold=6.0)
+    inpaint = _counting_inpaint(calls)
+    items = [("haut", (10, 5, 60, 15)), ("bas", (40, 50, 80, 20))]
+
+    cache.apply_many(_frame(), items, inpaint)
+    frame = _frame()
+    frame[:30] = 200  # seul le fond autour de la zone haute change
+    cache.apply_many(frame, items, inpaint)
+
+    assert calls == [[(10, 5, 60, 15), (40, 50, 80, 20)], [(10, 5, 60, 15)]]
+    assert (cache.misses, cache.hits) == (3, 1)
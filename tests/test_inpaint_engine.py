@@ -0,0 +1,44 @@
+import cv2
+import numpy as np
+
+from video_pipeline.inpaint_engine import boxes_mask, glyph_mask, inpaint_boxes, mask_roi, merge_regions
+
+
+def _frame_with_caption():
+    frame = np.full((1920, 1080, 3), 90, dtype=np.uint8)
+    frame[:, :, 1] = np.linspace(40, 200, 1080, dtype=np.uint8)  # fond en dégradé
+    cv2.putText(frame, "HELLO", (400, 1500), cv2.FONT_HERSHEY_SIMPLEX, 2, (255, 255, 255), 4)
+    return frame
+
+
+def test_only_the_crop_around_the_box_changes():
+    frame = _frame_with_caption()
+    box = (390, 1440, 260, 80)
+    out = inpaint_boxes(frame, [box], margin=16)
+
+    changed = np.argwhere((out != frame).any(axis=2))
+    assert len(changed) > 0
+    assert changed[:, 0].min() >= 1440 - 16 and changed[:, 0].max() < 1520 + 16
+    assert changed[:, 1].min() >= 390 - 16 and changed[:, 1].max() < 650 + 16
+    # Le texte blanc a disparu
+    assert out[1440:1520, 390:650].max() < 230
+
+
+def test_glyph_mask_is_tighter_than_the_box():
+    frame = _frame_with_caption()
+    mask = glyph_mask(frame[1440:1520, 390:650])
+    assert 0 < np.count_nonzero(mask) < 0.6 * mask.size
+
+
+def test_nearby_regions_are_merged():
+    assert merge_regions([(0, 0, 10, 10), (5, 5, 20, 20), (100, 100, 110, 110)]) == [
+        (0, 0, 20, 20), (100, 100, 110, 110)]
+
+
+def test_boxes_mask_and_roi():
+    mask = boxes_mask((100, 200, 3), [(10, 20, 30, 5), (-5, 90, 20, 20)], pad=2)
+    assert mask.dtype == bool and mask.shape == (100, 200)
+    assert mask[18, 8] and not mask[17, 8]
+    # Box débordant du cadre : bornée à la frame
+    assert mask_roi(mask, margin=4) == (0, 14, 46, 100)
+    assert mask_roi(boxes_mask((10, 10), []), margin=4) is None
@@ -0,0 +1,48 @@
+import cv2
+import numpy as np
+
+from video_pipeline.keyframe_selector import TextChangeSelector, select_keyframes
+
+_TEXTURE = cv2.GaussianBlur(np.random.default_rng(0).integers(0, 255, (400, 800)).astype(np.uint8), (0, 0), 6)
+
+
+def _frame(shift, caption=None):
+    frame = cv2.cvtColor(np.ascontiguousarray(_TEXTURE[20:380, shift:shift + 640]), cv2.COLOR_GRAY2BGR)
+    if caption:
+        cv2.rectangle(frame, (90, 270), (550, 345), (0, 0, 0), -1)
+        cv2.putText(frame, caption, (110, 315), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 3)
+    return frame
+
+
+def _selected(frames, **kwargs):
+    return [idx for idx, _ in select_keyframes(frames, TextChangeSelector(), **kwargs)]
+
+
+def test_camera_motion_without_text_change_is_skipped():
+    # Panoramique sur le fond, légende fixe puis nouvelle légende à la frame 10
+    frames = [(i, _frame(i * 8, "Bonjour a tous" if i < 10 else "Abonnez-vous vite")) for i in range(20)]
+    assert _selected(frames) == [0, 10]
+
+    assert _selected((i, _frame(i * 8)) for i in range(20)) == [0]
+
+
+def test_budget_is_spread_over_the_whole_video():
+    # Une nouvelle légende à chaque frame : un écart minimal de 5 frames au lieu d'une troncature
+    stats = {}
+    captions = ("Bonjour a tous", "Abonnez-vous vite", "Merci d'avoir vu")
+    frames = [(i, _frame(0, captions[i % 3])) for i in range(30)]
+
+    assert _selected(frames, min_gap_frames=5, baseline_frames=60, stats=stats) == [0, 5, 10, 15, 20, 25, 29]
+    assert stats["ocr_frames"] == 7
+    # Économie comptée par rapport au planning fixe remplacé, pas aux candidates décodées
+    assert stats["ocr_calls_saved"] == 53
+
+
+def test_change_deferred_at_the_end_of_the_stream_is_flushed():
+    # Légende apparue dans les dernières frames, avant la fin de l'écart minimal
+    captions = ["Bonjour a tous"] * 10 + ["Abonnez-vous vite"] * 2 + ["Merci d'avoir vu"] * 3
+    stats = {}
+
+    assert _selected(enumerate(_frame(0, c) for c in captions), min_gap_frames=5, stats=stats) == [0, 10, 14]
+    assert stats["deferred_changes"] == 1
+    assert stats["ocr_frames"] == 3
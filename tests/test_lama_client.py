@@ -0,0 +1,59 @@
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import cv2
+import numpy as np
+
+from video_pipeline.lama_client import CircuitBreaker, LamaInpaintClient
+
+
+class _EchoInpaintHandler(BaseHTTPRequestHandler):
+    """Faux serveur LaMa : renvoie l'image reçue remplie de blanc"""
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        start = body.index(b"\x89PNG")
+        image = cv2.imdecode(np.frombuffer(body[start:], np.uint8), cv2.IMREAD_COLOR)
+        _, out = cv2.imencode(".png", np.full_like(image, 255))
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(out)))
+        self.end_headers()
+        self.wfile.write(out.tobytes())
+
+    def log_message(self, *args):
+        pass
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_one_request_per_frame_and_only_masked_pixels_change():
+    server = HTTPServer(("127.0.0.1", 0), _EchoInpaintHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = LamaInpaintClient(url=f"http://127.0.0.1:{server.server_port}/inpaint", context_margin=4)
+    try:
+        frame = np.zeros((120, 160, 3), dtype=np.uint8)
+        out = client.inpaint_boxes(frame, [(10, 10, 20, 10), (100, 80, 30, 15)])
+        assert client.requests_sent == 1
+        assert out[15, 15].tolist() == [255, 255, 255]
+        assert out[85, 110].tolist() == [255, 255, 255]
+        assert out[50, 60].tolist() == [0, 0, 0]
+        assert frame.max() == 0
+    finally:
+        client.close()
+        server.shutdown()
+
+
+def test_breaker_opens_and_falls_back_to_opencv():
+    client = LamaInpaintClient(url=f"http://127.0.0.1:{_free_port()}/inpaint",
+                               breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+    frame = np.full((60, 60, 3), 128, dtype=np.uint8)
+    for _ in range(5):
+        out = client.inpaint_boxes(frame, [(20, 20, 10, 10)])
+        assert out.shape == frame.shape
+    assert client.breaker.is_open
+    assert client.requests_sent == 2
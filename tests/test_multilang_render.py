@@ -0,0 +1,74 @@
+import numpy as np
+
+from video_pipeline import video_editing
+from video_pipeline.output_profiles import SOURCE_PROFILE, OutputProfile, ProfileTransform
+
+
+class FakeClip:
+    fps = 10
+
+    def __init__(self, n_frames):
+        self.n_frames = n_frames
+
+    def iter_frames(self):
+        for _ in range(self.n_frames):
+            yield np.full((60, 160, 3), 90, dtype=np.uint8)
+
+
+class FakeWriter:
+    def __init__(self):
+        self.frames = []
+
+    def write(self, frame):
+        self.frames.append(frame)
+
+
+class FakeLama:
+    def __init__(self):
+        self.calls = 0
+
+    def inpaint_boxes(self, frame, boxes):
+        self.calls += 1
+        for x, y, w, h in boxes:
+            frame[y:y + h, x:x + w] = 0
+        return frame
+
+
+def test_one_decode_and_inpaint_feeds_every_language(monkeypatch):
+    lama = FakeLama()
+    monkeypatch.setattr(video_editing, "get_lama_client", lambda: lama)
+    boxes = [{"frame_idx": 0, "end_frame": 5, "box": (10, 10, 140, 30), "text": "Bonjour", "track_id": 0}]
+    trad = [{"text": "Bonjour", "text_en": "Hello", "text_es": "Hola", "text_de": "Hallo", "track_id": 0}]
+    writers = {"en": FakeWriter(), "es": FakeWriter(), "de": FakeWriter()}
+    source = ProfileTransform(SOURCE_PROFILE, (160, 60))
+    sinks = [(lang, source, writer) for lang, writer in writers.items()]
+
+    video_editing._render_frames(FakeClip(8), sinks, boxes, trad, None, 1.0, None)
+
+    # Zone statique : inpaintée une seule fois pour les trois langues
+    assert lama.calls == 1
+    assert all(len(w.frames) == 8 for w in writers.values())
+    en, es, de = (writers[lang].frames[2] for lang in ("en", "es", "de"))
+    assert en is not es and es is not de
+    assert not np.array_equal(en, es) and not np.array_equal(es, de)
+    # Hors overlay, toutes les langues reçoivent la même frame d'origine
+    assert all(np.array_equal(w.frames[7], np.full((60, 160, 3), 90, dtype=np.uint8)) for w in writers.values())
+
+
+def test_every_profile_gets_its_own_frame_and_layout(monkeypatch):
+    lama = FakeLama()
+    monkeypatch.setattr(video_editing, "get_lama_client", lambda: lama)
+    boxes = [{"frame_idx": 0, "end_frame": 3, "box": (0, 40, 160, 16), "text": "Bonjour", "track_id": 0}]
+    trad = [{"text": "Bonjour", "text_en": "Hello", "text_es": "Hola", "track_id": 0}]
+    transforms = [ProfileTransform(SOURCE_PROFILE, (160, 60)),
+                  ProfileTransform(OutputProfile("vertical", 36, 64), (160, 60)),
+                  ProfileTransform(OutputProfile("small", 80, 30), (160, 60))]
+    sinks = [(lang, t, FakeWriter()) for lang in ("en", "es") for t in transforms]
+
+    video_editing._render_frames(FakeClip(4), sinks, boxes, trad, None, 1.0, None)
+
+    assert lama.calls == 1
+    for _, transform, writer in sinks:
+        assert [f.shape[:2] for f in writer.frames] == [(transform.height, transform.width)] * 4
+    frames = [writer.frames[1] for _, _, writer in sinks]
+    assert len({id(f) for f in frames}) == len(frames)
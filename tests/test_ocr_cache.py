@@ -0,0 +1,36 @@
+import cv2
+import numpy as np
+
+from video_pipeline.ocr_cache import OCRResultCache, frame_digest
+
+
+def _captioned(text):
+    frame = np.full((360, 640, 3), 40, dtype=np.uint8)
+    cv2.putText(frame, text, (250, 320), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (255, 255, 255), 2)
+    return frame
+
+
+def test_identical_frames_share_cached_result(tmp_path):
+    frame = _captioned("Salut")
+    cache = OCRResultCache(db_path=str(tmp_path / "ocr.sqlite"), backend="test")
+    cache.put(frame_digest(frame), [{"text": "Salut", "conf": 0.9, "box": (0, 0, 10, 10), "frame_idx": 3}])
+
+    blocks = cache.get(frame_digest(frame.copy()))
+    assert blocks[0]["text"] == "Salut"
+    assert "frame_idx" not in blocks[0]
+    cache.close()
+
+    # Le tier disque survit à une nouvelle instance
+    reopened = OCRResultCache(db_path=str(tmp_path / "ocr.sqlite"), backend="test")
+    assert reopened.get(frame_digest(frame))[0]["text"] == "Salut"
+    assert OCRResultCache(db_path=str(tmp_path / "ocr.sqlite"), backend="other").get(frame_digest(frame)) is None
+
+
+def test_different_captions_on_the_same_background_miss(tmp_path):
+    cache = OCRResultCache(db_path=str(tmp_path / "ocr.sqlite"), backend="test")
+    for text in ("Salut", "Merci"):
+        cache.put(frame_digest(_captioned(text)), [{"text": text, "conf": 0.9, "box": (250, 300, 90, 25)}])
+
+    assert cache.get(frame_digest(_captioned("Like!"))) is None
+    assert cache.get(frame_digest(_captioned("Merci")))[0]["text"] == "Merci"
+    assert cache.get(frame_digest(_captioned("Salut")))[0]["text"] == "Salut"
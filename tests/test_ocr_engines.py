@@ -0,0 +1,44 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from video_pipeline.ocr_engines import ocr_engine, register_ocr_backend, release_ocr_engines, warm_up_ocr_engines
+
+
+def test_backend_loaded_once_across_threads():
+    created = []
+    register_ocr_backend("fake", lambda: created.append(object()) or created[-1])
+    assert warm_up_ocr_engines(["fake"]) == ["fake"]
+
+    def use(_):
+        with ocr_engine("fake") as engine:
+            return engine
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        engines = list(executor.map(use, range(16)))
+
+    assert len(created) == 1
+    assert all(e is created[0] for e in engines)
+    release_ocr_engines(["fake"])
+
+
+def test_release_frees_per_worker_engines_of_every_thread():
+    created = []
+    register_ocr_backend("fake_worker", lambda: created.append(object()) or created[-1], per_worker=True)
+    barrier = threading.Barrier(3)
+
+    def use(_):
+        with ocr_engine("fake_worker") as engine:
+            barrier.wait()  # chaque tâche sur son propre thread
+            return engine
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        first = list(executor.map(use, range(3)))
+        assert len(set(map(id, first))) == 3
+
+        # Libération depuis le thread principal : les workers rechargent un moteur neuf
+        release_ocr_engines(["fake_worker"])
+        second = list(executor.map(use, range(3)))
+
+    assert len(created) == 6
+    assert not set(map(id, first)) & set(map(id, second))
+    release_ocr_engines(["fake_worker"])
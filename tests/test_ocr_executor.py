@@ -0,0 +1,174 @@
+import multiprocessing
+import os
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+from video_pipeline import ocr_executor
+from video_pipeline.ocr_executor import ProcessOCRExecutor, SharedFrameRing, ocr_frame_blocks
+
+# Les workers héritent du moteur factice par fork
+needs_fork = pytest.mark.skipif(multiprocessing.get_start_method(allow_none=False) != "fork",
+                                reason="moteur OCR factice transmis aux workers par fork")
+
+
+def _frame(value, size=(24, 32)):
+    return np.full(size + (3,), value, dtype=np.uint8)
+
+
+def _fake_ocr(frame):
+    value = int(frame[0, 0, 0])
+    if value == 13:
+        raise RuntimeError("moteur OCR en échec")
+    return [{"text": f"texte {value}", "conf": 0.9 if value % 2 else 0.3, "box": (0, 0, frame.shape[1], 4)}]
+
+
+def test_ring_reuses_released_slots():
+    ring = SharedFrameRing(2, _frame(0).nbytes)
+    try:
+        first, second = ring.try_acquire(), ring.try_acquire()
+        assert {first, second} == {0, 1}
+        assert ring.try_acquire() is None
+
+        name = ring.write(first, _frame(7))
+        ring.release(first)
+        assert ring.try_acquire() == first
+        # Le slot réutilisé est réécrit en place, y compris par une frame plus petite
+        assert ring.write(first, _frame(9, size=(8, 8))) == name
+        view = np.ndarray((8, 8, 3), dtype=np.uint8, buffer=ring.slots[first].buf)
+        assert (view == 9).all()
+    finally:
+        names = [shm.name for shm in ring.slots]
+        ring.close()
+
+    for name in names:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+
+@needs_fork
+def test_process_executor_matches_thread_path(monkeypatch):
+    monkeypatch.setattr(ocr_executor, "ocr_with_fallback", _fake_ocr)
+    # Plus de frames que de slots (anneau qui boucle) et une frame hors gabarit
+    frames = [(i * 10, _frame(i)) for i in range(1, 10)] + [(200, _frame(21, size=(48, 64)))]
+
+    expected = [block for idx, frame in frames for block in ocr_frame_blocks(idx, frame, 0.5)]
+    with ProcessOCRExecutor(max_workers=2, min_conf=0.5, n_slots=2) as executor:
+        result = executor.process(frames)
+
+    assert sorted(result, key=lambda b: b["frame_idx"]) == expected
+    assert [b["frame_idx"] for b in expected] == [10, 30, 50, 70, 90, 200]
+
+
+@needs_fork
+def test_worker_error_keeps_other_frames_and_frees_the_ring(monkeypatch):
+    monkeypatch.setattr(ocr_executor, "ocr_with_fallback", _fake_ocr)
+    rings = []
+
+    class RecordingRing(SharedFrameRing):
+        def __init__(self, *args):
+            super().__init__(*args)
+            rings.append([shm.name for shm in self.slots])
+
+    monkeypatch.setattr(ocr_executor, "SharedFrameRing", RecordingRing)
+    frames = [(i, _frame(value)) for i, value in enumerate([11, 13, 15, 13, 17])]
+
+    executor = ProcessOCRExecutor(max_workers=2, min_conf=0.5, n_slots=2)
+    result = executor.process(frames)
+
+    assert sorted(b["text"] for b in result) == ["texte 11", "texte 15", "texte 17"]
+    assert len(rings) == 1
+
+    # Un échec côté parent (décodage interrompu) rend l'anneau : l'appel suivant le réutilise
+    def broken_frames():
+        yield 0, _frame(11)
+        raise IOError("flux vidéo interrompu")
+
+    with pytest.raises(IOError):
+        executor.process(broken_frames())
+    assert sorted(b["text"] for b in executor.process(frames)) == ["texte 11", "texte 15", "texte 17"]
+    assert len(rings) == 1
+
+    # L'arrêt explicite libère les segments
+    executor.shutdown()
+    for name in rings[0]:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+
+@needs_fork
+def test_pool_and_engines_outlive_a_single_call(tmp_path, monkeypatch):
+    warmups = tmp_path / "warmups.txt"
+
+    def fake_warm_up(names):
+        with open(warmups, "a") as f:
+            f.write(f"{os.getpid()} {','.join(names)}\n")
+
+    def pid_ocr(frame):
+        return [{"text": str(os.getpid()), "conf": 0.9, "box": (0, 0, 4, 4)}]
+
+    monkeypatch.setattr(ocr_executor, "warm_up_ocr_engines", fake_warm_up)
+    monkeypatch.setattr(ocr_executor, "ocr_with_fallback", pid_ocr)
+    with ProcessOCRExecutor(max_workers=1, n_slots=2, warmup_backends=["easyocr"]) as executor:
+        first = executor.process([(0, _frame(1)), (1, _frame(2))])
+        second = executor.process([(2, _frame(3))])
+
+    # Un seul worker, préchauffé une seule fois, sert les deux appels
+    assert len({b["text"] for b in first + second}) == 1
+    assert warmups.read_text().splitlines() == [f"{first[0]['text']} easyocr"]
+
+
+@needs_fork
+def test_pipeline_shares_one_process_pool(monkeypatch):
+    from video_pipeline import pipeline
+
+    monkeypatch.setattr(ocr_executor, "ocr_with_fallback", _fake_ocr)
+    monkeypatch.setattr(ocr_executor, "warm_up_ocr_engines", lambda names: None)
+    monkeypatch.setattr(pipeline.CONFIG, "ocr_executor", "process")
+    monkeypatch.setattr(pipeline.CONFIG, "max_workers", 2)
+    try:
+        first = pipeline.parallel_ocr_processing([(1, _frame(1))])
+        pool = pipeline.get_process_ocr_pool()
+        second = pipeline.parallel_ocr_processing([(3, _frame(3))])
+        assert pipeline.get_process_ocr_pool() is pool
+        assert [b["text"] for b in first + second] == ["texte 1", "texte 3"]
+    finally:
+        pipeline.shutdown_ocr_pools()
+    assert pool._pool is None
+
+
+def test_concurrent_videos_share_the_thread_pool(monkeypatch):
+    from video_pipeline import pipeline
+
+    lock = threading.Lock()
+    running, peak = [0], [0]
+
+    def slow_ocr(frame_idx, frame, min_conf, cache=None):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.01)
+        with lock:
+            running[0] -= 1
+        return [{"text": "texte", "conf": 0.9, "frame_idx": frame_idx}]
+
+    monkeypatch.setattr(pipeline, "ocr_frame_blocks", slow_ocr)
+    monkeypatch.setattr(pipeline.CONFIG, "ocr_executor", "thread")
+    monkeypatch.setattr(pipeline.CONFIG, "max_workers", 2)
+    results = []
+    try:
+        videos = [threading.Thread(target=lambda: results.append(pipeline.parallel_ocr_processing(
+            [(i, _frame(i)) for i in range(8)]))) for _ in range(3)]
+        for video in videos:
+            video.start()
+        for video in videos:
+            video.join()
+    finally:
+        pipeline.shutdown_ocr_pools()
+
+    # Trois vidéos en parallèle, jamais plus de max_workers OCR simultanés
+    assert [len(r) for r in results] == [8, 8, 8]
+    assert peak[0] <= 2
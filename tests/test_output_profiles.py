@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from video_pipeline.output_profiles import (
+    OutputProfile, ProfileTransform, profile_output_path, resolve_profiles
+)
+
+
+def test_crop_and_pad_transforms():
+    frame = np.zeros((1080, 1920, 3), dtype=np.uint8)
+    frame[:, 960:] = 255
+
+    vertical = ProfileTransform(OutputProfile("9x16", 1080, 1920), (1920, 1080))
+    out = vertical.apply(frame)
+    assert out.shape == (1920, 1080, 3)
+    assert vertical.scale == pytest.approx(1920 / 1080)
+    # Recadrage centré : la frontière noir/blanc reste au milieu
+    assert out[:, 500].max() == 0 and out[:, 580].min() == 255
+
+    padded = ProfileTransform(OutputProfile("1x1", 540, 540, fit="pad"), (1920, 1080))
+    out = padded.apply(frame)
+    assert out.shape == (540, 540, 3)
+    assert out[:100].max() == 0 and out[270, 400].min() == 255
+
+    source = ProfileTransform(OutputProfile("source"), (1920, 1080))
+    assert source.apply(frame) is frame and source.layout((5, 6, 7, 8)) == (5, 6, 7, 8)
+
+
+def test_overlay_layout_is_recomputed_inside_the_frame():
+    vertical = ProfileTransform(OutputProfile("9x16", 1080, 1920), (1920, 1080))
+    # Sous-titre sur toute la largeur de la source : resserré dans la zone de sécurité du cadre 9:16
+    x, y, w, h = vertical.layout((100, 900, 1720, 100))
+    assert 0 < x and x + w < 1080 and w == 1080 - 2 * round(1080 * 0.04)
+    assert y == round(900 * 1920 / 1080) and h == round(100 * 1920 / 1080)
+
+
+def test_profiles_resolution_and_paths():
+    profiles = resolve_profiles(["source", "9x16", {"name": "carre", "width": 720, "height": 720, "fit": "pad"}])
+    assert [p.name for p in profiles] == ["source", "9x16", "carre"]
+    assert profile_output_path("out/video_edited_en.mp4", profiles[0]) == "out/video_edited_en.mp4"
+    assert profile_output_path("out/video_edited_en.mp4", profiles[1]) == "out/video_edited_en_9x16.mp4"
+    with pytest.raises(ValueError):
+        resolve_profiles(["4x3"])
+    with pytest.raises(ValueError):
+        resolve_profiles(["9x16", "9x16"])
@@ -0,0 +1,29 @@
+from video_pipeline.render_plan import build_render_plan
+
+
+def test_overlays_persist_over_their_interval():
+    boxes = [
+        {"frame_idx": 0, "box": (10, 10, 50, 20), "text": "Bonjour"},
+        {"frame_idx": 0, "box": (70, 10, 50, 20), "text": "monde"},
+        {"frame_idx": 25, "box": (10, 10, 110, 20), "text": "Bonjour monde"},
+        {"frame_idx": 50, "box": (10, 100, 50, 20), "text": "Salut"},
+    ]
+    trad = [{"text": "Bonjour monde", "text_en": "Hello world"}, {"text": "Salut", "text_en": "Hi"}]
+
+    plan = build_render_plan(boxes, trad, fps=25, lang="en", overlay_timing={50: {"start": 2.0, "end": 4.0}})
+
+    assert len(plan) == 2
+    assert [e.text for e in plan.active(0)] == ["Hello world"]
+    assert plan.active(0)[0].box == (10, 10, 110, 20)
+    assert [e.text for e in plan.active(37)] == ["Hello world"]
+    assert [e.text for e in plan.active(80)] == ["Hi"]
+    assert plan.active(500) == []
+
+
+def test_text_is_matched_with_the_shared_normalization():
+    # « _ » est un séparateur pour text_matching : le plan doit en juger de même
+    boxes = [{"frame_idx": 0, "box": (10, 10, 80, 20), "text": "abonne_toi"}]
+    trad = [{"text": "Abonne toi !", "text_en": "Subscribe!"}]
+
+    plan = build_render_plan(boxes, trad, fps=25, lang="en")
+    assert [e.text for e in plan.active(0)] == ["Subscribe!"]
@@ -0,0 +1,67 @@
+import pytest
+
+from video_pipeline.stage_cache import StageCache, file_digest
+
+
+def test_stages_resume_after_a_failure(tmp_path):
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b"contenu")
+    root = str(tmp_path / "stages")
+    calls = []
+
+    def extraction():
+        calls.append("extraction")
+        return {"overlay_timing": {12: {"start": 0.5, "end": 1.0}}}
+
+    def failing_render():
+        raise RuntimeError("crash")
+
+    cache = StageCache(root, file_digest(str(video)))
+    value, extraction_hash = cache.run("extraction", extraction, config={"interval": 30})
+    assert value == {"overlay_timing": {"12": {"start": 0.5, "end": 1.0}}}
+    with pytest.raises(RuntimeError):
+        cache.run("render", failing_render, upstream=[extraction_hash])
+
+    # Reprise : l'extraction n'est pas rejouée, le rendu oui
+    cache = StageCache(root, file_digest(str(video)))
+    again, again_hash = cache.run("extraction", extraction, config={"interval": 30})
+    assert again == value and again_hash == extraction_hash
+    out = tmp_path / "out.mp4"
+    render, _ = cache.run("render", lambda: out.write_bytes(b"x") and {"out_video": str(out)},
+                          upstream=[extraction_hash], files=lambda v: [v["out_video"]])
+    assert calls == ["extraction"]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Configuration différente ou fichier de sortie supprimé : recalcul
+    cache.run("extraction", extraction, config={"interval": 15})
+    out.unlink()
+    cache.run("render", lambda: out.write_bytes(b"x") and {"out_video": str(out)},
+              upstream=[extraction_hash], files=lambda v: [v["out_video"]])
+    assert calls == ["extraction", "extraction"]
+    assert cache.misses == 3
+
+
+def test_input_content_is_part_of_the_key(tmp_path):
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b"v1")
+    key_v1 = StageCache(str(tmp_path), file_digest(str(video))).key("analysis")
+    video.write_bytes(b"v2 plus long")
+    assert StageCache(str(tmp_path), file_digest(str(video))).key("analysis") != key_v1
+
+
+def test_missing_variants_are_computed_together(tmp_path):
+    cache = StageCache(str(tmp_path), "input")
+    batches = []
+
+    def translate(langs):
+        batches.append(list(langs))
+        return {lang: {"trad_blocks": [f"bonjour-{lang}"]} for lang in langs}
+
+    first = cache.run_many("translation", translate, {"en": {"lang": "en"}}, upstream=["x"])
+    both = cache.run_many("translation", translate, {"en": {"lang": "en"}, "es": {"lang": "es"}}, upstream=["x"])
+
+    assert batches == [["en"], ["es"]]
+    assert both["en"] == first["en"]
+    assert list(both) == ["en", "es"] and both["es"][0] == {"trad_blocks": ["bonjour-es"]}
+    # Même clé que run : une variante calculée seule est reprise par run_many et inversement
+    assert cache.run("translation", lambda: 1 / 0, config={"lang": "es"}, upstream=["x"]) == both["es"]
@@ -0,0 +1,25 @@
+from video_pipeline.text_matching import TrigramIndex, match_texts, normalize_text, trigrams
+
+
+def test_best_pairs_are_assigned_first():
+    boxes = [{"frame_idx": 0, "text": "Bonjour à tous"}, {"frame_idx": 25, "text": "Bonjour à tous, ça va"}]
+    segments = [{"text": "bonjour à tous ça va", "start": 1.0, "end": 2.0},
+                {"text": "Bonjour a tous", "start": 0.0, "end": 1.0}]
+
+    matches = match_texts(boxes, segments, threshold=0.7)
+
+    # Un appariement glouton dans l'ordre des boxes donnerait la box 0 au segment 0
+    assert sorted((b, s) for b, s, _ in matches) == [(0, 1), (1, 0)]
+
+
+def test_time_window_and_index_shortlist():
+    segments = [{"text": "voici la recette", "start": 0.0, "end": 2.0},
+                {"text": "voici la recette", "start": 60.0, "end": 62.0},
+                {"text": "tout autre chose", "start": 30.0, "end": 31.0}]
+    boxes = [{"frame_idx": 25 * 61, "text": "Voici la recette !"}]
+
+    assert [s for _, s, _ in match_texts(boxes, segments, 0.7, fps=25, time_window=5.0)] == [1]
+
+    index = TrigramIndex(segments)
+    shortlisted = [idx for idx, _ in index.candidates(trigrams(normalize_text("voici la recette")))]
+    assert 2 not in shortlisted
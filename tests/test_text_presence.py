@@ -0,0 +1,41 @@
+import cv2
+import numpy as np
+
+from video_pipeline.text_presence import detect_text_presence, text_likelihood
+
+
+def _background(seed=0):
+    rng = np.random.default_rng(seed)
+    return cv2.GaussianBlur(rng.integers(0, 255, (640, 360, 3), dtype=np.uint8), (31, 31), 0)
+
+
+def _with_caption(frame):
+    frame = frame.copy()
+    for i, line in enumerate(["Bonjour a tous", "Voici la recette", "du jour"]):
+        cv2.putText(frame, line, (20, 420 + i * 40), cv2.FONT_HERSHEY_SIMPLEX, 0.9, (255, 255, 255), 2)
+    return frame
+
+
+def _write_video(path, frames):
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), 10, (360, 640))
+    for frame in frames:
+        writer.write(frame)
+    writer.release()
+
+
+def test_likelihood_separates_captions_from_plain_frames():
+    assert text_likelihood(_with_caption(_background())) >= 0.67
+    assert text_likelihood(_background()) < 0.2
+
+
+def test_early_exit_without_ocr(tmp_path):
+    video = tmp_path / "caption.mp4"
+    _write_video(video, [_with_caption(_background())] * 30)
+    stats = {}
+    assert detect_text_presence(str(video), stats=stats)
+    assert stats == {"frames_scored": 1, "ocr_frames": 0}
+
+    plain = tmp_path / "plain.mp4"
+    _write_video(plain, [_background()] * 30)
+    assert not detect_text_presence(str(plain), stats=stats)
+    assert stats["ocr_frames"] == 0
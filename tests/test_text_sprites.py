@@ -0,0 +1,31 @@
+import numpy as np
+from PIL import Image, ImageDraw
+
+from video_pipeline.text_sprites import blend_sprite, load_font, render_text_sprite
+
+FONT = "DejaVuSans.ttf"
+
+
+def _background():
+    frame = np.zeros((80, 240, 3), dtype=np.uint8)
+    frame[..., 0] = np.linspace(0, 255, 240, dtype=np.uint8)
+    frame[..., 2] = 60
+    return frame
+
+
+def test_cached_sprite_matches_direct_rendering():
+    text, color, anchor = "Salut tout le monde", (255, 220, 120), (12, 20)
+
+    image = Image.fromarray(_background())
+    ImageDraw.Draw(image).text(anchor, text, font=load_font(FONT, 24), fill=color)
+    direct = np.array(image)
+
+    render_text_sprite.cache_clear()
+    render_text_sprite(text, FONT, 24, color, 0)
+    sprite, (dx, dy) = render_text_sprite(text, FONT, 24, color, 0)
+    assert render_text_sprite.cache_info().hits == 1
+    blended = blend_sprite(_background(), sprite, anchor[0] + dx, anchor[1] + dy)
+
+    # Seul l'arrondi de l'anticrénelage peut différer
+    assert np.abs(blended.astype(int) - direct.astype(int)).max() <= 1
+    assert (blended != _background()).any()
@@ -0,0 +1,60 @@
+from video_pipeline.render_plan import build_render_plan
+from video_pipeline.text_tracker import group_lines, track_text_blocks
+
+
+def _det(frame_idx, text, box, conf=0.9):
+    return {"frame_idx": frame_idx, "text": text, "box": box, "conf": conf}
+
+
+def test_caption_seen_on_several_frames_is_one_track():
+    readings = ["Trois choses à savoir", "Trois chose5 à savoir", "Trois choses à savoir", "Trois choses à savoir"]
+    boxes = [_det(i * 10, text, (100 + i, 400, 300, 40)) for i, text in enumerate(readings)]
+    # Autre texte au même endroit ensuite : nouvelle piste
+    boxes.append(_det(40, "Abonnez-vous", (100, 400, 300, 40)))
+
+    tracks = track_text_blocks(boxes)
+
+    assert len(tracks) == 2
+    block = tracks[0].to_block()
+    assert block["text"] == "Trois choses à savoir"
+    assert (block["frame_idx"], block["last_seen_frame"], block["observations"]) == (0, 30, 4)
+    assert block["end_frame"] == 39
+    assert block["box"] == (100, 400, 303, 40)
+    assert tracks[1].start_frame == 40
+
+
+def test_track_survives_one_missed_sample_only():
+    boxes = [_det(0, "Bonjour", (10, 10, 100, 30)), _det(20, "Bonjour", (10, 10, 100, 30)),
+             _det(10, "Ailleurs", (300, 300, 80, 30)), _det(30, "Ailleurs", (300, 300, 80, 30)),
+             _det(40, "Ailleurs", (300, 300, 80, 30)),
+             _det(50, "Bonjour", (10, 10, 100, 30))]
+
+    tracks = track_text_blocks(boxes, max_missed_samples=1)
+
+    assert [(t.start_frame, t.end_frame) for t in tracks if t.consensus_text() == "Bonjour"] == [(0, 20), (50, 50)]
+
+
+def test_word_boxes_are_grouped_into_lines():
+    words = [_det(0, "as", (60, 100, 20, 20)), _det(0, "young", (85, 102, 50, 20)),
+             _det(0, "Hello", (0, 100, 55, 20)), _det(0, "Bas", (0, 300, 40, 20))]
+
+    lines = group_lines(words)
+
+    assert sorted(line["text"] for line in lines) == ["Bas", "Hello as young"]
+
+
+def test_track_is_held_until_the_next_sample():
+    # Échantillons toutes les 30 frames ; le texte est lu aux frames 0, 30 et 60, plus rien à 90
+    boxes = [_det(i * 30, "Bonjour", (10, 10, 100, 30)) for i in range(3)]
+
+    track, = track_text_blocks(boxes, sampled_frames=[0, 30, 60, 90, 120], last_frame=149)
+    block = track.to_block()
+    block["block_idx"] = 0
+
+    assert (block["frame_idx"], block["last_seen_frame"], block["end_frame"]) == (0, 60, 89)
+    plan = build_render_plan([block], [{"text": "Bonjour", "text_en": "Hello"}], fps=30, lang="en")
+    assert [(e.start_frame, e.end_frame) for e in plan.entries] == [(0, 89)]
+
+    # Texte encore lu au dernier échantillon : tenu jusqu'à la fin de la vidéo
+    last, = track_text_blocks([_det(120, "Fin", (10, 10, 100, 30))], sampled_frames=[0, 60, 120], last_frame=149)
+    assert last.to_block()["end_frame"] == 149
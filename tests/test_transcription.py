@@ -0,0 +1,36 @@
+from video_pipeline import transcription
+
+
+class _FakeWhisper:
+    def __init__(self):
+        self.calls = 0
+
+    def transcribe(self, path, **options):
+        self.calls += 1
+        return {"language": "fr", "text": " Bonjour tout le monde",
+                "segments": [{"text": " Bonjour tout le monde", "start": 0.0, "end": 1.5, "avg_logprob": -0.1}]}
+
+
+def test_model_loaded_once_and_video_transcribed_once(tmp_path, monkeypatch):
+    loads = []
+    fake = _FakeWhisper()
+    monkeypatch.setattr(transcription, "_load_whisper", lambda name: loads.append(name) or fake)
+    transcription.release_whisper_models()
+    monkeypatch.setattr(transcription, "_transcriptions", {})
+
+    media = tmp_path / "video.mp4"
+    media.write_bytes(b"fake")
+    cache_dir = tmp_path / "cache"
+
+    first = transcription.get_transcription(str(media), "tiny", cache_dir=str(cache_dir))
+    second = transcription.get_transcription(str(media), "tiny", cache_dir=str(cache_dir))
+    assert first is second
+    assert first.has_speech and first.language == "fr"
+    assert first.segments[0]["text"] == "Bonjour tout le monde"
+    assert loads == ["tiny"] and fake.calls == 1
+
+    # Nouveau processus : l'artefact sur disque évite une nouvelle transcription
+    monkeypatch.setattr(transcription, "_transcriptions", {})
+    again = transcription.get_transcription(str(media), "tiny", cache_dir=str(cache_dir))
+    assert again == first and fake.calls == 1
+    transcription.release_whisper_models()
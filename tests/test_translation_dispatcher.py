@@ -0,0 +1,98 @@
+import pytest
+
+from video_pipeline import translation_dispatcher
+from video_pipeline.translation_dispatcher import (
+    EngineLimits, RateLimitError, TokenBucket, TranslationError, dispatch_translations
+)
+from video_pipeline.translation_memory import TranslationMemory
+
+FAST = EngineLimits(max_concurrency=2, rate_per_second=1000.0, burst=100)
+
+
+@pytest.fixture(autouse=True)
+def fresh_buckets(monkeypatch):
+    monkeypatch.setattr(translation_dispatcher, "_buckets", {})
+
+
+def _dispatch(texts, langs, engines, memory=None, **kwargs):
+    limits = {engine.__name__: FAST for engine in engines}
+    return dispatch_translations(texts, langs, engines, limits=limits,
+                                 memory=memory or TranslationMemory(), backoff_base=0.0, **kwargs)
+
+
+def test_token_bucket_spends_burst_then_spaces_calls(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(translation_dispatcher.time, "monotonic", lambda: now[0])
+    bucket = TokenBucket(rate=2.0, capacity=2)
+
+    assert [bucket.reserve(), bucket.reserve()] == [0.0, 0.0]
+    assert bucket.reserve() == pytest.approx(0.5)
+    assert bucket.reserve() == pytest.approx(1.0)
+    # Les jetons se reconstituent au débit nominal, sans dépasser la capacité
+    now[0] += 10.0
+    assert [bucket.reserve(), bucket.reserve()] == [0.0, 0.0]
+    assert bucket.reserve() > 0
+
+
+def test_rate_limited_call_is_retried_with_backoff(monkeypatch):
+    calls, delays = [], []
+    real_sleep = translation_dispatcher.asyncio.sleep
+
+    async def recording_sleep(delay):
+        delays.append(delay)
+        await real_sleep(0)
+
+    monkeypatch.setattr(translation_dispatcher.asyncio, "sleep", recording_sleep)
+
+    def engine_busy(texts, target_lang):
+        calls.append(list(texts))
+        if len(calls) < 3:
+            raise RateLimitError("429 Too Many Requests", retry_after=0.25 * len(calls))
+        return [t.upper() for t in texts]
+
+    assert _dispatch(["salut"], ["en"], [engine_busy], max_retries=3) == {"en": ["SALUT"]}
+    assert len(calls) == 3
+    # Retry-After du moteur respecté entre les essais
+    assert [d for d in delays if d > 0] == [0.25, 0.5]
+
+
+def test_engines_are_tried_in_order_until_one_succeeds():
+    order = []
+
+    def engine_down(texts, target_lang):
+        order.append("down")
+        raise ConnectionError("hors ligne")
+
+    def engine_throttled(texts, target_lang):
+        order.append("throttled")
+        raise RateLimitError("quota", retry_after=0.0)
+
+    def engine_blank(texts, target_lang):
+        order.append("blank")
+        return [""] * len(texts)
+
+    def engine_ok(texts, target_lang):
+        order.append("ok")
+        return [f"{t} ({target_lang})" for t in texts]
+
+    memory = TranslationMemory()
+    engines = [engine_down, engine_throttled, engine_blank, engine_ok]
+    assert _dispatch(["bonjour"], ["en"], engines, memory=memory, max_retries=1) == {"en": ["bonjour (en)"]}
+    # Le moteur limité est réessayé max_retries fois avant de passer au suivant
+    assert order == ["down", "throttled", "throttled", "blank", "ok"]
+    assert memory.lookup(["bonjour"], "auto", "en", "engine_ok") == {"bonjour": "bonjour (en)"}
+
+
+def test_total_failure_raises_with_partial_result():
+    def engine_down(texts, target_lang):
+        raise ConnectionError("hors ligne")
+
+    memory = TranslationMemory()
+    memory.store({"merci": "thanks"}, "auto", "en", "engine_down")
+
+    with pytest.raises(TranslationError) as info:
+        _dispatch(["merci", "bonjour", ""], ["en", "es"], [engine_down], memory=memory)
+
+    # Les textes déjà connus restent disponibles, les autres sont signalés comme non traduits
+    assert info.value.partial == {"en": ["thanks", "", ""], "es": ["", "", ""]}
+    assert info.value.failed == {"en": 1, "es": 2}
@@ -0,0 +1,47 @@
+import os
+
+from video_pipeline import translation_memory
+from video_pipeline.translation_memory import TranslationMemory, get_translation_memory
+
+
+def test_only_misses_are_sent_in_one_batch(tmp_path):
+    calls = []
+
+    def engine(batch):
+        calls.append(list(batch))
+        return [t.upper() for t in batch]
+
+    tm = TranslationMemory(str(tmp_path / "tm.sqlite"))
+    assert tm.translate(["bonjour", "salut"], "en", "fake", engine) == ["BONJOUR", "SALUT"]
+    tm.close()
+
+    tm = TranslationMemory(str(tmp_path / "tm.sqlite"))
+    result = tm.translate(["bonjour ", "merci", "salut", "merci", ""], "en", "fake", engine)
+
+    assert result == ["BONJOUR", "MERCI", "SALUT", "MERCI", ""]
+    assert calls == [["bonjour", "salut"], ["merci"]]
+    # La clé inclut la langue cible et le moteur
+    tm.translate(["bonjour"], "es", "fake", engine)
+    tm.translate(["bonjour"], "en", "other", engine)
+    assert calls[-2:] == [["bonjour"], ["bonjour"]]
+
+
+def test_shared_memory_lives_in_the_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(translation_memory, "_memories", {})
+    monkeypatch.setattr(translation_memory, "DEFAULT_DB_PATH", None)
+
+    tm = get_translation_memory(cache_dir=str(tmp_path / "job" / "cache"))
+    assert get_translation_memory(cache_dir=str(tmp_path / "job" / "cache")) is tm
+    assert os.path.exists(tmp_path / "job" / "cache" / "translation_memory.sqlite")
+
+    # Sans dossier de cache : mémoire seule, rien n'est écrit dans le répertoire courant
+    assert get_translation_memory().db_path is None
+    assert sorted(os.listdir(tmp_path)) == ["job"]
+
+
+def test_google_paths_share_one_engine_key():
+    from video_pipeline.fallback_tools import translate_google
+
+    # Le dispatcher range ses traductions sous le nom du moteur
+    assert translation_memory.GOOGLE_ENGINE == translate_google.__name__
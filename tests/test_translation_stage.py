@@ -0,0 +1,34 @@
+from video_pipeline import pipeline
+from video_pipeline.stage_cache import StageCache
+from video_pipeline.translation_dispatcher import TranslationError
+
+
+def test_failed_translation_is_not_cached(tmp_path, monkeypatch):
+    calls, memories = [], []
+
+    def engines_down(texts, langs, memory=None):
+        calls.append(list(langs))
+        raise TranslationError("aucun moteur", {lang: [""] * len(texts) for lang in langs},
+                               {lang: len(texts) for lang in langs})
+
+    def engines_up(texts, langs, memory=None):
+        memories.append(memory)
+        calls.append(list(langs))
+        return {lang: [f"{t} ({lang})" for t in texts] for lang in langs}
+
+    stages = StageCache(str(tmp_path), "input")
+    monkeypatch.setattr(pipeline, "translate_many_with_fallback", engines_down)
+    failed = pipeline.cached_translations(stages, ["Bonjour"], ["en"], "extraction", cache_dir=str(tmp_path))
+    blocks = failed["en"][0]["trad_blocks"]
+    assert blocks == [{"text": "Bonjour", "text_en": "Bonjour", "translation_confidence": 0.0}]
+    assert pipeline.failed_translations(blocks) == 1
+
+    # Prochain passage : la traduction est retentée, puis servie par le cache
+    monkeypatch.setattr(pipeline, "translate_many_with_fallback", engines_up)
+    retried = pipeline.cached_translations(stages, ["Bonjour"], ["en"], "extraction", cache_dir=str(tmp_path))
+    assert retried["en"][0]["trad_blocks"][0]["text_en"] == "Bonjour (en)"
+    again = pipeline.cached_translations(stages, ["Bonjour"], ["en"], "extraction")
+    assert again == retried
+    assert calls == [["en"], ["en"]]
+    # Mémoire de traduction rangée dans le cache du job
+    assert memories[0].db_path == str(tmp_path / "translation_memory.sqlite")
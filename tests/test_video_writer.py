@@ -0,0 +1,55 @@
+import cv2
+import numpy as np
+import pytest
+
+from video_pipeline.video_writer import FFmpegFrameWriter
+
+
+def _frame(value, width=64, height=48):
+    return np.full((height, width, 3), value, dtype=np.uint8)
+
+
+def test_frames_are_encoded_and_closed(tmp_path):
+    out_path = str(tmp_path / "out.mp4")
+    with FFmpegFrameWriter(out_path, 64, 48, fps=10, preset="ultrafast") as writer:
+        for value in (0, 80, 160, 240):
+            writer.write(_frame(value))
+    assert writer.frames_written == 4
+
+    cap = cv2.VideoCapture(out_path)
+    try:
+        assert int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)) == 64
+        assert int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) == 48
+        frames = []
+        ok, frame = cap.read()
+        while ok:
+            frames.append(frame)
+            ok, frame = cap.read()
+    finally:
+        cap.release()
+    assert len(frames) == 4
+    assert abs(int(frames[-1].mean()) - 240) < 8
+
+
+def test_wrong_frame_size_is_rejected(tmp_path):
+    writer = FFmpegFrameWriter(str(tmp_path / "out.mp4"), 64, 48, fps=10, preset="ultrafast")
+    try:
+        with pytest.raises(ValueError):
+            writer.write(_frame(0, width=48, height=64))
+        assert writer.frames_written == 0
+    finally:
+        writer.abort()
+
+
+def test_abort_kills_ffmpeg_and_removes_the_partial_file(tmp_path):
+    out_path = tmp_path / "out.mp4"
+    with pytest.raises(RuntimeError):
+        with FFmpegFrameWriter(str(out_path), 64, 48, fps=10, preset="ultrafast") as writer:
+            proc = writer._proc
+            writer.write(_frame(128))
+            raise RuntimeError("erreur de rendu en amont")
+
+    assert proc.returncode is not None
+    assert writer._proc is None
+    assert not out_path.exists()
+    writer.abort()  # idempotent
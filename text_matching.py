@@ -0,0 +1,97 @@
+import re
+from collections import defaultdict
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+
+def normalize_text(text: str) -> str:
+    """Minuscules, ponctuation retirée, espaces normalisés"""
+    return re.sub(r"[\W_]+", " ", (text or "").lower()).strip()
+
+
+def trigrams(normalized: str) -> Set[str]:
+    padded = f"  {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """Index inversé trigramme → segments, construit une fois sur la transcription"""
+
+    def __init__(self, segments: Sequence[Dict[str, Any]]):
+        self.texts = [normalize_text(seg.get("text", "")) for seg in segments]
+        self.grams = [trigrams(t) for t in self.texts]
+        self.starts = [float(seg.get("start", 0.0)) for seg in segments]
+        self.ends = [float(seg.get("end", 0.0)) for seg in segments]
+        self.postings: Dict[str, List[int]] = defaultdict(list)
+        for idx, grams in enumerate(self.grams):
+            for gram in grams:
+                self.postings[gram].append(idx)
+
+    def candidates(self, grams: Set[str], time: Optional[float] = None, window: Optional[float] = None,
+                   min_overlap: float = 0.2, limit: int = 8) -> List[Tuple[int, float]]:
+        """
+        Segments partageant assez de trigrammes (coefficient de Dice ≥ min_overlap), restreints
+        à ceux qui chevauchent [time - window, time + window], les `limit` meilleurs d'abord.
+        """
+        shared: Dict[int, int] = defaultdict(int)
+        for gram in grams:
+            for idx in self.postings.get(gram, ()):
+                shared[idx] += 1
+        scored = []
+        for idx, count in shared.items():
+            if time is not None and window is not None and (
+                    self.ends[idx] < time - window or self.starts[idx] > time + window):
+                continue
+            dice = 2.0 * count / (len(grams) + len(self.grams[idx]))
+            if dice >= min_overlap:
+                scored.append((idx, dice))
+        scored.sort(key=lambda c: -c[1])
+        return scored[:limit]
+
+
+def match_texts(
+    queries: Sequence[Dict[str, Any]],
+    segments: Sequence[Dict[str, Any]],
+    threshold: float,
+    fps: Optional[float] = None,
+    time_window: Optional[float] = None,
+    shortlist: int = 8
+) -> List[Tuple[int, int, float]]:
+    """
+    Appariement un-pour-un boxes OCR ↔ segments de transcription.
+    Chaque box n'est comparée (SequenceMatcher) qu'aux segments présélectionnés par l'index
+    trigrammes et par la fenêtre temporelle autour de sa frame ; les paires sont ensuite
+    attribuées globalement, meilleure similarité d'abord.
+    Retourne [(index box, index segment, similarité)].
+    """
+    index = TrigramIndex(segments)
+    pairs = []
+    for q_idx, box in enumerate(queries):
+        text = normalize_text(box.get("text", ""))
+        if not text:
+            continue
+        box_time = None
+        if fps and time_window is not None and "frame_idx" in box:
+            box_time = box["frame_idx"] / fps
+        for s_idx, _ in index.candidates(trigrams(text), box_time, time_window, limit=shortlist):
+            candidate = index.texts[s_idx]
+            if text == candidate:
+                pairs.append((1.0, q_idx, s_idx))
+                continue
+            matcher = SequenceMatcher(None, text, candidate)
+            # Bornes supérieures rapides avant l'alignement exact
+            if matcher.real_quick_ratio() < threshold or matcher.quick_ratio() < threshold:
+                continue
+            ratio = matcher.ratio()
+            if ratio >= threshold:
+                pairs.append((ratio, q_idx, s_idx))
+
+    pairs.sort(key=lambda p: (-p[0], p[1], p[2]))
+    used_queries, used_segments, matches = set(), set(), []
+    for ratio, q_idx, s_idx in pairs:
+        if q_idx in used_queries or s_idx in used_segments:
+            continue
+        used_queries.add(q_idx)
+        used_segments.add(s_idx)
+        matches.append((q_idx, s_idx, ratio))
+    return matches
@@ -0,0 +1,117 @@
+import logging
+from typing import Optional
+
+import cv2
+import numpy as np
+
+from video_pipeline.frame_sampler import iter_sampled_frames
+from video_pipeline.ocr_engines import ocr_engine
+
+logger = logging.getLogger(__name__)
+
+_GRAD_KERNEL = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+
+
+def _text_line_components(small, min_contrast: int = 40):
+    """
+    Gradient morphologique, binarisation d'Otsu, puis fermeture horizontale qui soude les
+    caractères d'une même ligne. Retourne (contours binaires, stats des composantes, masque
+    des composantes en forme de ligne de texte : allongées, de hauteur plausible, densité de
+    contours moyenne).
+    """
+    sh, width = small.shape
+    grad = cv2.morphologyEx(small, cv2.MORPH_GRADIENT, _GRAD_KERNEL)
+    otsu, binary = cv2.threshold(grad, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+    if otsu < min_contrast:  # Image peu contrastée : Otsu retiendrait le bruit de fond
+        _, binary = cv2.threshold(grad, min_contrast, 255, cv2.THRESH_BINARY)
+    closing_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (max(3, width // 40), 1))
+    lines = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, closing_kernel)
+
+    n, _, stats, _ = cv2.connectedComponentsWithStats(lines, connectivity=8)
+    stats = stats[1:]
+    if n <= 1:
+        return binary, stats, np.zeros(0, dtype=bool)
+    x, y, cw, ch, area = (stats[:, i] for i in range(5))
+    edge_density = np.array([
+        np.count_nonzero(binary[yy:yy + hh, xx:xx + ww]) / float(ww * hh)
+        for xx, yy, ww, hh in zip(x, y, cw, ch)
+    ])
+    is_line = (
+        (cw >= 2.0 * ch) & (ch >= 0.012 * sh) & (ch <= 0.12 * sh) & (cw >= 0.08 * width)
+        & (area >= 0.45 * cw * ch) & (edge_density >= 0.25) & (edge_density <= 0.85)
+    )
+    return binary, stats, is_line
+
+
+def text_line_mask(small, min_contrast: int = 40, pad: int = 2):
+    """
+    (masque booléen des lignes de texte probables, contours binaires) d'une miniature en
+    niveaux de gris ; chaque ligne est élargie de `pad` pixels.
+    """
+    binary, stats, is_line = _text_line_components(small, min_contrast)
+    mask = np.zeros(small.shape, dtype=bool)
+    for x, y, w, h, _ in stats[is_line]:
+        mask[max(0, y - pad):y + h + pad, max(0, x - pad):x + w + pad] = True
+    return mask, binary
+
+
+def text_likelihood(frame, width: int = 320, min_contrast: int = 40) -> float:
+    """
+    Vraisemblance (0–1) qu'une frame contienne du texte, sans OCR : nombre de composantes
+    en forme de ligne de texte sur une miniature en niveaux de gris (voir _text_line_components).
+    """
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    h, w = gray.shape
+    scale = width / float(w)
+    small = cv2.resize(gray, (width, max(1, int(h * scale))), interpolation=cv2.INTER_AREA)
+    _, _, is_line = _text_line_components(small, min_contrast)
+    return float(min(1.0, np.count_nonzero(is_line) / 3.0))
+
+
+def detect_text_presence(
+    video_path: str,
+    n_samples: int = 12,
+    high: float = 0.67,
+    low: float = 0.2,
+    max_ocr_frames: int = 2,
+    ocr_backend: str = "easyocr",
+    min_conf: float = 0.5,
+    stats: Optional[dict] = None
+) -> bool:
+    """
+    Détection rapide de texte incrusté :
+    1. heuristique OpenCV sur `n_samples` frames décodées séquentiellement ; sortie dès qu'une
+       frame dépasse `high`
+    2. seules les frames ambiguës (entre `low` et `high`, les plus probables d'abord)
+       passent par le vrai OCR, via le registre des moteurs
+    """
+    if stats is None:
+        stats = {}
+    stats.update({"frames_scored": 0, "ocr_frames": 0})
+    cap = cv2.VideoCapture(video_path)
+    try:
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or 1
+        interval = max(1, total // max(1, n_samples))
+        ambiguous = []
+        for frame_idx, frame in iter_sampled_frames(cap, interval, max_frames=n_samples):
+            score = text_likelihood(frame)
+            stats["frames_scored"] += 1
+            if score >= high:
+                logger.info(f"Texte détecté (heuristique) frame {frame_idx}, score {score:.2f}")
+                return True
+            if score > low:
+                ambiguous.append((score, frame_idx, frame))
+                ambiguous.sort(key=lambda a: -a[0])
+                del ambiguous[max_ocr_frames:]
+    finally:
+        cap.release()
+
+    for score, frame_idx, frame in ambiguous:
+        stats["ocr_frames"] += 1
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        with ocr_engine(ocr_backend) as reader:
+            result = reader.readtext(gray)
+        if any(conf > min_conf for (_, _, conf) in result):
+            logger.info(f"Texte confirmé par OCR frame {frame_idx}")
+            return True
+    return False
@@ -1,15 +1,43 @@
-import cv2
+from video_pipeline.background_plate import build_background_plate
+from video_pipeline.inpaint_engine import boxes_mask, inpaint_boxes, inpaint_mask
 # Option: Importer LaMa, RePaint, ou utiliser OpenCV inpainting
 
 def remove_text_with_inpainting(frame, bbox_list, method="opencv"):
     """
     Supprime le texte sur la frame via inpainting (bbox_list = liste [x,y,w,h]).
-    Pour l'instant, version OpenCV simple ; TODO: intégrer LaMa/RePaint.
+    Version OpenCV : seuls les crops autour des boxes sont inpaintés, masque resserré aux caractères.
     """
-    mask = np.zeros(frame.shape[:2], dtype=np.uint8)
-    for x, y, w, h in bbox_list:
-        mask[y:y+h, x:x+w] = 255
     if method == "opencv":
-        return cv2.inpaint(frame, mask, 3, cv2.INPAINT_TELEA)
+        return inpaint_boxes(frame, bbox_list)
     # TODO: Ajouter appel LaMa/RePaint pour inpainting avancé
-    return frame
\ No newline at end of file
+    return frame
+
+
+def remove_text_with_background_plate(frames, bbox_lists, window=30, fallback=None):
+    """
+    Mode plan fixe : le fond derrière le texte est reconstruit par médiane temporelle sur des
+    fenêtres de `window` frames (pixels visibles dans d'autres frames), puis recollé.
+    Seuls les pixels jamais observés sans texte passent par l'inpainting (fallback(frame, mask),
+    par défaut OpenCV par crops). Générateur : une frame nettoyée par frame d'entrée.
+    """
+    if fallback is None:
+        fallback = inpaint_mask
+    chunk = []
+    for frame, boxes in zip(frames, bbox_lists):
+        chunk.append((frame, boxes_mask(frame.shape, boxes, pad=2)))
+        if len(chunk) == window:
+            yield from _clean_chunk(chunk, fallback)
+            chunk = []
+    if chunk:
+        yield from _clean_chunk(chunk, fallback)
+
+
+def _clean_chunk(chunk, fallback):
+    plate = build_background_plate([f for f, _ in chunk], [m for _, m in chunk])
+    for frame, mask in chunk:
+        if not mask.any():
+            yield frame
+        elif plate is None:
+            yield fallback(frame, mask.astype("uint8") * 255)
+        else:
+            yield plate.fill(frame, mask, fallback)
@@ -0,0 +1,62 @@
+from functools import lru_cache
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+
+@lru_cache(maxsize=64)
+def load_font(font_path, font_size):
+    """Charge une police TrueType une seule fois par (chemin, taille)."""
+    try:
+        return ImageFont.truetype(font_path, font_size)
+    except IOError:
+        return ImageFont.load_default()
+
+
+def _text_bbox(font, text):
+    if hasattr(font, "getbbox"):
+        return font.getbbox(text)
+    w, h = font.getsize(text)  # Pillow < 8
+    return (0, 0, w, h)
+
+
+@lru_cache(maxsize=512)
+def render_text_sprite(text, font_path, font_size, color, wrap_width):
+    """
+    Rastérise une légende une seule fois en sprite RGBA ajusté au texte.
+    La taille de police est réduite (min 12) si le texte dépasse wrap_width.
+    Retourne (sprite, (dx, dy)) : décalage du sprite par rapport au point d'ancrage de draw.text.
+    """
+    font = load_font(font_path, font_size)
+    left, top, right, bottom = _text_bbox(font, text)
+    if right - left > wrap_width > 0:
+        font = load_font(font_path, max(12, int(font_size * wrap_width / (right - left))))
+        left, top, right, bottom = _text_bbox(font, text)
+
+    width, height = max(1, right - left), max(1, bottom - top)
+    layer = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    ImageDraw.Draw(layer).text((-left, -top), text, font=font, fill=tuple(color) + (255,))
+    sprite = np.array(layer)
+    sprite.setflags(write=False)  # Partagé par le cache : lecture seule
+    return sprite, (left, top)
+
+
+def blend_sprite(frame, sprite, x, y, alpha=1.0):
+    """
+    Mélange le sprite RGBA dans la frame RGB (en place), uniquement sur sa zone englobante.
+    alpha : opacité globale (fondus) appliquée au canal alpha du sprite.
+    """
+    if alpha <= 0:
+        return frame
+    fh, fw = frame.shape[:2]
+    sh, sw = sprite.shape[:2]
+    x0, y0 = max(0, x), max(0, y)
+    x1, y1 = min(fw, x + sw), min(fh, y + sh)
+    if x0 >= x1 or y0 >= y1:
+        return frame
+
+    patch = sprite[y0 - y:y1 - y, x0 - x:x1 - x]
+    a = patch[..., 3:4].astype(np.float32) * (alpha / 255.0)
+    roi = frame[y0:y1, x0:x1]
+    roi[...] = (roi * (1.0 - a) + patch[..., :3] * a + 0.5).astype(np.uint8)
+    return frame
@@ -1,4 +1,173 @@
 import json
+from bisect import bisect_right
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from video_pipeline.box_geometry import Box, box_iou, union_box
+from video_pipeline.text_matching import normalize_text
+
+
+def _box_frame(block: Dict[str, Any]) -> int:
+    return int(block.get("frame_idx", block.get("frame", 0)))
+
+
+def group_lines(blocks: Sequence[Dict[str, Any]], gap_ratio: float = 1.0) -> List[Dict[str, Any]]:
+    """
+    Regroupe les détections d'une même frame en lignes (mots voisins sur la même hauteur),
+    pour que les moteurs OCR au mot (Tesseract) et à la ligne (EasyOCR) donnent les mêmes pistes.
+    """
+    lines: List[List[Dict[str, Any]]] = []
+    for block in sorted(blocks, key=lambda b: (b["box"][0], b["box"][1])):
+        x, y, w, h = block["box"]
+        for line in lines:
+            lx, ly, lw, lh = line[-1]["box"]
+            overlap = min(y + h, ly + lh) - max(y, ly)
+            if overlap >= 0.5 * min(h, lh) and x - (lx + lw) <= gap_ratio * max(h, lh):
+                line.append(block)
+                break
+        else:
+            lines.append([block])
+
+    grouped = []
+    for line in lines:
+        box = tuple(line[0]["box"])
+        for block in line[1:]:
+            box = union_box(box, tuple(block["box"]))
+        grouped.append({
+            "text": " ".join(b["text"].strip() for b in line if b.get("text", "").strip()),
+            "conf": sum(float(b.get("conf", 1.0)) for b in line) / len(line),
+            "box": box,
+            "frame_idx": _box_frame(line[0]),
+        })
+    return grouped
+
+
+@dataclass
+class TextTrack:
+    """
+    Un même texte à l'écran, suivi d'une frame échantillonnée à l'autre.
+    end_frame : dernière frame où il a été lu ; hold_until : dernière frame où il est supposé
+    encore affiché (veille de la frame échantillonnée suivante).
+    """
+    track_id: int
+    start_frame: int
+    end_frame: int
+    box: Box
+    last_box: Box
+    last_text: str
+    last_sample: int
+    observations: List[Dict[str, Any]] = field(default_factory=list)
+    hold_until: Optional[int] = None
+
+    def add(self, detection: Dict[str, Any], sample: int):
+        self.observations.append(detection)
+        self.end_frame = _box_frame(detection)
+        self.box = union_box(self.box, tuple(detection["box"]))
+        self.last_box = tuple(detection["box"])
+        self.last_text = normalize_text(detection["text"])
+        self.last_sample = sample
+
+    def consensus_text(self) -> str:
+        """Vote entre les lectures des frames, pondéré par la confiance OCR"""
+        votes: Counter = Counter()
+        best: Dict[str, Tuple[float, str]] = {}
+        for obs in self.observations:
+            norm = normalize_text(obs["text"])
+            conf = float(obs.get("conf", 1.0))
+            votes[norm] += conf
+            if norm not in best or conf > best[norm][0]:
+                best[norm] = (conf, obs["text"].strip())
+        winner = max(votes, key=lambda n: (votes[n], best[n][0]))
+        return best[winner][1]
+
+    def to_block(self) -> Dict[str, Any]:
+        return {
+            "text": self.consensus_text(),
+            "conf": sum(float(o.get("conf", 1.0)) for o in self.observations) / len(self.observations),
+            "box": self.box,
+            "frame_idx": self.start_frame,
+            "end_frame": self.end_frame if self.hold_until is None else self.hold_until,
+            "last_seen_frame": self.end_frame,
+            "track_id": self.track_id,
+            "observations": len(self.observations),
+        }
+
+
+def track_text_blocks(
+    ocr_boxes: Sequence[Dict[str, Any]],
+    iou_threshold: float = 0.3,
+    text_threshold: float = 0.6,
+    max_missed_samples: int = 1,
+    sampled_frames: Optional[Sequence[int]] = None,
+    last_frame: Optional[int] = None
+) -> List[TextTrack]:
+    """
+    Relie les détections OCR d'une frame échantillonnée à l'autre en pistes :
+    une ligne prolonge une piste si leurs boxes se recouvrent (IoU ≥ iou_threshold) et si
+    leurs textes normalisés se ressemblent (SequenceMatcher ≥ text_threshold). Une piste
+    non revue pendant plus de `max_missed_samples` frames échantillonnées est close.
+    Les appariements sont attribués un-pour-un, meilleur score d'abord.
+    sampled_frames : toutes les frames passées à l'OCR, y compris celles sans texte (par défaut,
+    celles des détections) ; last_frame : dernière frame de la vidéo. Chaque piste est tenue
+    jusqu'à la veille de l'échantillon suivant sa dernière lecture (hold_until).
+    """
+    by_frame: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+    for block in ocr_boxes:
+        if block.get("text", "").strip():
+            by_frame[_box_frame(block)].append(block)
+    samples = sorted(set(sampled_frames or ()) | set(by_frame))
+
+    tracks: List[TextTrack] = []
+    alive: List[TextTrack] = []
+    for sample, frame_idx in enumerate(samples):
+        alive = [t for t in alive if sample - t.last_sample <= max_missed_samples + 1]
+        if frame_idx not in by_frame:
+            continue
+        detections = [d for d in group_lines(by_frame[frame_idx]) if d["text"]]
+
+        pairs = []
+        for d_idx, det in enumerate(detections):
+            text = normalize_text(det["text"])
+            for t_idx, track in enumerate(alive):
+                iou = box_iou(track.last_box, tuple(det["box"]))
+                if iou < iou_threshold:
+                    continue
+                similarity = 1.0 if text == track.last_text else SequenceMatcher(None, text, track.last_text).ratio()
+                if similarity >= text_threshold:
+                    pairs.append((iou + similarity, d_idx, t_idx))
+
+        pairs.sort(key=lambda p: (-p[0], p[1], p[2]))
+        used_det, used_track = set(), set()
+        for _, d_idx, t_idx in pairs:
+            if d_idx in used_det or t_idx in used_track:
+                continue
+            used_det.add(d_idx)
+            used_track.add(t_idx)
+            alive[t_idx].add(detections[d_idx], sample)
+
+        for d_idx, det in enumerate(detections):
+            if d_idx in used_det:
+                continue
+            box = tuple(det["box"])
+            track = TextTrack(track_id=len(tracks), start_frame=frame_idx, end_frame=frame_idx,
+                              box=box, last_box=box, last_text="", last_sample=sample)
+            track.add(det, sample)
+            tracks.append(track)
+            alive.append(track)
+
+    # Après le dernier échantillon : jusqu'à la fin de la vidéo, sinon un intervalle médian
+    gaps = sorted(b - a for a, b in zip(samples, samples[1:]))
+    tail = last_frame if last_frame is not None else (samples[-1] + gaps[len(gaps) // 2] - 1 if gaps else None)
+    for track in tracks:
+        i = bisect_right(samples, track.end_frame)
+        if i < len(samples):
+            track.hold_until = samples[i] - 1
+        elif tail is not None:
+            track.hold_until = max(track.end_frame, tail)
+    return tracks
+
 
 def group_text_blocks(segments, merge_delta=0.5):
     grouped = []
@@ -15,6 +184,7 @@ def group_text_blocks(segments, merge_delta=0.5):
         grouped.append(buffer)
     return grouped
 
+
 def export_script_json(blocks, lang_detected="fr", type_video="voice_ocr", output="script.json"):
     script = {
         "lang_detected": lang_detected,
@@ -0,0 +1,143 @@
+import hashlib
+import json
+import logging
+import math
+import os
+import threading
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+# ---------- REGISTRE DES MODÈLES WHISPER ----------
+# Chaque taille de modèle est chargée une seule fois par processus ; l'inférence d'un même
+# modèle est sérialisée par un verrou (modèle PyTorch partagé).
+
+DEFAULT_WHISPER_MODEL = "small"
+
+_registry_lock = threading.Lock()
+_models: Dict[str, Any] = {}
+_model_locks: Dict[str, threading.Lock] = {}
+
+
+def _load_whisper(model_name):
+    import whisper
+    return whisper.load_model(model_name)
+
+
+def get_whisper_model(model_name=DEFAULT_WHISPER_MODEL):
+    """Modèle Whisper `model_name`, chargé au premier appel puis partagé par le processus."""
+    model = _models.get(model_name)
+    if model is not None:
+        return model
+    with _registry_lock:
+        model = _models.get(model_name)
+        if model is None:
+            logging.info(f"Chargement du modèle Whisper '{model_name}'")
+            model = _load_whisper(model_name)
+            _models[model_name] = model
+            _model_locks.setdefault(model_name, threading.Lock())
+        return model
+
+
+@contextmanager
+def whisper_model(model_name=DEFAULT_WHISPER_MODEL):
+    """Fournit le modèle Whisper partagé, avec accès exclusif le temps de l'inférence."""
+    model = get_whisper_model(model_name)
+    with _model_locks[model_name]:
+        yield model
+
+
+def release_whisper_models():
+    with _registry_lock:
+        _models.clear()
+        _model_locks.clear()
+
+
+# ---------- TRANSCRIPTION PAR VIDÉO ----------
+
+@dataclass
+class Transcription:
+    """Transcription Whisper d'un média, produite une fois et partagée par toutes les étapes"""
+    language: str
+    text: str
+    segments: List[Dict[str, Any]] = field(default_factory=list)
+    model: str = DEFAULT_WHISPER_MODEL
+
+    @property
+    def has_speech(self) -> bool:
+        return any(seg.get("text", "").strip() for seg in self.segments)
+
+
+_transcriptions: Dict[str, Transcription] = {}
+_transcriptions_lock = threading.Lock()
+_pending: Dict[str, threading.Lock] = {}
+
+
+def _media_key(media_path, model_name, language):
+    st = os.stat(media_path)
+    raw = f"{os.path.abspath(media_path)}|{st.st_size}|{st.st_mtime_ns}|{model_name}|{language or 'auto'}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _from_whisper_result(result, model_name) -> Transcription:
+    segments = []
+    for seg in result.get("segments", []):
+        text = seg.get("text", "").strip()
+        if not text:
+            continue
+        segments.append({
+            "text": text,
+            "start": float(seg["start"]),
+            "end": float(seg["end"]),
+            # Probabilité moyenne des tokens du segment
+            "confidence": round(math.exp(seg.get("avg_logprob", 0.0)), 3)
+        })
+    return Transcription(
+        language=result.get("language", "und"),
+        text=result.get("text", "").strip(),
+        segments=segments,
+        model=model_name
+    )
+
+
+def get_transcription(media_path, model_name=DEFAULT_WHISPER_MODEL, cache_dir=None,
+                      language=None) -> Transcription:
+    """
+    Transcription de `media_path` (vidéo ou audio, décodé directement par Whisper/ffmpeg).
+    Produite une seule fois par (fichier, modèle, langue) : mémoire du processus, puis
+    artefact JSON dans `cache_dir` réutilisé d'une exécution à l'autre.
+    """
+    key = _media_key(media_path, model_name, language)
+    cached = _transcriptions.get(key)
+    if cached is not None:
+        return cached
+
+    with _transcriptions_lock:
+        pending = _pending.setdefault(key, threading.Lock())
+    # Un seul calcul par média même si plusieurs étapes le demandent en parallèle
+    with pending:
+        cached = _transcriptions.get(key)
+        if cached is not None:
+            return cached
+
+        artifact = os.path.join(cache_dir, f"transcription_{key}.json") if cache_dir else None
+        if artifact and os.path.exists(artifact):
+            with open(artifact, encoding="utf-8") as f:
+                transcription = Transcription(**json.load(f))
+            logging.info(f"Transcription réutilisée : {artifact}")
+        else:
+            options = {"verbose": False}
+            if language:
+                options["language"] = language
+            with whisper_model(model_name) as model:
+                result = model.transcribe(media_path, **options)
+            transcription = _from_whisper_result(result, model_name)
+            logging.info(f"Transcription de {media_path} : {len(transcription.segments)} segments "
+                         f"(langue {transcription.language})")
+            if artifact:
+                os.makedirs(cache_dir, exist_ok=True)
+                with open(artifact, "w", encoding="utf-8") as f:
+                    json.dump(asdict(transcription), f, ensure_ascii=False)
+
+        _transcriptions[key] = transcription
+        return transcription
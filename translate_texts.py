@@ -1,19 +1,31 @@
 import json
+import os
 from deep_translator import GoogleTranslator
 
-def translate_texts(script_path, langs=["en", "es", "pt"]):
+from video_pipeline.translation_memory import GOOGLE_ENGINE, get_translation_memory
+
+def translate_texts(script_path, langs=["en", "es", "pt"], cache_dir=None):
+    """
+    Ajoute text_<lang> à chaque bloc du script JSON.
+    Mémoire de traduction sous cache_dir (par défaut <dossier du script>/cache).
+    """
     with open(script_path, encoding="utf-8") as f:
         script = json.load(f)
 
-    for block in script.get("texts", []):
-        text = block.get("text", "")
-        for lang in langs:
-            try:
-                translated = GoogleTranslator(source='auto', target=lang).translate(text)
-                block[f"text_{lang}"] = translated
-            except Exception as e:
-                print(f"❌ Erreur traduction {text} -> {lang}: {e}")
-                block[f"text_{lang}"] = "[ERROR]"
+    cache_dir = cache_dir or os.path.join(os.path.dirname(os.path.abspath(script_path)), "cache")
+    memory = get_translation_memory(cache_dir=cache_dir)
+    blocks = script.get("texts", [])
+    texts = [block.get("text", "") for block in blocks]
+    for lang in langs:
+        # Un seul lot par langue, limité aux textes absents de la mémoire de traduction
+        translator = GoogleTranslator(source='auto', target=lang)
+        try:
+            translated = memory.translate(texts, lang, GOOGLE_ENGINE, translator.translate_batch)
+        except Exception as e:
+            print(f"❌ Erreur traduction -> {lang}: {e}")
+            translated = ["[ERROR]"] * len(texts)
+        for block, trad in zip(blocks, translated):
+            block[f"text_{lang}"] = trad
 
     with open(script_path, "w", encoding="utf-8") as f:
         json.dump(script, f, ensure_ascii=False, indent=2)
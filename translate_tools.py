@@ -1,19 +1,26 @@
 from deep_translator import GoogleTranslator
+
+from video_pipeline.translation_memory import GOOGLE_ENGINE, get_translation_memory
 # Option: ElevenLabs or gTTS for TTS
 
-def translate_texts(texts, src_lang, target_langs):
+def translate_texts(texts, src_lang, target_langs, cache_dir=None):
     """
     Ajoute text_<lang> pour chaque segment, sauf langue d'origine.
+    cache_dir : dossier de la mémoire de traduction persistée (sinon, mémoire du processus).
     """
-    for txt_obj in texts:
-        src_text = txt_obj["text"]
-        for lang in target_langs:
-            if lang == src_lang:
-                continue
-            try:
-                txt_obj[f"text_{lang}"] = GoogleTranslator(source=src_lang, target=lang).translate(src_text)
-            except Exception:
-                txt_obj[f"text_{lang}"] = "[translation failed]"
+    memory = get_translation_memory(cache_dir=cache_dir)
+    src_texts = [txt_obj["text"] for txt_obj in texts]
+    for lang in target_langs:
+        if lang == src_lang:
+            continue
+        translator = GoogleTranslator(source=src_lang, target=lang)
+        try:
+            translated = memory.translate(src_texts, lang, GOOGLE_ENGINE,
+                                          translator.translate_batch, source_lang=src_lang)
+        except Exception:
+            translated = ["[translation failed]"] * len(src_texts)
+        for txt_obj, trad in zip(texts, translated):
+            txt_obj[f"text_{lang}"] = trad
     return texts
 
 def tts_texts(texts, target_langs):
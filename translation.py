@@ -1,5 +1,7 @@
 import requests
 
+from video_pipeline.translation_dispatcher import TranslationError, dispatch_translations
+
 def translate_text(text, target_lang="en", api="google"):
     """
     Traduit le texte dans la langue cible. Fallback sur plusieurs API selon le paramètre.
@@ -27,19 +29,56 @@ def translate_text(text, target_lang="en", api="google"):
         print(f"[WARN] Traduction échouée ({api}) : {e}")
         return text  # Fallback : texte d’origine
 
+def translate_batch(texts, target_lang="en", api="libretranslate"):
+    """
+    Traduit une liste de textes en une seule requête.
+    Lève une exception en cas d'échec (pas de fallback silencieux : le résultat alimente
+    la mémoire de traduction).
+    """
+    if api == "libretranslate":
+        resp = requests.post(
+            "https://libretranslate.de/translate",
+            json={
+                "q": list(texts),
+                "source": "auto",
+                "target": target_lang,
+                "format": "text"
+            },
+            timeout=5
+        )
+        resp.raise_for_status()
+        translated = resp.json().get("translatedText")
+        return translated if isinstance(translated, list) else [translated]
+    raise ValueError(f"API de traduction non supportée : {api}")
+
+def libretranslate(texts, target_lang):
+    """Moteur LibreTranslate au format du dispatcher : (texts, target_lang) -> [str]"""
+    return translate_batch(texts, target_lang, api="libretranslate")
+
+API_ENGINES = {"libretranslate": libretranslate}
+
 def translate_blocks(blocks, target_langs=["en", "es"], api="libretranslate"):
     """
     Traduit chaque bloc dans plusieurs langues. 
     blocks : liste de phrases ou de dicts {"text": ...}
     Retourne une liste de dicts { "text": ..., "text_en": ..., "text_es": ... }
     """
-    results = []
-    for block in blocks:
-        orig = block if isinstance(block, str) else block.get("text", "")
-        res = {"text": orig}
-        for lang in target_langs:
-            res[f"text_{lang}"] = translate_text(orig, target_lang=lang, api=api)
-        results.append(res)
+    origs = [block if isinstance(block, str) else block.get("text", "") for block in blocks]
+    results = [{"text": orig} for orig in origs]
+    engine = API_ENGINES.get(api)
+    if engine is None:
+        print(f"[WARN] API de traduction non supportée : {api}")
+        translated = {}
+    else:
+        # Toutes les langues en parallèle, limitées aux textes absents de la mémoire de traduction
+        try:
+            translated = dispatch_translations(origs, target_langs, [engine])
+        except TranslationError as e:
+            print(f"[WARN] {e}")
+            translated = e.partial
+    for lang in target_langs:
+        for res, orig, trad in zip(results, origs, translated.get(lang, [""] * len(origs))):
+            res[f"text_{lang}"] = trad or orig  # Fallback : texte d’origine
     return results
 
 if __name__ == "__main__":
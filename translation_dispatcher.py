@@ -0,0 +1,239 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+
+from video_pipeline.translation_memory import TranslationMemory, get_translation_memory, normalize_source
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitError(Exception):
+    """Le moteur signale un dépassement de quota (HTTP 429)"""
+
+    def __init__(self, message: str = "", retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TranslationError(Exception):
+    """
+    Aucun moteur n'a pu traduire une partie des textes. `partial` contient le résultat
+    {lang: [traductions]} obtenu malgré tout, avec "" pour les textes non traduits, et
+    `failed` le nombre de textes non traduits par langue.
+    """
+
+    def __init__(self, message: str, partial: Dict[str, List[str]], failed: Dict[str, int]):
+        super().__init__(message)
+        self.partial = partial
+        self.failed = failed
+
+
+@dataclass
+class EngineLimits:
+    """Limites d'appel d'un moteur de traduction"""
+    max_concurrency: int = 4
+    rate_per_second: float = 5.0
+    burst: int = 5
+
+
+DEFAULT_ENGINE_LIMITS: Dict[str, EngineLimits] = {
+    "translate_google": EngineLimits(max_concurrency=4, rate_per_second=5.0, burst=5),
+    "translate_deepl": EngineLimits(max_concurrency=2, rate_per_second=2.0, burst=2),
+    "translate_gpt": EngineLimits(max_concurrency=2, rate_per_second=1.0, burst=2),
+    "libretranslate": EngineLimits(max_concurrency=2, rate_per_second=1.0, burst=2),
+}
+
+
+class TokenBucket:
+    """
+    Seau à jetons thread-safe, indépendant de la boucle asyncio : `reserve()` consomme un
+    jeton (éventuellement à crédit) et retourne le délai à attendre avant l'appel.
+    Partagé par moteur à l'échelle du processus.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def _bucket_for(name: str, limits: EngineLimits) -> TokenBucket:
+    with _buckets_lock:
+        bucket = _buckets.get(name)
+        if bucket is None:
+            bucket = _buckets[name] = TokenBucket(limits.rate_per_second, limits.burst)
+        return bucket
+
+
+def _is_rate_limited(exc: Exception) -> bool:
+    if isinstance(exc, RateLimitError):
+        return True
+    status = getattr(exc, "status_code", None) or getattr(getattr(exc, "response", None), "status_code", None)
+    return status == 429 or "429" in str(exc) or "Too Many Requests" in str(exc)
+
+
+def _retry_after(exc: Exception) -> Optional[float]:
+    if isinstance(exc, RateLimitError):
+        return exc.retry_after
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+class TranslationDispatcher:
+    """
+    Répartit les traductions (lots × langues) en parallèle sur une boucle asyncio.
+    - limites de concurrence et seau à jetons par moteur
+    - retry avec backoff exponentiel sur les 429
+    - fallback ordonné entre moteurs, comme translate_with_fallback
+    - mémoire de traduction consultée avant tout appel
+    Les moteurs sont des fonctions (texts, target_lang) -> [str] ; les fonctions
+    synchrones tournent dans le pool de threads de la boucle, les coroutines sont attendues.
+    """
+
+    def __init__(
+        self,
+        engines: Sequence[Callable],
+        limits: Optional[Dict[str, EngineLimits]] = None,
+        memory: Optional[TranslationMemory] = None,
+        chunk_size: int = 50,
+        max_retries: int = 3,
+        backoff_base: float = 0.5
+    ):
+        self.engines = list(engines)
+        self.limits = {**DEFAULT_ENGINE_LIMITS, **(limits or {})}
+        self.memory = memory if memory is not None else get_translation_memory()
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+
+    def _limits_for(self, name: str) -> EngineLimits:
+        return self.limits.get(name) or EngineLimits()
+
+    async def _call_engine(self, engine: Callable, texts: List[str], target_lang: str,
+                           semaphore: asyncio.Semaphore) -> List[str]:
+        name = engine.__name__
+        bucket = _bucket_for(name, self._limits_for(name))
+        attempt = 0
+        while True:
+            async with semaphore:
+                await asyncio.sleep(bucket.reserve())
+                try:
+                    if asyncio.iscoroutinefunction(engine):
+                        return await engine(texts, target_lang)
+                    loop = asyncio.get_running_loop()
+                    return await loop.run_in_executor(None, engine, texts, target_lang)
+                except Exception as e:
+                    if not _is_rate_limited(e) or attempt >= self.max_retries:
+                        raise
+                    delay = _retry_after(e) or self.backoff_base * (2 ** attempt)
+                    delay += random.uniform(0, self.backoff_base)
+                    attempt += 1
+            logger.warning(f"Traduction {name} limitée (429), nouvel essai {attempt}/{self.max_retries} dans {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    async def _translate_chunk(self, chunk: List[str], target_lang: str,
+                               semaphores: Dict[str, asyncio.Semaphore]) -> Optional[List[str]]:
+        """Traductions du lot, ou None si tous les moteurs ont échoué"""
+        for engine in self.engines:
+            try:
+                trad = await self._call_engine(engine, chunk, target_lang, semaphores[engine.__name__])
+                if trad and len(trad) == len(chunk) and all(t.strip() for t in trad):
+                    logger.info(f"Traduction réussie avec {engine.__name__} ({target_lang}, {len(chunk)} textes)")
+                    self.memory.store({src: t.strip() for src, t in zip(chunk, trad)},
+                                      "auto", target_lang, engine.__name__)
+                    return [t.strip() for t in trad]
+            except Exception as e:
+                logger.warning(f"Traduction {engine.__name__} échouée : {e}")
+        logger.error(f"Toutes les API de traduction ont échoué ({target_lang}, {len(chunk)} textes).")
+        return None
+
+    async def translate_many(self, texts: Sequence[str], target_langs: Sequence[str]) -> Dict[str, List[str]]:
+        """
+        Traduit `texts` dans toutes les langues : {lang: [traductions dans l'ordre de texts]}.
+        Lève TranslationError (avec le résultat partiel) si un lot n'a été traduit par aucun moteur.
+        """
+        semaphores = {e.__name__: asyncio.Semaphore(self._limits_for(e.__name__).max_concurrency)
+                      for e in self.engines}
+        sources = [normalize_source(t) for t in texts]
+        unique = list(dict.fromkeys(s for s in sources if s))
+
+        known: Dict[str, Dict[str, str]] = {}
+        failed: Dict[str, int] = {}
+        jobs = []
+        for lang in target_langs:
+            found: Dict[str, str] = {}
+            pending = unique
+            for engine in self.engines:
+                if not pending:
+                    break
+                found.update(self.memory.lookup(pending, "auto", lang, engine.__name__))
+                pending = [s for s in pending if s not in found]
+            known[lang] = found
+            for i in range(0, len(pending), self.chunk_size):
+                chunk = pending[i:i + self.chunk_size]
+                jobs.append((lang, chunk, self._translate_chunk(chunk, lang, semaphores)))
+
+        if jobs:
+            logger.info(f"Traduction : {len(jobs)} requêtes concurrentes pour {len(target_langs)} langue(s)")
+            results = await asyncio.gather(*(job for _, _, job in jobs))
+            for (lang, chunk, _), trad in zip(jobs, results):
+                if trad is None:
+                    failed[lang] = failed.get(lang, 0) + len(chunk)
+                else:
+                    known[lang].update({src: t for src, t in zip(chunk, trad) if t})
+
+        translated = {lang: [known[lang].get(s, "") if s else "" for s in sources] for lang in target_langs}
+        if failed:
+            detail = ", ".join(f"{lang} : {n}" for lang, n in failed.items())
+            raise TranslationError(f"Textes non traduits par aucun moteur ({detail})", translated, failed)
+        return translated
+
+
+def dispatch_translations(texts: Sequence[str], target_langs: Sequence[str],
+                          engines: Sequence[Callable], **kwargs) -> Dict[str, List[str]]:
+    """Point d'entrée synchrone du dispatcher (utilisable depuis du code non asynchrone)"""
+    dispatcher = TranslationDispatcher(engines, **kwargs)
+    coro = dispatcher.translate_many(texts, target_langs)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    # Déjà dans une boucle asyncio : exécution dans un thread dédié
+    result = {}
+
+    def runner():
+        try:
+            result["value"] = asyncio.run(coro)
+        except BaseException as e:
+            result["error"] = e
+
+    thread = threading.Thread(target=runner, name="translation-dispatcher")
+    thread.start()
+    thread.join()
+    if "error" in result:
+        raise result["error"]
+    return result["value"]
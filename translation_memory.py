@@ -0,0 +1,148 @@
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+# ---------- MÉMOIRE DE TRADUCTION ----------
+# Clé : (texte source normalisé, langue source, langue cible, moteur)
+# Tier mémoire LRU devant une base SQLite partagée par tous les chemins de traduction.
+
+# Base explicite pour les appels sans dossier de cache ; sinon, mémoire seule (rien sur le disque)
+DEFAULT_DB_PATH = os.environ.get("TRANSLATION_MEMORY_PATH")
+DB_FILENAME = "translation_memory.sqlite"
+
+# Clé moteur commune à tous les clients Google Translate (googletrans, deep_translator,
+# fallback_tools.translate_google) : une traduction stockée par l'un sert aux autres
+GOOGLE_ENGINE = "translate_google"
+
+
+def normalize_source(text):
+    """Normalise le texte source (unicode NFC, espaces) pour maximiser les correspondances."""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text or "")).strip()
+
+
+class TranslationMemory:
+    def __init__(self, db_path=None, memory_entries=4096):
+        self.db_path = db_path
+        self.memory_entries = memory_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        if db_path:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                " source TEXT NOT NULL, source_lang TEXT NOT NULL, target_lang TEXT NOT NULL,"
+                " engine TEXT NOT NULL, translation TEXT NOT NULL, created_at REAL NOT NULL,"
+                " PRIMARY KEY (source, source_lang, target_lang, engine))"
+            )
+            self._conn.commit()
+
+    def _remember(self, key, translation):
+        self._memory[key] = translation
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def lookup(self, sources, source_lang, target_lang, engine):
+        """Retourne {texte normalisé: traduction} pour les textes déjà connus."""
+        found = {}
+        missing = []
+        with self._lock:
+            for src in sources:
+                key = (src, source_lang, target_lang, engine)
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[src] = self._memory[key]
+                else:
+                    missing.append(src)
+            if missing and self._conn is not None:
+                # Requêtes par paquets pour rester sous la limite de variables SQLite
+                for i in range(0, len(missing), 500):
+                    chunk = missing[i:i + 500]
+                    rows = self._conn.execute(
+                        "SELECT source, translation FROM translations"
+                        " WHERE source_lang = ? AND target_lang = ? AND engine = ?"
+                        f" AND source IN ({','.join('?' * len(chunk))})",
+                        (source_lang, target_lang, engine, *chunk)
+                    ).fetchall()
+                    for src, translation in rows:
+                        found[src] = translation
+                        self._remember((src, source_lang, target_lang, engine), translation)
+        return found
+
+    def store(self, pairs, source_lang, target_lang, engine):
+        """Enregistre {texte normalisé: traduction}."""
+        if not pairs:
+            return
+        now = time.time()
+        with self._lock:
+            for src, translation in pairs.items():
+                self._remember((src, source_lang, target_lang, engine), translation)
+            if self._conn is not None:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO translations"
+                    " (source, source_lang, target_lang, engine, translation, created_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    [(src, source_lang, target_lang, engine, tr, now) for src, tr in pairs.items()]
+                )
+                self._conn.commit()
+
+    def translate(self, texts, target_lang, engine, translate_batch, source_lang="auto"):
+        """
+        Traduit `texts` en consultant d'abord la mémoire.
+        Les textes manquants (dédoublonnés) sont envoyés en une seule requête :
+        translate_batch(list_of_str) -> list_of_str (même ordre).
+        Les exceptions du moteur sont propagées ; rien n'est mémorisé dans ce cas.
+        """
+        sources = [normalize_source(t) for t in texts]
+        wanted = list(dict.fromkeys(s for s in sources if s))
+        known = self.lookup(wanted, source_lang, target_lang, engine)
+        misses = [s for s in wanted if s not in known]
+
+        if misses:
+            logging.info(f"Mémoire de traduction ({engine}, {target_lang}) : "
+                         f"{len(wanted) - len(misses)} trouvés, {len(misses)} à traduire")
+            translated = translate_batch(misses)
+            if translated is None or len(translated) != len(misses):
+                raise ValueError(f"Le moteur {engine} a renvoyé {len(translated or [])} traductions "
+                                 f"pour {len(misses)} textes")
+            fresh = {src: tr.strip() for src, tr in zip(misses, translated) if tr and tr.strip()}
+            self.store(fresh, source_lang, target_lang, engine)
+            known.update(fresh)
+
+        return [known.get(s, "") if s else "" for s in sources]
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_memories = {}
+_memories_lock = threading.Lock()
+
+
+def get_translation_memory(db_path=None, cache_dir=None):
+    """
+    Retourne la mémoire de traduction partagée (une instance par processus et par base).
+    La base est `db_path`, sinon <cache_dir>/translation_memory.sqlite (cache du job, comme
+    le cache OCR), sinon TRANSLATION_MEMORY_PATH ; à défaut, la mémoire n'est pas persistée.
+    """
+    if db_path is None and cache_dir:
+        db_path = os.path.join(cache_dir, DB_FILENAME)
+    db_path = db_path or DEFAULT_DB_PATH
+    key = os.path.abspath(db_path) if db_path else ""
+    with _memories_lock:
+        tm = _memories.get(key)
+        if tm is None:
+            tm = TranslationMemory(key or None)
+            _memories[key] = tm
+        return tm
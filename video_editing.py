@@ -1,8 +1,15 @@
+import logging
+
 import moviepy.editor as mp
-from PIL import Image, ImageDraw, ImageFont
-import numpy as np
-import cv2
-import requests
+
+from video_pipeline.inpaint_cache import TemporalInpaintCache
+from video_pipeline.lama_client import get_lama_client
+from video_pipeline.output_profiles import SOURCE_PROFILE, ProfileTransform, profile_output_path
+from video_pipeline.render_plan import build_render_plan
+from video_pipeline.text_sprites import blend_sprite, render_text_sprite
+from video_pipeline.video_writer import FFmpegFrameWriter
+
+logger = logging.getLogger(__name__)
 
 LANG_COLORS = {
     "en": (255, 255, 255),     # blanc
@@ -12,20 +19,8 @@ LANG_COLORS = {
 }
 
 def inpaint_with_lama(frame, mask):
-    _, frame_png = cv2.imencode('.png', cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
-    _, mask_png = cv2.imencode('.png', mask)
-    files = {
-        'image': ('frame.png', frame_png.tobytes(), 'image/png'),
-        'mask': ('mask.png', mask_png.tobytes(), 'image/png')
-    }
-    response = requests.post("http://localhost:5000/inpaint", files=files, timeout=30)
-    if response.ok:
-        nparr = np.frombuffer(response.content, np.uint8)
-        result = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-        return cv2.cvtColor(result, cv2.COLOR_BGR2RGB)
-    else:
-        print("[WARN] Inpainting IA échoué, fallback OpenCV.")
-        return cv2.inpaint(frame, mask, inpaintRadius=3, flags=cv2.INPAINT_TELEA)
+    """Inpainting IA (serveur LaMa) avec fallback OpenCV, via le client partagé"""
+    return get_lama_client().inpaint(frame, mask)
 
 def overlay_text(
     frame,
@@ -36,40 +31,32 @@ def overlay_text(
     color=(255,255,255),
     opacity=1.0,
     animation=None,
-    progress=1.0
+    progress=1.0,
+    inplace=False
 ):
     """
     Ajoute le texte traduit sur la frame.
     - opacity: 0 (transparent) à 1 (opaque)
     - animation: type d’animation ('fade', 'slide'), progress: 0 (début) à 1 (fin)
+    - inplace: modifie directement `frame` (boucle de rendu) au lieu d'une copie
+    Le texte est rastérisé une seule fois (cache de sprites), puis seul son rectangle
+    englobant est mélangé dans la frame.
     """
-    pil_im = Image.fromarray(frame).convert("RGBA")
-    txt_layer = Image.new("RGBA", pil_im.size, (255,255,255,0))
-    draw = ImageDraw.Draw(txt_layer)
-    try:
-        font = ImageFont.truetype(font_path, font_size)
-    except IOError:
-        font = ImageFont.load_default()
-
     x, y, w, h = box
-    w_text, h_text = draw.textsize(text, font=font)
-    if w_text > w:
-        font = ImageFont.truetype(font_path, max(12, int(font_size * w / w_text)))
-        w_text, h_text = draw.textsize(text, font=font)
+    sprite, (dx, dy) = render_text_sprite(text, font_path, font_size, tuple(color), w)
 
     # Animation : fade (opacity dynamique)
     if animation == 'fade':
-        effective_opacity = int(255 * opacity * progress)
+        effective_opacity = opacity * progress
     else:
-        effective_opacity = int(255 * opacity)
+        effective_opacity = opacity
     # Animation : slide (texte qui "glisse" à l’apparition)
     if animation == 'slide':
         slide_offset = int((1.0 - progress) * w)
         x = x - slide_offset
 
-    draw.text((x, y), text, font=font, fill=color + (effective_opacity,))
-    overlaid = Image.alpha_composite(pil_im, txt_layer)
-    return np.array(overlaid.convert("RGB"))
+    out = frame if inplace else frame.copy()
+    return blend_sprite(out, sprite, x + dx, y + dy, alpha=effective_opacity)
 
 def edit_video_with_translations(
     video_path,
@@ -79,48 +66,134 @@ def edit_video_with_translations(
     lang="en",
     overlay_timing=None,
     overlay_opacity=0.85,
-    overlay_animation="fade"
+    overlay_animation="fade",
+    quality="high"
+):
+    """
+    Rendu en flux : chaque frame traitée est envoyée directement à l'encodeur ffmpeg,
+    la piste audio d'origine est recopiée sans réencodage.
+    """
+    edit_video_multilang(video_path, ocr_boxes, trad_blocs, {lang: out_path},
+                         overlay_timing=overlay_timing, overlay_opacity=overlay_opacity,
+                         overlay_animation=overlay_animation, quality=quality)
+
+def edit_video_multilang(
+    video_path,
+    ocr_boxes,
+    trad_blocs,
+    out_paths,
+    overlay_timing=None,
+    overlay_opacity=0.85,
+    overlay_animation="fade",
+    quality="high",
+    profiles=None
 ):
+    """
+    Rendu de plusieurs langues et formats en une seule passe de décodage.
+    - out_paths : {langue: chemin de sortie} ; trad_blocs porte un champ text_<langue> par langue
+    - profiles : formats de sortie (OutputProfile, source seule par défaut) ; chaque profil
+      autre que la source ajoute son nom au chemin (video_edited_en_9x16.mp4)
+    - chaque frame est décodée et inpaintée une fois, mise au format de chaque profil, puis
+      chaque (langue, profil) y incruste son texte, mis en page pour ce profil, et l'envoie à
+      son propre encodeur ffmpeg (les encodages tournent en parallèle)
+    Retourne {langue: {profil: chemin}}.
+    """
+    profiles = list(profiles or [SOURCE_PROFILE])
+    outputs = {lang: {p.name: profile_output_path(path, p) for p in profiles} for lang, path in out_paths.items()}
     clip = mp.VideoFileClip(video_path)
-    frames = []
     fps = clip.fps
+    transforms = {p.name: ProfileTransform(p, clip.size) for p in profiles}
+    audio_source = video_path if clip.audio is not None else None
+    sinks = []
+
+    try:
+        for lang, paths in outputs.items():
+            for profile in profiles:
+                transform = transforms[profile.name]
+                writer = FFmpegFrameWriter(paths[profile.name], transform.width, transform.height, fps,
+                                           audio_source=audio_source, quality=profile.quality or quality)
+                sinks.append((lang, transform, writer))
+        _render_frames(clip, sinks, ocr_boxes, trad_blocs, overlay_timing,
+                       overlay_opacity, overlay_animation)
+    except Exception:
+        for _, _, writer in sinks:
+            writer.abort()
+        raise
+    else:
+        _close_writers(writer for _, _, writer in sinks)
+    finally:
+        clip.close()
+    return outputs
+
+def _close_writers(writers):
+    """Ferme tous les encodeurs, même si l'un d'eux échoue ; remonte la première erreur"""
+    error = None
+    for writer in writers:
+        try:
+            writer.close()
+        except Exception as e:
+            error = error or e
+    if error is not None:
+        raise error
+
+def _render_frames(clip, sinks, ocr_boxes, trad_blocs, overlay_timing,
+                   overlay_opacity, overlay_animation, font_size=36):
+    """sinks : [(langue, ProfileTransform, encodeur)]"""
+    fps = clip.fps
+    # Plans de rendu construits une fois, en coordonnées source : recherche O(log n) des
+    # overlays actifs par frame. Ils ne diffèrent d'une langue à l'autre que par le texte.
+    plans = {
+        lang: build_render_plan(
+            ocr_boxes,
+            trad_blocs,
+            fps,
+            lang=lang,
+            overlay_timing=overlay_timing,
+            color=LANG_COLORS.get(lang, (255,255,255)),
+            animation=overlay_animation
+        )
+        for lang, _, _ in sinks
+    }
+    transforms = {transform.name: transform for _, transform, _ in sinks}
+    # Inpainting temporel : une zone texte statique n'est inpaintée qu'une fois par piste,
+    # pour toutes les sorties ; les zones à (ré)inpainter d'une même frame partent en une seule requête
+    inpaint_cache = TemporalInpaintCache()
+    lama = get_lama_client()
 
     for idx, frame in enumerate(clip.iter_frames()):
-        overlays = [b for b in ocr_boxes if b["frame"] == idx]
-        frame_out = frame.copy()
-        for i, b in enumerate(overlays):
-            mask = np.zeros(frame.shape[:2], dtype=np.uint8)
-            x, y, w, h = b["box"]
-            mask[y:y+h, x:x+w] = 255
-            frame_out = inpaint_with_lama(frame_out, mask)
-            trad = trad_blocs[i]
-            text = trad.get(f"text_{lang}", trad.get("text"))
-            color = LANG_COLORS.get(lang, (255,255,255))
-            # Gestion du timing et de l’animation
-            if overlay_timing and idx in overlay_timing:
-                t_data = overlay_timing[idx]
-                cur_time = idx / fps
-                start, end = t_data["start"], t_data["end"]
-                if not (start <= cur_time <= end):
-                    continue
-                # Calcule la progression pour l’animation (0→1 au début, 1→0 à la fin)
-                fade_in = min(1.0, max(0.0, (cur_time-start)/0.5))   # 0.5s de fade-in
-                fade_out = min(1.0, max(0.0, (end-cur_time)/0.5))    # 0.5s de fade-out
-                progress = min(fade_in, fade_out)
+        active = {lang: plan.active(idx) for lang, plan in plans.items()}
+        zones = {(entry.track_id, entry.box): entry.box for entries in active.values() for entry in entries}
+        clean = frame
+        if zones:
+            clean = inpaint_cache.apply_many(frame.copy(), list(zones.items()), lama.inpaint_boxes)
+
+        # Frame nettoyée au format de chaque profil, partagée par toutes les langues.
+        # La dernière sortie d'un format peut y incruster directement son texte, sauf si
+        # la frame a déjà été remise telle quelle à un autre encodeur.
+        bases = {name: transform.apply(clean) for name, transform in transforms.items()}
+        last_use = {id(bases[transform.name]): i for i, (_, transform, _) in enumerate(sinks)}
+        handed = set()
+        for i, (lang, transform, writer) in enumerate(sinks):
+            base, entries = bases[transform.name], active[lang]
+            if entries and (last_use[id(base)] != i or id(base) in handed):
+                frame_out = base.copy()
             else:
-                progress = 1.0
-            frame_out = overlay_text(
-                frame_out,
-                text,
-                b["box"],
-                color=color,
-                opacity=overlay_opacity,
-                animation=overlay_animation,
-                progress=progress
-            )
-        frames.append(frame_out)
-    new_clip = mp.ImageSequenceClip(frames, fps=fps)
-    new_clip.write_videofile(out_path, audio=True)
+                frame_out = base
+                handed.add(id(base))
+            for entry in entries:
+                frame_out = overlay_text(
+                    frame_out,
+                    entry.text,
+                    transform.layout(entry.box),
+                    font_size=max(12, round(font_size * transform.scale)),
+                    color=entry.color,
+                    opacity=overlay_opacity,
+                    animation=entry.animation,
+                    progress=entry.progress(idx, fps),
+                    inplace=True
+                )
+            writer.write(frame_out)
+    logger.info(f"Inpainting : {inpaint_cache.misses} zones inpaintées, {inpaint_cache.hits} réutilisées")
 
 # Utilisation :
 # edit_video_with_translations(
@@ -0,0 +1,131 @@
+import os
+import queue
+import subprocess
+import threading
+
+import numpy as np
+
+# CRF x264 selon la qualité de sortie demandée
+QUALITY_CRF = {"low": 28, "medium": 23, "high": 18}
+
+
+def ffmpeg_binary():
+    """Binaire ffmpeg : celui embarqué par imageio-ffmpeg (dépendance de moviepy) si disponible."""
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception:
+        return "ffmpeg"
+
+
+class FFmpegFrameWriter:
+    """
+    Encodeur en flux : chaque frame RGB est envoyée sur l'entrée standard d'un processus
+    ffmpeg dès qu'elle est produite. La mémoire est bornée par une petite file d'attente
+    (le thread d'écriture absorbe les à-coups de l'encodeur).
+
+    Si `audio_source` est fourni, sa piste audio est multiplexée telle quelle (-c:a copy),
+    sans être redécodée.
+    """
+
+    def __init__(
+        self,
+        out_path,
+        width,
+        height,
+        fps,
+        audio_source=None,
+        codec="libx264",
+        quality="high",
+        preset="medium",
+        queue_size=8
+    ):
+        self.out_path = out_path
+        self.width = int(width)
+        self.height = int(height)
+        self.frames_written = 0
+        cmd = [
+            ffmpeg_binary(), "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "rgb24",
+            "-s", f"{self.width}x{self.height}", "-r", f"{fps}",
+            "-i", "-",
+        ]
+        if audio_source:
+            cmd += ["-i", audio_source, "-map", "0:v:0", "-map", "1:a:0?", "-c:a", "copy", "-shortest"]
+        cmd += [
+            "-c:v", codec, "-preset", preset, "-crf", str(QUALITY_CRF.get(quality, 18)),
+            "-pix_fmt", "yuv420p", "-movflags", "+faststart",
+            out_path,
+        ]
+        self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._error = None
+        self._thread = threading.Thread(target=self._pump, name=f"ffmpeg-writer-{out_path}", daemon=True)
+        self._thread.start()
+
+    def _pump(self):
+        while True:
+            frame = self._queue.get()
+            if frame is None:
+                break
+            if self._error is not None:
+                continue  # On vide la file sans écrire pour ne pas bloquer le producteur
+            try:
+                self._proc.stdin.write(frame.tobytes())
+            except (BrokenPipeError, OSError) as e:
+                self._error = e
+
+    def write(self, frame):
+        if self._error is not None:
+            raise RuntimeError(f"Encodeur ffmpeg interrompu ({self.out_path}) : {self._error}")
+        if frame.shape[0] != self.height or frame.shape[1] != self.width:
+            raise ValueError(f"Frame {frame.shape[1]}x{frame.shape[0]} incompatible avec "
+                             f"l'encodeur {self.width}x{self.height}")
+        self._queue.put(np.ascontiguousarray(frame, dtype=np.uint8))
+        self.frames_written += 1
+
+    def close(self):
+        if self._proc is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        try:
+            self._proc.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+        stderr = self._proc.stderr.read().decode("utf-8", errors="replace")
+        returncode = self._proc.wait()
+        self._proc = None
+        if returncode != 0:
+            raise RuntimeError(f"ffmpeg a échoué ({returncode}) pour {self.out_path} : {stderr.strip()[-500:]}")
+
+    def abort(self):
+        """
+        Interrompt l'encodage (erreur en amont) sans attendre la fin du flux, et supprime
+        le fichier tronqué pour qu'il ne passe pas pour une sortie valide.
+        """
+        if self._proc is None:
+            return
+        self._proc.kill()
+        self._queue.put(None)
+        self._thread.join()
+        for pipe in (self._proc.stdin, self._proc.stderr):
+            try:
+                pipe.close()
+            except (BrokenPipeError, OSError):
+                pass
+        self._proc.wait()
+        self._proc = None
+        try:
+            os.remove(self.out_path)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()